@@ -39,13 +39,16 @@ import os
 import sys
 import glob
 import argparse
+import multiprocessing
 import numpy as np
 import logging
 
 from RepTate.core.CmdBase import CmdBase, CalcMode
+from RepTate.core import FileType, FileCache
 #from RepTate.gui.QApplicationManager import QApplicationManager
 
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QStandardPaths
 #from PySide6.QtCore import Qt, QCoreApplication
 # from RepTate.gui.SplashScreen import SplashScreen
 
@@ -53,6 +56,8 @@ from PySide6.QtWidgets import QApplication
 
 
 def main():
+    # worker processes of frozen executables start here
+    multiprocessing.freeze_support()
     start_RepTate(sys.argv[1:])
 
 
@@ -100,9 +105,23 @@ def start_RepTate(argv):
     # parser.add_argument(
     #     "-d", "--dpi", help="High DPI support on Windows", action="store_true"
     # )
+    parser.add_argument(
+        "-c",
+        "--cache",
+        help="Keep a binary cache of the parsed data files to reopen them faster",
+        action="store_true",
+    )
     parser.add_argument(
         "-l", "--tool", help="Open the tool L (if available)", default="", metavar="L"
     )
+    parser.add_argument(
+        "--react-memory",
+        help="Memory budget (MB) of the React records: they grow without asking "
+        "up to this size (default: half of the available RAM)",
+        type=float,
+        default=None,
+        metavar="MB",
+    )
     parser.add_argument(
         "-s",
         "--single",
@@ -149,6 +168,17 @@ def start_RepTate(argv):
 
     app = QApplication(sys.argv)
     app.setApplicationName("RepTate")
+    if args.react_memory is not None:
+        import RepTate.theories.react_memory as rmem
+
+        rmem.MEMORY_BUDGET = args.react_memory
+    if args.cache:
+        FileType.file_cache = FileCache.ParsedFileCache(
+            os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.AppDataLocation),
+                "file_cache",
+            )
+        )
 
     # if args.dpi and sys.platform == "win32":
     #     #os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
@@ -39,7 +39,6 @@ from RepTate.gui.QApplicationWindow import QApplicationWindow
 from RepTate.core.View import View
 from RepTate.core.FileType import TXTColumnFile
 import numpy as np
-from scipy import interpolate
 
 from PySide6.QtWidgets import (
     QSpinBox,
@@ -50,7 +49,7 @@ from PySide6.QtWidgets import (
     QSizePolicy,
     QMessageBox,
 )
-from math import log10
+import RepTate.theories.irheo_helper as irh
 
 
 class ApplicationCreep(QApplicationWindow):
@@ -169,6 +168,9 @@ class ApplicationCreep(QApplicationWindow):
         self.OVER = 100  # initial oversampling
         self.MIN_OVER = 1  # min oversampling
         self.MAX_OVER = 10000  # max oversampling
+        self.MAX_IRHEO_FREQ = None  # max number of frequencies in i-Rheo views
+        self.MAX_IRHEO_FREQ_LIMIT = 1000000  # max value of the spinbox
+        self.irheo_cache = irh.TransformCache()
 
         # set multiviews
         self.nplots = 1
@@ -198,6 +200,8 @@ class ApplicationCreep(QApplicationWindow):
 
         self.add_oversampling_widget()
         self.set_oversampling_widget_visible(False)
+        self.add_max_freq_widget()
+        self.set_max_freq_widget_visible(False)
 
         self.add_xrange_widget_view()
         self.set_xrange_widgets_view_visible(False)
@@ -212,6 +216,21 @@ class ApplicationCreep(QApplicationWindow):
 
         self.viewLayout.insertWidget(2, self.sb_oversampling)
 
+    def add_max_freq_widget(self):
+        """Add spinbox for the maximum number of frequencies of the i-Rheo views"""
+        self.sb_max_freq = QSpinBox()
+        self.sb_max_freq.setToolTip(
+            "Maximum number of frequencies of the i-Rheo transformation\n"
+            "(coarser logarithmic grid for large data sets; 'all' for one frequency "
+            "per data point)"
+        )
+        self.sb_max_freq.setRange(0, self.MAX_IRHEO_FREQ_LIMIT)
+        self.sb_max_freq.setSpecialValueText("all")
+        self.sb_max_freq.setValue(self.MAX_IRHEO_FREQ or 0)
+        self.sb_max_freq.valueChanged.connect(self.change_max_freq)
+
+        self.viewLayout.insertWidget(3, self.sb_max_freq)
+
     def add_xrange_widget_view(self):
         """Add widgets below the view combobox to select the
         x-range applied to view transformation"""
@@ -316,6 +335,15 @@ class ApplicationCreep(QApplicationWindow):
         Called when the spinbox value is changed"""
         self.OVER = val
 
+    def change_max_freq(self, val):
+        """Change the maximum number of frequencies of the i-Rheo views (0 for no
+        maximum). Called when the spinbox value is changed"""
+        self.MAX_IRHEO_FREQ = val if val > 0 else None
+
+    def set_max_freq_widget_visible(self, state):
+        """Show/Hide the extra widget "maximum number of frequencies" """
+        self.sb_max_freq.setVisible(state)
+
     def set_oversampling_widget_visible(self, state):
         """Show/Hide the extra widget "sampling ratio" """
         self.sb_oversampling.setVisible(state)
@@ -335,13 +363,16 @@ class ApplicationCreep(QApplicationWindow):
         if view_name in ["i-Rheo G',G''", "Schwarzl G',G''"]:
             self.set_xrange_widgets_view_visible(True)
             self.set_oversampling_widget_visible(False)
+            self.set_max_freq_widget_visible(view_name == "i-Rheo G',G''")
         elif view_name == "i-Rheo-Over G',G''":
             self.set_xrange_widgets_view_visible(True)
             self.set_oversampling_widget_visible(True)
+            self.set_max_freq_widget_visible(True)
         else:
             try:
                 self.set_xrange_widgets_view_visible(False)
                 self.set_oversampling_widget_visible(False)
+                self.set_max_freq_widget_visible(False)
             except AttributeError:
                 pass
 
@@ -390,51 +421,15 @@ class ApplicationCreep(QApplicationWindow):
 
     def viewiRheo(self, dt, file_parameters):
         """i-Rheo Fourier transformation of the compliance :math:`J(t)` to obtain the storage modulus :math:`G'(\\omega)` and loss modulus :math:`G''(\\omega)` (no oversamplig)."""
-        error_msg, data_x, data_y = self.get_xy_data_in_xrange(dt)
-        if error_msg is not None:
-            QMessageBox.warning(self, "Error", error_msg)
-            return np.zeros((dt.num_rows, 2)), np.zeros((dt.num_rows, 2)), False
-        xunique, indunique = np.unique(data_x, return_index=True)
-        n = len(xunique)
-        sigma = float(file_parameters["stress"])
-        yunique = data_y[indunique] / sigma
-        t = xunique
-        j = yunique
-        x = np.zeros((n, 2))
-        y = np.zeros((n, 2))
-
-        f = interpolate.interp1d(
-            t, j, kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
-        j0 = f([0])[0]
-        ind1 = np.argmax(t > 0)
-        t1 = t[ind1]
-        j1 = j[ind1]
-        tN = np.max(t)
-        w = np.logspace(log10(1 / tN), log10(1 / t1), n)
-        x[:, 0] = w[:]
-        x[:, 1] = w[:]
-
-        aux = (
-            1j * w * j0
-            + (1 - np.exp(-1j * w * t1)) * (j1 - j0) / t1
-            + np.exp(-1j * w * tN) / self.eta
-        )
-        for i in range(ind1 + 1, n):
-            aux += (
-                (np.exp(-1j * w * t[i - 1]) - np.exp(-1j * w * t[i]))
-                * (j[i] - j[i - 1])
-                / (t[i] - t[i - 1])
-            )
-        Gstar = 1j * w / aux
-
-        y[:, 0] = Gstar.real
-        y[:, 1] = Gstar.imag
-
-        return x, y, True
+        return self.irheo_transform(dt, file_parameters, 1)
 
     def viewiRheoOver(self, dt, file_parameters):
         """i-Rheo Fourier transformation of the compliance :math:`J(t)` to obtain the storage modulus :math:`G'(\\omega)` and loss modulus :math:`G''(\\omega)` (with user selected oversamplig)."""
+        return self.irheo_transform(dt, file_parameters, self.OVER)
+
+    def irheo_transform(self, dt, file_parameters, over):
+        """i-Rheo transformation of the data in the x-range, with oversampling ratio ``over``.
+        Results are cached per (file data, x-range, eta, oversampling)"""
         error_msg, data_x, data_y = self.get_xy_data_in_xrange(dt)
         if error_msg is not None:
             QMessageBox.warning(self, "Error", error_msg)
@@ -442,49 +437,21 @@ class ApplicationCreep(QApplicationWindow):
         xunique, indunique = np.unique(data_x, return_index=True)
         n = len(xunique)
         sigma = float(file_parameters["stress"])
-        yunique = data_y[indunique] / sigma
         t = xunique
-        j = yunique
-        x = np.zeros((n, 2))
-        y = np.zeros((n, 2))
-
-        f = interpolate.interp1d(
-            t, j, kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
-        j0 = f([0])[0]
-        ind1 = np.argmax(t > 0)
-        t1 = t[ind1]
-        j1 = j[ind1]
-        tN = np.max(t)
-        w = np.logspace(np.log10(1 / tN), np.log10(1 / t1), n)
-        x[:, 0] = w[:]
-        x[:, 1] = w[:]
-
-        # Create oversampled data
-        tover = np.zeros(1)
-        tover[0] = t[ind1]
-        for i in range(ind1 + 1, n):
-            tmp = np.logspace(log10(t[i - 1]), log10(t[i]), self.OVER + 1)
-            tover = np.append(tover, tmp[1:])
-        jover = f(tover)
-        nover = len(tover)
-
-        aux = (
-            1j * w * j0
-            + (1 - np.exp(-1j * w * t1)) * (j1 - j0) / t1
-            + np.exp(-1j * w * tN) / self.eta
-        )
-        for i in range(1, nover):
-            aux += (
-                (np.exp(-1j * w * tover[i - 1]) - np.exp(-1j * w * tover[i]))
-                * (jover[i] - jover[i - 1])
-                / (tover[i] - tover[i - 1])
-            )
-        Gstar = 1j * w / aux
-
-        y[:, 0] = Gstar.real
-        y[:, 1] = Gstar.imag
-
+        j = data_y[indunique] / sigma
+
+        key = self.irheo_cache.key((t, j), self.eta, over, self.MAX_IRHEO_FREQ)
+        cached = self.irheo_cache.get(key)
+        if cached is not None:
+            x, y = cached
+            return x, y, True
+        res = irh.jt_to_gstar(t, j, self.eta, over, self.MAX_IRHEO_FREQ)
+        if res is None:
+            return np.zeros((n, 2)), np.zeros((n, 2)), False
+        w, Gp, Gpp = res
+        x = np.column_stack((w, w))
+        y = np.column_stack((Gp, Gpp))
+        self.irheo_cache.put(key, (x, y))
         return x, y, True
 
     def get_xy_data_in_xrange(self, dt):
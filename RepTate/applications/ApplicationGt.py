@@ -39,7 +39,6 @@ from RepTate.gui.QApplicationWindow import QApplicationWindow
 from RepTate.core.View import View
 from RepTate.core.FileType import TXTColumnFile
 import numpy as np
-from scipy import interpolate
 
 from PySide6.QtWidgets import (
     QSpinBox,
@@ -51,7 +50,7 @@ from PySide6.QtWidgets import (
     QMessageBox,
 )
 import RepTate.theories.schwarzl_ctypes_helper as sch
-from math import log10, sin, cos
+import RepTate.theories.irheo_helper as irh
 
 
 class ApplicationGt(QApplicationWindow):
@@ -146,6 +145,10 @@ class ApplicationGt(QApplicationWindow):
         self.OVER = 100  # initial oversampling
         self.MIN_OVER = 1  # min oversampling
         self.MAX_OVER = 10000  # max oversampling
+        self.MAX_IRHEO_FREQ = None  # max number of frequencies in i-Rheo views
+        self.MAX_IRHEO_FREQ_LIMIT = 1000000  # max value of the spinbox
+        self.irheo_cache = irh.TransformCache()
+        self.schwarzl_cache = irh.TransformCache(maxsize=1024)
 
         # set multiviews
         self.multiviews = [
@@ -189,6 +192,8 @@ class ApplicationGt(QApplicationWindow):
         # GUI specific stuff
         self.add_oversampling_widget()
         self.set_oversampling_widget_visible(False)
+        self.add_max_freq_widget()
+        self.set_max_freq_widget_visible(False)
 
         self.add_xrange_widget_view()
         self.set_xrange_widgets_view_visible(False)
@@ -203,6 +208,21 @@ class ApplicationGt(QApplicationWindow):
 
         self.viewLayout.insertWidget(2, self.sb_oversampling)
 
+    def add_max_freq_widget(self):
+        """Add spinbox for the maximum number of frequencies of the i-Rheo views"""
+        self.sb_max_freq = QSpinBox()
+        self.sb_max_freq.setToolTip(
+            "Maximum number of frequencies of the i-Rheo transformation\n"
+            "(coarser logarithmic grid for large data sets; 'all' for one frequency "
+            "per data point)"
+        )
+        self.sb_max_freq.setRange(0, self.MAX_IRHEO_FREQ_LIMIT)
+        self.sb_max_freq.setSpecialValueText("all")
+        self.sb_max_freq.setValue(self.MAX_IRHEO_FREQ or 0)
+        self.sb_max_freq.valueChanged.connect(self.change_max_freq)
+
+        self.viewLayout.insertWidget(3, self.sb_max_freq)
+
     def add_xrange_widget_view(self):
         """Add widgets below the view combobox to select the
         x-range applied to view transformation"""
@@ -282,6 +302,15 @@ class ApplicationGt(QApplicationWindow):
         Called when the spinbox value is changed"""
         self.OVER = val
 
+    def change_max_freq(self, val):
+        """Change the maximum number of frequencies of the i-Rheo views (0 for no
+        maximum). Called when the spinbox value is changed"""
+        self.MAX_IRHEO_FREQ = val if val > 0 else None
+
+    def set_max_freq_widget_visible(self, state):
+        """Show/Hide the extra widget "maximum number of frequencies" """
+        self.sb_max_freq.setVisible(state)
+
     def set_oversampling_widget_visible(self, state):
         """Show/Hide the extra widget "sampling ratio" """
         self.sb_oversampling.setVisible(state)
@@ -299,13 +328,16 @@ class ApplicationGt(QApplicationWindow):
         if view_name in ["i-Rheo G',G''", "Schwarzl G',G''"]:
             self.set_xrange_widgets_view_visible(True)
             self.set_oversampling_widget_visible(False)
+            self.set_max_freq_widget_visible(view_name == "i-Rheo G',G''")
         elif view_name == "i-Rheo-Over G',G''":
             self.set_xrange_widgets_view_visible(True)
             self.set_oversampling_widget_visible(True)
+            self.set_max_freq_widget_visible(True)
         else:
             try:
                 self.set_xrange_widgets_view_visible(False)
                 self.set_oversampling_widget_visible(False)
+                self.set_max_freq_widget_visible(False)
             except AttributeError:
                 pass
 
@@ -340,40 +372,23 @@ class ApplicationGt(QApplicationWindow):
     def viewSchwarzl_Gt(self, dt, file_parameters):
         """Schwarzl transformation: numerical calculation of the storage modulus :math:`G'(\\omega)` and loss modulus
         :math:`G''(\\omega)` from the relaxation modulus :math:`G(t)`"""
-        error_msg, data_x, data_y = self.get_xy_data_in_xrange(dt)
+        error_msg, data_x, data_y = self.schwarzl_input(dt, file_parameters)
         if error_msg is not None:
             QMessageBox.warning(self, "Error", error_msg)
-            return
-        n = len(data_x)
-        try:
-            gamma = float(file_parameters["gamma"])
-            if gamma == 0:
-                gamma = 1
-        except:
-            gamma = 1
-        data_y /= gamma
-        x = np.zeros((n, 2))
-        y = np.zeros((n, 2))
-
-        wp, Gp, wpp, Gpp = sch.do_schwarzl_gt(n, data_y, data_x)  # call the C function
-
-        x[:, 0] = wp[:]
-        x[:, 1] = wpp[:]
-        y[:, 0] = Gp[:]
-        y[:, 1] = Gpp[:]
+            return np.zeros((dt.num_rows, 2)), np.zeros((dt.num_rows, 2)), False
+        key = self.schwarzl_cache.key((data_x, data_y))
+        cached = self.schwarzl_cache.get(key)
+        if cached is None:
+            self.schwarzl_batch(dt, file_parameters)
+            cached = self.schwarzl_cache.get(key)
+        x, y = cached
         return x, y, True
 
-    def viewiRheo(self, dt, file_parameters):
-        """i-Rheo Fourier transformation of the relaxation modulus :math:`G(t)` to obtain the storage modulus :math:`G'(\\omega)` and loss modulus :math:`G''(\\omega)` (no oversamplig)."""
+    def schwarzl_input(self, dt, file_parameters):
+        """Data in the x-range, divided by gamma, used in the Schwarzl transformation"""
         error_msg, data_x, data_y = self.get_xy_data_in_xrange(dt)
         if error_msg is not None:
-            QMessageBox.warning(self, "Error", error_msg)
-            return np.zeros((dt.num_rows, 2)), np.zeros((dt.num_rows, 2)), False
-        xunique, indunique = np.unique(data_x, return_index=True)
-        n = len(xunique)
-        yunique = data_y[indunique]
-        data_x = xunique
-        data_y = yunique
+            return error_msg, None, None
         try:
             gamma = float(file_parameters["gamma"])
             if gamma == 0:
@@ -381,86 +396,55 @@ class ApplicationGt(QApplicationWindow):
         except:
             gamma = 1
         data_y /= gamma
-        x = np.zeros((n, 2))
-        y = np.zeros((n, 2))
-
-        if len(data_x) < 2:
-            f = interpolate.interp1d(
-                data_x,
-                data_y,
-                kind="zero",
-                assume_sorted=True,
-                fill_value="extrapolate",
-            )
-        elif len(data_x) < 3:
-            f = interpolate.interp1d(
-                data_x,
-                data_y,
-                kind="linear",
-                assume_sorted=True,
-                fill_value="extrapolate",
-            )
-        elif len(data_x) < 4:
-            f = interpolate.interp1d(
-                data_x,
-                data_y,
-                kind="quadratic",
-                assume_sorted=True,
-                fill_value="extrapolate",
-            )
-        else:
-            f = interpolate.interp1d(
-                data_x,
-                data_y,
-                kind="cubic",
-                assume_sorted=True,
-                fill_value="extrapolate",
-            )
-        g0 = f(0)
-        ind1 = np.argmax(data_x > 0)
-        t1 = data_x[ind1]
-        g1 = data_y[ind1]
-        tinf = np.max(data_x)
-        if tinf <= 0 or t1 <= 0:
-            return x, y, False
-        wp = np.logspace(log10(1 / tinf), log10(1 / t1), n)
-        x[:, 0] = wp[:]
-        x[:, 1] = wp[:]
-
-        coeff = (data_y[ind1 + 1 :] - data_y[ind1:-1]) / (
-            data_x[ind1 + 1 :] - data_x[ind1:-1]
-        )
-        for i, w in enumerate(wp):
-            y[i, 0] = (
-                g0
-                + sin(w * t1) * (g1 - g0) / w / t1
-                + np.dot(
-                    coeff, -np.sin(w * data_x[ind1:-1]) + np.sin(w * data_x[ind1 + 1 :])
-                )
-                / w
-            )
+        return None, data_x, data_y
+
+    def schwarzl_batch(self, dt, file_parameters):
+        """Schwarzl transformation of the table dt and, if it is the data of a file of the
+        current dataset, of all the active files of that dataset, in a single call
+        to the C library. The results are stored in the Schwarzl cache"""
+        tables = [(dt, file_parameters)]
+        ds = self.DataSettabWidget.currentWidget()
+        if ds is not None and any(f.data_table is dt for f in ds.files):
+            tables += [
+                (f.data_table, f.file_parameters)
+                for f in ds.files
+                if f.active and f.data_table is not dt
+            ]
+        keys = []
+        times = []
+        values = []
+        for table, params in tables:
+            error_msg, data_x, data_y = self.schwarzl_input(table, params)
+            if error_msg is None:
+                keys.append(self.schwarzl_cache.key((data_x, data_y)))
+                times.append(data_x)
+                values.append(data_y)
+
+        results = sch.do_schwarzl_gt_batch(values, times)  # call the C function
+        for key, (wp, Gp, wpp, Gpp) in zip(keys, results):
+            x = np.column_stack((wp, wpp))
+            y = np.column_stack((Gp, Gpp))
+            self.schwarzl_cache.put(key, (x, y))
 
-            y[i, 1] = (
-                -(1 - cos(w * t1)) * (g1 - g0) / w / t1
-                - np.dot(
-                    coeff, np.cos(w * data_x[ind1:-1]) - np.cos(w * data_x[ind1 + 1 :])
-                )
-                / w
-            )
-
-        return x, y, True
+    def viewiRheo(self, dt, file_parameters):
+        """i-Rheo Fourier transformation of the relaxation modulus :math:`G(t)` to obtain the storage modulus :math:`G'(\\omega)` and loss modulus :math:`G''(\\omega)` (no oversamplig)."""
+        return self.irheo_transform(dt, file_parameters, 1)
 
     def viewiRheoOver(self, dt, file_parameters):
         """i-Rheo Fourier transformation of the relaxation modulus :math:`G(t)` to obtain the storage modulus :math:`G'(\\omega)` and loss modulus :math:`G''(\\omega)` (with user selected oversamplig)."""
+        return self.irheo_transform(dt, file_parameters, self.OVER)
+
+    def irheo_transform(self, dt, file_parameters, over):
+        """i-Rheo transformation of the data in the x-range, with oversampling ratio ``over``.
+        Results are cached per (file data, x-range, oversampling)"""
         error_msg, data_x, data_y = self.get_xy_data_in_xrange(dt)
         if error_msg is not None:
             QMessageBox.warning(self, "Error", error_msg)
             return np.zeros((dt.num_rows, 2)), np.zeros((dt.num_rows, 2)), False
         xunique, indunique = np.unique(data_x, return_index=True)
         n = len(xunique)
-        yunique = data_y[indunique]
         data_x = xunique
-        data_y = yunique
+        data_y = data_y[indunique]
         try:
             gamma = float(file_parameters["gamma"])
             if gamma == 0:
@@ -468,41 +452,19 @@ class ApplicationGt(QApplicationWindow):
         except:
             gamma = 1
         data_y /= gamma
-        x = np.zeros((n, 2))
-        y = np.zeros((n, 2))
 
-        f = interpolate.interp1d(
-            data_x, data_y, kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
-        g0 = f(0)
-        ind1 = np.argmax(data_x > 0)
-        t1 = data_x[ind1]
-        g1 = data_y[ind1]
-        tinf = np.max(data_x)
-        wp = np.logspace(np.log10(1 / tinf), np.log10(1 / t1), n)
-        x[:, 0] = wp[:]
-        x[:, 1] = wp[:]
-
-        # Create oversampled data
-        xdata = np.zeros(1)
-        xdata[0] = data_x[ind1]
-        for i in range(ind1 + 1, n):
-            tmp = np.logspace(log10(data_x[i - 1]), log10(data_x[i]), self.OVER + 1)
-            xdata = np.append(xdata, tmp[1:])
-        ydata = f(xdata)
-
-        coeff = (ydata[1:] - ydata[:-1]) / (xdata[1:] - xdata[:-1])
-        for i, w in enumerate(wp):
-            y[i, 0] = (
-                g0
-                + sin(w * t1) * (g1 - g0) / w / t1
-                + np.dot(coeff, -np.sin(w * xdata[:-1]) + np.sin(w * xdata[1:])) / w
-            )
-
-            y[i, 1] = (
-                -(1 - cos(w * t1)) * (g1 - g0) / w / t1
-                - np.dot(coeff, np.cos(w * xdata[:-1]) - np.cos(w * xdata[1:])) / w
-            )
+        key = self.irheo_cache.key((data_x, data_y), over, self.MAX_IRHEO_FREQ)
+        cached = self.irheo_cache.get(key)
+        if cached is not None:
+            x, y = cached
+            return x, y, True
+        res = irh.gt_to_gstar(data_x, data_y, over, self.MAX_IRHEO_FREQ)
+        if res is None:
+            return np.zeros((n, 2)), np.zeros((n, 2)), False
+        w, Gp, Gpp = res
+        x = np.column_stack((w, w))
+        y = np.column_stack((Gp, Gpp))
+        self.irheo_cache.put(key, (x, y))
         return x, y, True
 
     def get_xy_data_in_xrange(self, dt):
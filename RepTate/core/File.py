@@ -64,6 +64,7 @@ class File(object):
         self.header_lines=[]
         self.file_parameters={}
         self.active = True
+        self.file_stamp = None # (size, mtime) of the file when it was read
         self.data_table = DataTable(axarr, self.file_name_short)
         # extra theory xrange
         self.with_extra_x = False
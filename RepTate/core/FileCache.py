@@ -0,0 +1,164 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module FileCache
+
+Opt-in on-disk cache of the parsed data files (see FileType.TXTColumnFile.parse_file).
+Each entry is stored as a binary .npy array of the data and a .json file with the
+parameters, header lines and column indices of the file. The key of an entry is a
+hash of the absolute path, size and modification time of the data file and of the
+columns read by its file type, so that checking a file only needs a call to stat.
+The arrays are read in memory, except those bigger than MMAP_BYTES, which are
+memory-mapped (copy-on-write): a memory-mapped array keeps its file open, and a
+data set can have thousands of files.
+
+The least recently used entries are deleted when the total size of the cache goes
+over its cap. The cache is switched on by setting FileType.file_cache to a
+ParsedFileCache (RepTate option --cache).
+"""
+import os
+import glob
+import json
+import hashlib
+import numpy as np
+
+CACHE_BYTES = 1024 * 2**20  # size cap of the on-disk cache
+MMAP_BYTES = 64 * 2**20  # arrays bigger than this are memory-mapped
+
+
+def file_stamp(path):
+    """Size and modification time (ns) of the file `path`, or None if the file
+    cannot be found"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def file_key(ftype, path, stamp):
+    """Key of the file `path` with the stamp `stamp` (see file_stamp), parsed with
+    the file type `ftype`"""
+    key = (os.path.abspath(path), stamp, ftype.extension, list(ftype.col_names))
+    return hashlib.sha256(repr(key).encode()).hexdigest()
+
+
+class ParsedFileCache:
+    """LRU cache of ParsedFile objects in the folder `directory`"""
+
+    def __init__(self, directory, max_bytes=CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key, ext):
+        return os.path.join(self.directory, "%s.%s" % (key, ext))
+
+    def get(self, key, parsed):
+        """Fill `parsed` (a ParsedFile) with the entry stored under `key`. Return
+        False if there is no such entry"""
+        npy = self.path(key, "npy")
+        try:
+            with open(self.path(key, "json"), "r", encoding="utf-8") as f:
+                info = json.load(f)
+            mmap_mode = "c" if os.path.getsize(npy) > MMAP_BYTES else None
+            parsed.data = np.load(npy, mmap_mode=mmap_mode)
+            os.utime(npy)  # most recently used
+        except OSError:
+            # missing entry, or it cannot be read now (e.g. too many open files)
+            return False
+        except Exception:
+            # unreadable entry, e.g. written by an interrupted RepTate
+            self.remove(key)
+            return False
+        parsed.file_parameters = info["file_parameters"]
+        parsed.header_lines = info["header_lines"]
+        parsed.col_names_line = info["col_names_line"]
+        parsed.first_data_line = info["first_data_line"]
+        parsed.col_index = info["col_index"]
+        return True
+
+    def put(self, key, parsed):
+        """Store `parsed` (a ParsedFile) under `key`. Call evict afterwards to keep
+        the cache in its size cap"""
+        info = {
+            "file_parameters": parsed.file_parameters,
+            "header_lines": parsed.header_lines,
+            "col_names_line": parsed.col_names_line,
+            "first_data_line": parsed.first_data_line,
+            "col_index": [int(i) for i in parsed.col_index],
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for ext in ("npy", "json"):
+                tmp = "%s.%d.tmp" % (self.path(key, ext), os.getpid())
+                if ext == "npy":
+                    with open(tmp, "wb") as f:
+                        np.save(f, np.ascontiguousarray(parsed.data, dtype=np.double))
+                else:
+                    with open(tmp, "w", encoding="utf-8") as f:
+                        json.dump(info, f)
+                os.replace(tmp, self.path(key, ext))
+        except (OSError, TypeError, ValueError):
+            self.remove(key)  # the cache is only an optimisation
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in
+        max_bytes"""
+        entries = []
+        for npy in glob.glob(os.path.join(self.directory, "*.npy")):
+            key = os.path.splitext(os.path.basename(npy))[0]
+            try:
+                st = os.stat(npy)
+            except OSError:
+                continue
+            try:
+                size = st.st_size + os.path.getsize(self.path(key, "json"))
+            except OSError:
+                size = st.st_size
+            entries.append((st.st_mtime, size, key))
+        total = sum(e[1] for e in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+    def remove(self, key):
+        for ext in ("npy", "json"):
+            try:
+                os.remove(self.path(key, ext))
+            except OSError:
+                pass
+
+    def clear(self):
+        for npy in glob.glob(os.path.join(self.directory, "*.npy")):
+            self.remove(os.path.splitext(os.path.basename(npy))[0])
@@ -36,11 +36,23 @@ Module for the basic definition of file types.
 
 """
 import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
 import numpy as np
 
 # import logging
 from openpyxl import load_workbook
 from RepTate.core.File import File
+from RepTate.core import FileCache
+
+PARALLEL_MIN_FILES = 16  # smaller lists of files are parsed in the main process
+POLL_INTERVAL = 0.1  # seconds between checks of the cancel request
+
+_executor = None
+_executor_workers = 0
+
+file_cache = None  # FileCache.ParsedFileCache of the parsed files, if enabled
 
 
 class TXTColumnFile(object):
@@ -147,6 +159,24 @@ class TXTColumnFile(object):
                 else:
                     file.file_parameters[par[0]] = par[1]
 
+    def is_data_line(self, line):
+        """Checks if the line is the first data line (see
+        find_col_names_and_first_data_lines)"""
+        return not all(x in line for x in self.col_names) and all(
+            self.is_number(x) for x in line.split()
+        )
+
+    def read_head(self, f):
+        """Read the lines of the open file f up to the first data line (included),
+        leaving the rest of the file unread. Return the list of lines read, which
+        is the whole file if no data line is found"""
+        lines = [f.readline()]
+        for line in iter(f.readline, ""):
+            lines.append(line)
+            if self.is_data_line(line):
+                break
+        return lines
+
     def find_col_names_and_first_data_lines(self, lines, file):
         """Find column names and first row with data"""
         colnameline = 0
@@ -169,46 +199,191 @@ class TXTColumnFile(object):
         if not os.path.isfile(filename):
             print('File "%s" does not exists' % f)
             return
+        parsed = parse_files(self, [filename])[0]
+        return self.new_file(filename, parsed, parent_dataset, axarr)
+
+    def new_file(self, filename, parsed, parent_dataset, axarr):
+        """Create the File of filename from its ParsedFile (see parse_file)"""
+        self.col_names_line = parsed.col_names_line
+        self.first_data_line = parsed.first_data_line
+        self.col_index = parsed.col_index
         file = File(filename, self, parent_dataset, axarr)
-        f = open(filename, "r", encoding="latin-1")
-        lines = f.readlines()
+        file.file_parameters = parsed.file_parameters
+        file.header_lines = parsed.header_lines
+        file.file_stamp = parsed.stamp
+        file.data_table.num_columns = len(parsed.col_index)
+        file.data_table.num_rows = parsed.data.shape[0]
+        file.data_table.data = parsed.data
+        return file
+
+    def parse_file(self, filename):
+        """Parse the file and return a ParsedFile. This does not create any File
+        nor plot series, so it can run in a worker process
 
-        self.get_parameters(lines[0], file)
+        Only the first lines are read in Python, up to the first data line. The
+        block of data is then parsed by NumPy into an array of the needed columns.
+        If it has missing or non-numeric fields, it is parsed again line by line,
+        the bad fields being NaN"""
+        parsed = ParsedFile()
+        parsed.stamp = FileCache.file_stamp(filename)
+        with open(filename, "r", encoding="latin-1") as f:
+            lines = self.read_head(f)
+
+        self.get_parameters(lines[0], parsed)
         (
-            self.col_names_line,
-            self.first_data_line,
-        ) = self.find_col_names_and_first_data_lines(lines, file)
+            parsed.col_names_line,
+            parsed.first_data_line,
+        ) = self.find_col_names_and_first_data_lines(lines, parsed)
 
-        self.col_index = []
-        if self.col_names_line > 0:
-            items = lines[self.col_names_line].split()
+        if parsed.col_names_line > 0:
+            items = lines[parsed.col_names_line].split()
             for col in self.col_names:
                 for j in range(len(items)):
                     if col == items[j]:
-                        self.col_index.append(int(j))
+                        parsed.col_index.append(int(j))
                         break
         else:
-            self.col_index = list(range(len(self.col_names)))
-
-        file.data_table.num_columns = len(self.col_index)
+            parsed.col_index = list(range(len(self.col_names)))
+
+        data = None
+        if parsed.first_data_line > 0 and len(parsed.col_index) > 0:
+            data = self.read_data_block(filename, parsed)
+        if data is None:
+            data = self.read_data_lines(filename, parsed)
+        x = data[:, 0]
+        if not np.all(x[1:] > x[:-1]):
+            # not already sorted by the first column
+            data = data[x.argsort()]
+        parsed.data = data
+        return parsed
+
+    def read_data_block(self, filename, parsed):
+        """Parse the data lines of the file with NumPy. Return None if some fields
+        are missing or are not numbers"""
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # no data
+            try:
+                return np.loadtxt(
+                    filename,
+                    skiprows=parsed.first_data_line,
+                    usecols=parsed.col_index,
+                    comments=None,
+                    encoding="latin-1",
+                    ndmin=2,
+                )
+            except ValueError:
+                return None
+
+    def read_data_lines(self, filename, parsed):
+        """Parse the data lines of the file line by line, with NaN for the missing
+        or non-numeric fields"""
+        with open(filename, "r", encoding="latin-1") as f:
+            lines = f.readlines()
         rawdata = []
-        for i in range(self.first_data_line, len(lines)):
+        for i in range(parsed.first_data_line, len(lines)):
             items = lines[i].split()
             if len(items) > 0:
-                for j in self.col_index:
+                for j in parsed.col_index:
                     try:
                         rawdata.append(float(items[j]))
                     except (IndexError, ValueError):
                         rawdata.append(float("nan"))
-        file.data_table.num_rows = int(len(rawdata) / file.data_table.num_columns)
-        file.data_table.data = np.reshape(
-            rawdata, newshape=(file.data_table.num_rows, file.data_table.num_columns)
-        )
-        file.data_table.data = file.data_table.data[
-            file.data_table.data[:, 0].argsort()
-        ]
+        num_columns = len(parsed.col_index)
+        num_rows = int(len(rawdata) / num_columns) if num_columns else 0
+        return np.reshape(rawdata, newshape=(num_rows, num_columns))
 
-        return file
+
+class ParsedFile(object):
+    """Contents of a parsed data file (parameters, header lines, indices of the
+    columns read, data and stamp of the file), before it is made into a File of a
+    DataSet"""
+
+    def __init__(self):
+        self.file_parameters = {}
+        self.header_lines = []
+        self.col_names_line = 0
+        self.first_data_line = 0
+        self.col_index = []
+        self.data = None
+        self.stamp = None  # (size, mtime) of the file when it was parsed
+
+
+def parse_file(ftype, filename):
+    """Parse filename with the file type ftype (function run by the workers of
+    parse_files)"""
+    return ftype.parse_file(filename)
+
+
+def get_executor(nworkers):
+    """Process pool that parses the files, created on first use and kept alive so
+    that the workers are only started once per session. Processes are spawned (not
+    forked), as files can be opened from a Qt thread"""
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != nworkers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(
+            max_workers=nworkers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _executor_workers = nworkers
+    return _executor
+
+
+def parse_files(ftype, filenames, nworkers=None, on_progress=None, should_stop=None):
+    """Parse the files filenames of the file type ftype. The files found in
+    file_cache (if it is set) are read from the cache. If there are more than
+    PARALLEL_MIN_FILES other files, they are parsed on a pool of nworkers processes.
+
+    on_progress(n) is called with the number of files parsed so far, and
+    should_stop() regularly: if it returns True, the files not parsed yet are
+    skipped. Return the list of ParsedFile, in the order of filenames, with None
+    for the files skipped"""
+    if nworkers is None:
+        nworkers = os.cpu_count() or 1
+    parsed = [None] * len(filenames)
+    keys = [None] * len(filenames)
+    if file_cache is not None:
+        for i, filename in enumerate(filenames):
+            stamp = FileCache.file_stamp(filename)
+            if stamp is None:
+                continue
+            keys[i] = FileCache.file_key(ftype, filename, stamp)
+            pf = ParsedFile()
+            if file_cache.get(keys[i], pf):
+                pf.stamp = stamp
+                parsed[i] = pf
+    todo = [i for i in range(len(filenames)) if parsed[i] is None]
+    ncached = len(filenames) - len(todo)
+
+    if nworkers < 2 or len(todo) < PARALLEL_MIN_FILES:
+        for n, i in enumerate(todo):
+            if should_stop is not None and should_stop():
+                break
+            parsed[i] = ftype.parse_file(filenames[i])
+            if on_progress is not None:
+                on_progress(ncached + n + 1)
+    else:
+        executor = get_executor(nworkers)
+        futures = {executor.submit(parse_file, ftype, filenames[i]): i for i in todo}
+        pending = set(futures)
+        while pending:
+            if should_stop is not None and should_stop():
+                for fut in pending:
+                    fut.cancel()
+                break
+            done, pending = wait(pending, timeout=POLL_INTERVAL)
+            for fut in done:
+                parsed[futures[fut]] = fut.result()
+            if on_progress is not None:
+                on_progress(ncached + len(futures) - len(pending))
+
+    if file_cache is not None:
+        stored = [i for i in todo if parsed[i] is not None and keys[i] is not None]
+        for i in stored:
+            file_cache.put(keys[i], parsed[i])
+        if len(stored) > 0:
+            file_cache.evict()
+    return parsed
 
 
 class ExcelFile(object):
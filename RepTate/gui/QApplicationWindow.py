@@ -90,6 +90,7 @@ from PySide6.QtWidgets import (
     QTableWidgetItem,
     QRadioButton,
     QApplication,
+    QProgressDialog,
 )
 import RepTate
 from RepTate.gui.QDataSet import QDataSet
@@ -2883,27 +2884,55 @@ class QApplicationWindow(QMainWindow, Ui_AppWindow):
                 self.addTableToCurrentDataSet(f, ftype.extension)
 
     def new_tables_from_files(self, paths_to_open):
-        """Create new Files in a DataSet from a list of files"""
+        """Create new Files in a DataSet from a list of files
+
+        The files are parsed first (in parallel if there are many), with a progress
+        dialog that allows to cancel the opening, then added to the DataSet tree.
+        The DataSet is plotted once, after all the files have been added"""
         if self.DataSettabWidget.count() == 0:
             self.createNew_Empty_Dataset()
         ds = self.DataSettabWidget.currentWidget()
         ds.DataSettreeWidget.blockSignals(
             True
         )  # avoid triggering 'itemChanged' signal that causes a call to do_plot()
-        success, newtables, ext = ds.do_open(paths_to_open)
+        nfiles = len(paths_to_open)
+        dialog = QProgressDialog(
+            "Opening %d files..." % nfiles, "Cancel", 0, nfiles, self
+        )
+        dialog.setWindowModality(Qt.WindowModal)
+
+        def progress(nread):
+            dialog.setValue(min(nread, nfiles))
+            QApplication.processEvents()
+
+        success, newtables, ext = ds.do_open(
+            paths_to_open, on_progress=progress, should_stop=dialog.wasCanceled
+        )
+        cancelled = dialog.wasCanceled()
+        dialog.reset()
         if success == True:
             self.check_no_param_missing(newtables, ext)
+            ds.DataSettreeWidget.setSortingEnabled(False)  # sort once at the end
             for dt in newtables:
                 self.addTableToCurrentDataSet(dt, ext)
+            ds.DataSettreeWidget.setSortingEnabled(True)
             ds.do_plot()
             self.update_Qplot()
             ds.set_table_icons(ds.table_icon_list)
+            if cancelled:
+                self.logger.warning(
+                    "Opening cancelled: %d of %d files opened"
+                    % (len(newtables), nfiles)
+                )
         else:
             QMessageBox.about(self, "Open", success)
         ds.DataSettreeWidget.blockSignals(False)
 
     def check_no_param_missing(self, newtables, ext):
-        """Check"""
+        """Check that the new files have all the basic parameters of the file type.
+        The missing parameters are set to 0, with one warning for all the files that
+        miss the same parameters"""
+        missing = {}
         for dt in newtables:
             e_list = []
             for param in self.filetypes[ext].basic_file_parameters[:]:
@@ -2916,15 +2945,17 @@ class QApplicationWindow(QMainWindow, Ui_AppWindow):
                 except KeyError:
                     e_list.append(param)
             if len(e_list) > 0:
-                message = (
-                    "Parameter(s) {%s} not found in file '%s'\n Value(s) set to 0"
-                    % (", ".join(e_list), dt.file_name_short)
-                )
-                # header = "Missing Parameter"
-                # QMessageBox.warning(self, header, message)
-                self.logger.warning(message)
+                missing.setdefault(tuple(e_list), []).append(dt.file_name_short)
                 for e_param in e_list:
                     dt.file_parameters[e_param] = "0"
+        for e_list, names in missing.items():
+            message = (
+                "Parameter(s) {%s} not found in file(s) '%s'\n Value(s) set to 0"
+                % (", ".join(e_list), "', '".join(names))
+            )
+            # header = "Missing Parameter"
+            # QMessageBox.warning(self, header, message)
+            self.logger.warning(message)
 
     def openFileNamesDialog(self, ext_filter="All Files (*)"):
         """Open Files"""
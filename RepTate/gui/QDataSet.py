@@ -78,6 +78,8 @@ from PySide6.QtWidgets import (
 )
 import RepTate
 from RepTate.core.File import File
+from RepTate.core.FileType import parse_files
+from RepTate.core import FileCache
 from RepTate.core.DataTable import DataTable
 from RepTate.gui.QTheory import MinimizationMethod, ErrorCalculationMethod
 from RepTate.gui.DataSetWidget import DataSetWidget
@@ -1112,8 +1114,13 @@ class QDataSet(QWidget, Ui_DataSet):
         else:
             return None, False
 
-    def do_open(self, line):
-        r"""Open file(s). Arguments: FILENAME(s) (pattern expansion characters -- \*, ? -- allowed"""
+    def do_open(self, line, on_progress=None, should_stop=None):
+        r"""Open file(s). Arguments: FILENAME(s) (pattern expansion characters -- \*, ? -- allowed
+
+        The files are parsed first (in parallel if there are many, see
+        FileType.parse_files), then added to the DataSet in the order given.
+        on_progress(n) is called with the number of files parsed so far and, if
+        should_stop() returns True, the files not parsed yet are not opened"""
         f_names = line
         newtables = []
         if line == "" or len(f_names) == 0:
@@ -1125,51 +1132,96 @@ class QDataSet(QWidget, Ui_DataSet):
             return (message, None, None)
         if f_ext[0] in self.parent_application.filetypes:
             ft = self.parent_application.filetypes[f_ext[0]]
+            paths = []
             for f in f_names:
                 if not os.path.isfile(f):
                     print('File "%s" does not exists' % f)
                     continue  # next file name
-                df = ft.read_file(f, self, self.parent_application.axarr)
-                unique = True
-                for file in self.files:
-                    if (
-                        df.file_name_short == file.file_name_short
-                    ):  # check if file already exists in current ds
-                        unique = False
-                if unique:
-                    self.files.append(df)
-                    self.current_file = df
-                    newtables.append(df)
-                    for th_name in self.theories:
-                        # add a theory table
-                        self.theories[th_name].tables[df.file_name_short] = DataTable(
-                            self.parent_application.axarr, "TH_" + df.file_name_short
-                        )
+                paths.append(f)
+            if hasattr(ft, "parse_file"):
+                parsed = parse_files(
+                    ft, paths, on_progress=on_progress, should_stop=should_stop
+                )
+            else:
+                parsed = [None] * len(paths)
+            names = set(file.file_name_short for file in self.files)
+            for f, pf in zip(paths, parsed):
+                if pf is not None:
+                    df = ft.new_file(f, pf, self, self.parent_application.axarr)
+                elif hasattr(ft, "parse_file"):
+                    continue  # not parsed, the opening was cancelled
+                else:
+                    df = ft.read_file(f, self, self.parent_application.axarr)
+                if df.file_name_short in names:
+                    continue  # file already exists in current ds
+                names.add(df.file_name_short)
+                self.files.append(df)
+                self.current_file = df
+                newtables.append(df)
+                for th_name in self.theories:
+                    # add a theory table
+                    self.theories[th_name].tables[df.file_name_short] = DataTable(
+                        self.parent_application.axarr, "TH_" + df.file_name_short
+                    )
             return (True, newtables, f_ext[0])
         else:
             message = 'File type "%s" does not exists' % f_ext[0]
             return (message, None, None)
 
     def do_reload_data(self, line=""):
-        """Reload data files in the current DataSet"""
+        """Reload the data files of the current DataSet that have changed on disk
+
+        Only the active files whose size or modification time changed since they were
+        read are parsed again. The theories with autocalculate are then recalculated
+        for the reloaded files only. Return the list of files reloaded"""
+        changed = {}  # file type: files to reload
         for file in self.files:
             if not file.active:
                 continue
             path = file.file_full_path
-            ft = file.file_type
-            if not os.path.isfile(path):
+            stamp = FileCache.file_stamp(path)
+            if stamp is None:
                 self.logger.warning(
                     "Could not open file %s: %s" % (file.file_name_short, path)
                 )
                 continue
-            df = ft.read_file(path, self, None)
-            file.header_lines = df.header_lines[:]
-            file.file_parameters.clear()
-            file.file_parameters.update(df.file_parameters)
-            file.data_table.data = np.array(df.data_table.data)
-            file.data_table.num_columns = df.data_table.num_columns
-            file.data_table.num_rows = df.data_table.num_rows
+            if file.file_stamp is None or stamp != file.file_stamp:
+                changed.setdefault(file.file_type, []).append(file)
+
+        reloaded = []
+        for ft, files in changed.items():
+            paths = [file.file_full_path for file in files]
+            if hasattr(ft, "parse_file"):
+                parsed = parse_files(ft, paths)
+            else:
+                parsed = [ft.read_file(path, self, None) for path in paths]
+            for file, pf in zip(files, parsed):
+                if hasattr(ft, "parse_file"):
+                    data = pf.data
+                    file.file_stamp = pf.stamp
+                else:
+                    data = pf.data_table.data
+                file.header_lines = pf.header_lines[:]
+                file.file_parameters.clear()
+                file.file_parameters.update(pf.file_parameters)
+                file.data_table.data = np.array(data)
+                file.data_table.num_rows, file.data_table.num_columns = data.shape
+                reloaded.append(file)
+
+        if len(reloaded) == 0:
+            self.logger.info("Reload: no data file has changed")
+            return reloaded
+        self.logger.info(
+            "Reloaded %d file(s): %s"
+            % (len(reloaded), ", ".join(file.file_name_short for file in reloaded))
+        )
+        for th in self.theories.values():
+            th_files = th.theory_files()
+            files = [file for file in reloaded if file in th_files]
+            if len(files) > 0 and th.autocalculate:
+                th.do_calculate("", timing=False, files=files)
         self.do_plot("")
+        return reloaded
 
     def __listdir(self, root):
         """List directory 'root' appending the path separator to subdirs."""
@@ -358,6 +358,10 @@ class QTheory(QWidget, Ui_TheoryTab):
         self.function = None
         self.active = True  # defines if the theory is plotted
         self.calculate_is_busy = False
+        self.calc_files = []  # files calculated in the current pass (do_calculate)
+        self.start_time_cal = 0  # start time of the current pass (do_calculate)
+        self.batch_key = None  # calculation pass of the batched results
+        self.batch = {}  # batched results of the files of the pass, by file name
         self.axarr[0].autoscale(False)
         self.autocalculate = True
         self.extra_data = {}  # Dictionary saved during "Save Project"
@@ -574,8 +578,10 @@ class QTheory(QWidget, Ui_TheoryTab):
         self.Qprint("<font color=red><b>Stop current calculation requested</b></font>")
         self.stop_theory_flag = True
 
-    def do_calculate(self, line, timing=True):
-        """Calculate the theory"""
+    def do_calculate(self, line, timing=True, files=None):
+        """Calculate the theory. If the list files is given, the theory is only
+        calculated for these files (e.g. files reloaded), the theory of the other
+        files is kept"""
         if self.calculate_is_busy:
             return
         if not self.tables:
@@ -584,7 +590,10 @@ class QTheory(QWidget, Ui_TheoryTab):
         self.calculate_is_busy = True
         self.start_time_cal = time.time()
         th_files = self.theory_files()
+        self.calc_files = [f for f in th_files if files is None or f in files]
         for f in self.parent_dataset.files:
+            if files is not None and f not in files:
+                continue
             if f in th_files:
                 if self.stop_theory_flag:
                     break
@@ -613,49 +622,106 @@ class QTheory(QWidget, Ui_TheoryTab):
             self.do_cite("")
         self.calculate_is_busy = False
 
-    def extend_xrange(self, fcopy):
-        """Extend the xrange of the fcopy data"""
+    def calculate_batched(self, f, Mw, settings, make_params, batch, single):
+        """Result of the theory for the file f of molar mass Mw, for theories that
+        can calculate several files in a single call (e.g. to a C library)
+
+        The first file of a calculation pass computes all the files of the pass
+        (calc_files) with a valid Mw at once, with batch(list of params), where
+        make_params(Mw, x) are the parameters of a file of x values. The results are
+        kept until the pass or the settings (tuple of the theory parameters) change.
+        Files missing from the batch or whose x values changed (e.g. x-range
+        extended for this file only) are computed alone with single(params)"""
+        key = (self.start_time_cal, tuple(self.calc_files)) + tuple(settings)
+        if key != self.batch_key:
+            self.batch_key = key
+            names, mws, params = [], [], []
+            for g in self.calc_files:
+                try:
+                    Mwg = float(g.file_parameters["Mw"])
+                except (ValueError, KeyError):
+                    continue
+                names.append(g.file_name_short)
+                mws.append(Mwg)
+                params.append(make_params(Mwg, g.data_table.data[:, 0]))
+            results = batch(params) if len(params) > 0 else []
+            self.batch = {
+                name: (p[-1], m, r)
+                for name, m, p, r in zip(names, mws, params, results)
+            }
+
+        x = f.data_table.data[:, 0]
+        res = self.batch.get(f.file_name_short)
+        if res is not None and res[1] == Mw and np.array_equal(res[0], x):
+            return res[2]
+        return single(make_params(Mw, x))
+
+    def extra_xrange(self, f):
+        """Extra x values below and above the data of file f needed to cover the
+        theory xrange of f. Each is None if the limit is not set, or empty if the data
+        already covers it. f is not modified"""
         # xmin/xmax of current data
-        ncol = fcopy.data_table.data.shape[1]
-        xmin = fcopy.data_table.data[:, 0][0]
-        xmax = fcopy.data_table.data[:, 0][-1]
+        xmin = f.data_table.data[:, 0][0]
+        xmax = f.data_table.data[:, 0][-1]
         try:
-            thmin = float(fcopy.theory_xmin)
+            thmin = float(f.theory_xmin)
         except ValueError:
-            fcopy.nextramin = 0  # number of extra rows added left
+            xextra_min = None
         else:
+            xextra_min = np.empty(0)
             if thmin < xmin:
-                if 0 < thmin and fcopy.theory_logspace:
+                if 0 < thmin and f.theory_logspace:
                     xextra_min = np.logspace(
-                        np.log10(thmin), np.log10(xmin), fcopy.th_num_pts
+                        np.log10(thmin), np.log10(xmin), f.th_num_pts
                     )[:-1]
                 else:
-                    xextra_min = np.linspace(thmin, xmin, fcopy.th_num_pts)[:-1]
-                fcopy.nextramin = len(xextra_min)
-                data_min = np.zeros((len(xextra_min), ncol))
-                data_min[:, 0] = xextra_min
-                fcopy.data_table.data = np.concatenate(
-                    (data_min, fcopy.data_table.data)
-                )
+                    xextra_min = np.linspace(thmin, xmin, f.th_num_pts)[:-1]
 
         try:
-            thmax = float(fcopy.theory_xmax)
+            thmax = float(f.theory_xmax)
         except ValueError:
-            fcopy.nextramax = 0  # number of extra rows added right
+            xextra_max = None
         else:
+            xextra_max = np.empty(0)
             if thmax > xmax:
-                if 0 < thmax and fcopy.theory_logspace:
+                if 0 < thmax and f.theory_logspace:
                     xextra_max = np.logspace(
-                        np.log10(xmax), np.log10(thmax), fcopy.th_num_pts
+                        np.log10(xmax), np.log10(thmax), f.th_num_pts
                     )[1:]
                 else:
-                    xextra_max = np.linspace(xmax, thmax, fcopy.th_num_pts)[1:]
-                fcopy.nextramax = len(xextra_max)
-                data_max = np.zeros((len(xextra_max), ncol))
-                data_max[:, 0] = xextra_max
-                fcopy.data_table.data = np.concatenate(
-                    (fcopy.data_table.data, data_max)
-                )
+                    xextra_max = np.linspace(xmax, thmax, f.th_num_pts)[1:]
+        return xextra_min, xextra_max
+
+    def theory_x(self, f):
+        """x values where the theory of file f is calculated: the data of f, extended
+        to the theory xrange of f if it is set. f is not modified"""
+        x = f.data_table.data[:, 0]
+        if f.with_extra_x:
+            xextra_min, xextra_max = self.extra_xrange(f)
+            x = np.concatenate(
+                [e for e in (xextra_min, x, xextra_max) if e is not None]
+            )
+        return x
+
+    def extend_xrange(self, fcopy):
+        """Extend the xrange of the fcopy data"""
+        ncol = fcopy.data_table.data.shape[1]
+        xextra_min, xextra_max = self.extra_xrange(fcopy)
+        if xextra_min is None:
+            fcopy.nextramin = 0  # number of extra rows added left
+        elif len(xextra_min) > 0:
+            fcopy.nextramin = len(xextra_min)
+            data_min = np.zeros((len(xextra_min), ncol))
+            data_min[:, 0] = xextra_min
+            fcopy.data_table.data = np.concatenate((data_min, fcopy.data_table.data))
+
+        if xextra_max is None:
+            fcopy.nextramax = 0  # number of extra rows added right
+        elif len(xextra_max) > 0:
+            fcopy.nextramax = len(xextra_max)
+            data_max = np.zeros((len(xextra_max), ncol))
+            data_max[:, 0] = xextra_max
+            fcopy.data_table.data = np.concatenate((fcopy.data_table.data, data_max))
         fcopy.data_table.num_rows = fcopy.data_table.data.shape[0]
 
     def get_non_extended_th_table(self, f):
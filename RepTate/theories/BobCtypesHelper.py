@@ -47,6 +47,7 @@ from ctypes import (
 )
 import sys
 import os
+import numpy as np
 
 if sys.platform == "darwin" or sys.platform == "linux":
     CHARCODE = "utf-8"
@@ -59,6 +60,13 @@ class BobError(Exception):
     pass
 
 
+array_1d_double = np.ctypeslib.ndpointer(
+    dtype=np.double, ndim=1, flags="C_CONTIGUOUS"
+)
+array_1d_int = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, flags="C_CONTIGUOUS")
+array_1d_char = np.ctypeslib.ndpointer(dtype=np.uint8, ndim=1, flags="C_CONTIGUOUS")
+
+
 class BobCtypesHelper:
     """Wrapper class to call BoB C++ functions"""
 
@@ -155,18 +163,59 @@ class BobCtypesHelper:
             self.bob_lib.reptate_save_polyconf_and_return_gpc
         )
         self.bob_save_polyconf_and_return_gpc.restype = c_bool
+        self.bob_save_polyconf_and_return_gpc.argtypes = (
+            [c_int, POINTER(c_char_p)]
+            + [c_int] * 4
+            + [POINTER(c_double)] * 2
+            + [array_1d_double] * 4
+        )
 
         self.run_bob_lve = self.bob_lib.run_bob_lve
         self.run_bob_lve.restype = c_bool
 
         self.get_bob_lve = self.bob_lib.get_bob_lve
         self.get_bob_lve.restype = c_bool
+        self.get_bob_lve.argtypes = [array_1d_double] * 3
 
         self.run_bob_nlve = self.bob_lib.run_bob_nlve
         self.run_bob_nlve.restype = c_bool
 
         self.get_bob_nlve_results = self.bob_lib.get_bob_nlve_results
         self.get_bob_nlve_results.restype = c_bool
+        self.get_bob_nlve_results.argtypes = [array_1d_double] * 3 + [c_bool]
+
+        # send the whole input in one call, instead of one item per callback
+        try:
+            self.set_bulk_input = self.bob_lib.set_bulk_input
+            self.set_bulk_input.restype = None
+            self.set_bulk_input.argtypes = [
+                c_int,
+                array_1d_double,
+                c_int,
+                array_1d_double,
+                c_int,
+                array_1d_char,
+                array_1d_int,
+            ]
+        except AttributeError:
+            # library compiled without the bulk input, use the callbacks
+            self.set_bulk_input = None
+
+        # send the polymers as arrays, instead of a polyconf file
+        try:
+            self.set_bulk_polyconf = self.bob_lib.set_bulk_polyconf
+            self.set_bulk_polyconf.restype = None
+            self.set_bulk_polyconf.argtypes = [
+                c_int,
+                array_1d_int,
+                c_int,
+                array_1d_int,
+                array_1d_double,
+                array_1d_double,
+            ]
+        except AttributeError:
+            # library compiled without the in-memory polyconf
+            self.set_bulk_polyconf = None
 
         # ask BoB to stop calculations
         self.set_flag_stop_bob = self.bob_lib.set_flag_stop_bob
@@ -215,6 +264,38 @@ class BobCtypesHelper:
         self.cb_send_string = self.CB_FTYPE_NONE_PCHAR(self.send_string)
         self.bob_lib.def_get_string(self.cb_send_string)
 
+    def send_bulk_input(self):
+        """Send the 'virtual' inp and proto files, the filenames of polyconf inputs
+        and the polymer names to BoB as contiguous buffers. BoB then reads them
+        without calling Python for each item. If the library does not have the
+        bulk input, BoB uses the callbacks instead"""
+        if self.set_bulk_input is None:
+            return
+        th = self.parent_theory
+        inp = np.array(th.virtual_input_file, dtype=np.double)
+        proto = np.array(getattr(th, "virtual_proto_file", []), dtype=np.double)
+        # case 0: filenames containing polyconf input, case 1: polymer names
+        names = [(0, x) for x in getattr(th, "from_file_filename", [])]
+        names += [(1, x) for x in getattr(th, "protoname", [])]
+        codes = np.array([code for code, _ in names], dtype=np.intc)
+        chars = np.frombuffer(
+            b"".join(x.encode(CHARCODE) + b"\0" for _, x in names) + b"\0",
+            dtype=np.uint8,
+        )
+        self.set_bulk_input(len(inp), inp, len(proto), proto, len(names), chars, codes)
+        # polymers in memory (see react_ctypes_helper.polyconf_arrays), read by BoB
+        # instead of the polyconf file
+        polyconf = getattr(th, "polyconf", None)
+        if polyconf is not None and self.set_bulk_polyconf is not None:
+            self.set_bulk_polyconf(
+                len(polyconf["narms"]),
+                polyconf["narms"],
+                len(polyconf["armz"]),
+                polyconf["links"].reshape(-1),
+                polyconf["armz"],
+                polyconf["armwt"],
+            )
+
     def save_polyconf_and_return_gpc(self, arg_list, npol_tot):
         """Run BoB asking for a polyconf file only (no relaxation etc) and
         output the characteristics of the polymer configuration"""
@@ -229,6 +310,7 @@ class BobCtypesHelper:
         self.parent_theory.proto_counter = 0
         self.parent_theory.from_file_filename_counter = 0
         self.parent_theory.protoname_counter = 0
+        self.send_bulk_input()
 
         # prepare the arguments for GPC
         nbin = self.parent_theory.parameters[
@@ -237,10 +319,10 @@ class BobCtypesHelper:
         ncomp = c_int(-1)  # -1: all components
         ni = c_int(0)
         nf = c_int(npol_tot)  # all polymers
-        lgmid_arr = (c_double * nbin)()
-        wtbin_arr = (c_double * nbin)()
-        brbin_arr = (c_double * nbin)()
-        gbin_arr = (c_double * nbin)()
+        lgmid_arr = np.zeros(nbin)
+        wtbin_arr = np.zeros(nbin)
+        brbin_arr = np.zeros(nbin)
+        gbin_arr = np.zeros(nbin)
         mn = c_double()
         mw = c_double()
 
@@ -261,7 +343,7 @@ class BobCtypesHelper:
         ):
 
             # return results
-            arrs = [lgmid_arr[:], wtbin_arr[:], brbin_arr[:], gbin_arr[:]]
+            arrs = [lgmid_arr, wtbin_arr, brbin_arr, gbin_arr]
             return [mn.value, mw.value, arrs]
 
         # BoB encountered error
@@ -271,6 +353,7 @@ class BobCtypesHelper:
         """Run BoB LVE and copy results to arrays"""
         # virtual inp file
         self.parent_theory.inp_counter = 0
+        self.send_bulk_input()
         # prepare the arguments for bob_main function
         n_arg = len(arg_list)
         argv = (c_char_p * n_arg)()
@@ -281,13 +364,13 @@ class BobCtypesHelper:
         # call C function, return False if error in BoB
         out_size = c_int()
         if self.run_bob_lve(c_int(n_arg), argv, byref(out_size)):
-            # allocate Python memory for results and copy bob results
-            omega = (c_double * out_size.value)()
-            g_p = (c_double * out_size.value)()
-            g_pp = (c_double * out_size.value)()
+            # allocate NumPy memory for results and copy bob results
+            omega = np.zeros(out_size.value)
+            g_p = np.zeros(out_size.value)
+            g_pp = np.zeros(out_size.value)
 
             if self.get_bob_lve(omega, g_p, g_pp):
-                return [omega[:], g_p[:], g_pp[:]]
+                return [omega, g_p, g_pp]
 
         # BoB encountered error
         raise BobError
@@ -296,6 +379,7 @@ class BobCtypesHelper:
         """Run BoB NLVE and copy results to arrays"""
         # virtual inp file
         self.parent_theory.inp_counter = 0
+        self.send_bulk_input()
         # prepare the arguments for bob_main function
         n_arg = len(arg_list)
         argv = (c_char_p * n_arg)()
@@ -314,15 +398,15 @@ class BobCtypesHelper:
             c_bool(is_shear),
             byref(out_size),
         ):
-            # allocate Python memory for results and copy bob results
-            time_arr = (c_double * out_size.value)()
-            stress_arr = (c_double * out_size.value)()
-            N1_arr = (c_double * out_size.value)()
+            # allocate NumPy memory for results and copy bob results
+            time_arr = np.zeros(out_size.value)
+            stress_arr = np.zeros(out_size.value)
+            N1_arr = np.zeros(out_size.value)
 
             if self.get_bob_nlve_results(
                 time_arr, stress_arr, N1_arr, c_bool(is_shear)
             ):
-                return [time_arr[:], stress_arr[:]]
+                return [time_arr, stress_arr]
 
         # BoB encountered error
         raise BobError
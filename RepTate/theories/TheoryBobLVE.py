@@ -43,17 +43,22 @@ from RepTate.gui import Ui_bob_LVE
 import time
 
 import ctypes
+from RepTate.core.CmdBase import CmdBase, CalcMode
 from RepTate.theories.BobCtypesHelper import BobCtypesHelper, BobError
+from RepTate.theories import bob_runner, bob_cache
+import RepTate.theories.react_gui_tools as rgt
 from PySide6.QtWidgets import QApplication, QToolBar
-from PySide6.QtWidgets import QDialog, QFileDialog, QMessageBox
+from PySide6.QtWidgets import QDialog, QFileDialog, QMessageBox, QInputDialog
 from PySide6.QtGui import QDesktopServices, QIcon
-from PySide6.QtCore import QUrl, Signal, QSize
+from PySide6.QtCore import QUrl, Signal, QSize, QStandardPaths
 
 
 class TheoryBobLVE(QTheory):
     """Analyse the relaxation of polymers read from a polymer configuration file
     using BoB v2.5 (Chinmay Das and Daniel Read).
-    These files can be generated from the React application in RepTate.
+    These files can be generated from the React application in RepTate. The
+    polymers of a React theory open in RepTate can also be sent to BoB directly,
+    without writing a polyconf file.
 
     The original documentation of BoB can be found here: `<https://sourceforge.net/projects/bob-rheology/files/bob-rheology/bob2.3/bob2.3.pdf/download>`_.
     """
@@ -82,6 +87,16 @@ class TheoryBobLVE(QTheory):
         self.do_priority_seniority = False
         self.inp_counter = 0  # counter for the 'virtual' input file for BoB
         self.virtual_input_file = []  # 'virtual' input file for BoB
+        self.selected_react = None  # name of the React theory sending its polymers
+        self.polyconf = None  # polymers sent in memory to BoB
+        self.temp_polyconf = None  # temporary polyconf file written for BoB
+        self.stop_bob_flag = False  # kill the BoB worker process
+        self.bob_cache = bob_cache.BobResultCache(
+            os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.AppDataLocation),
+                "bob_cache",
+            )
+        )
 
         # add widgets specific to the theory
         self.selected_file = None
@@ -117,6 +132,28 @@ class TheoryBobLVE(QTheory):
         )
         self.selected_file = selected_file
         self.d.selected_file.setText(os.path.basename(selected_file))
+        if selected_file:
+            self.selected_react = None
+
+    def get_react_theory(self):
+        """Open a dialog to choose a React theory, whose polymers are sent to BoB
+        instead of reading a polyconf file"""
+        manager = self.parent_dataset.parent_application.parent_manager
+        theories = rgt.open_react_theories(manager)
+        if not theories:
+            QMessageBox.warning(
+                self,
+                "Select React Theory",
+                "No React theory with polymers found. Run a React simulation first",
+            )
+            return
+        item, ok = QInputDialog.getItem(
+            self, "Select React Theory", "React theory", list(theories), 0, False
+        )
+        if ok:
+            self.selected_react = item
+            self.selected_file = None
+            self.d.selected_file.setText(item)
 
     def num_file_lines(self, fname):
         """Return the number of lines in the file `fname`"""
@@ -133,6 +170,7 @@ class TheoryBobLVE(QTheory):
         self.dialog.ui.setupUi(self.dialog)
         self.d = self.dialog.ui
         self.d.pb_pick_file.clicked.connect(self.get_file_name)
+        self.d.pb_pick_react.clicked.connect(self.get_react_theory)
         self.d.selected_file.setStyleSheet("color : blue ;")
         # connect button OK
         self.d.pb_ok.clicked.connect(self.handle_pb_ok)
@@ -144,11 +182,11 @@ class TheoryBobLVE(QTheory):
 
     def handle_pb_ok(self):
         """Define the OK button role. If something is wrong, keep the dialog open"""
-        if self.selected_file is None:
+        if self.selected_file is None and self.selected_react is None:
             QMessageBox.warning(
                 self,
                 "Select Input Polyconf",
-                "Please select a file for BoB to read the polymer configuration",
+                "Please select a file or a React theory for BoB to read the polymer configuration",
             )
         else:
             self.dialog.accept()
@@ -215,6 +253,9 @@ class TheoryBobLVE(QTheory):
         if not self.dialog.exec_():
             self.success_dialog = False
             return
+        if self.selected_react is not None:
+            self.success_dialog = self.get_react_polyconf()
+            return
         conffile = self.selected_file
         if not self.is_ascii(conffile):
             # ok_path = os.path.join('theories', 'temp', 'target_polyconf.dat')
@@ -242,6 +283,42 @@ class TheoryBobLVE(QTheory):
         self.argv = ["./bob", "-i", inpf, "-c", conffile]
         self.success_dialog = True
 
+    def get_react_polyconf(self):
+        """Get the polymers of the selected React theory: in memory if the BoB
+        library can read them, else in a temporary polyconf file.
+        Return False if the theory has no polymers"""
+        manager = self.parent_dataset.parent_application.parent_manager
+        th = rgt.open_react_theories(manager).get(self.selected_react)
+        in_memory = self.bch.set_bulk_polyconf is not None
+        res = None if th is None else rgt.bob_polyconf(th, in_memory)
+        if res is None:
+            self.Qprint(
+                '<font color=red><b>No polymers in React theory "%s". Run or recalculate it first</b></font>'
+                % self.selected_react
+            )
+            return False
+        self.polyconf, self.temp_polyconf = res
+        inpf = "inpf.dat"  # dummy name, use virtual files now
+        if self.polyconf is not None:
+            nlines = len(self.polyconf["narms"]) + len(self.polyconf["armz"]) + 4
+            self.argv = ["./bob", "-i", inpf]
+        else:
+            nlines = self.num_file_lines(self.temp_polyconf)
+            self.argv = ["./bob", "-i", inpf, "-c", self.temp_polyconf]
+        self.create_bob_input_file(nlines, inpf)
+        self.Qprint("Polymers of React theory %s" % self.selected_react)
+        return True
+
+    def release_polyconf(self):
+        """Forget the polymers sent by a React theory once BoB has read them"""
+        self.polyconf = None
+        if self.temp_polyconf is not None:
+            try:
+                os.remove(self.temp_polyconf)
+            except OSError:
+                pass
+            self.temp_polyconf = None
+
     def is_ascii(self, s):
         """Check if `s` contains non ASCII characters"""
         try:
@@ -253,6 +330,7 @@ class TheoryBobLVE(QTheory):
     def request_stop_computations(self):
         """Called when user wants to terminate the current computation"""
         self.Qprint("<font color=red><b>Stop current calculation requested</b></font>")
+        self.stop_bob_flag = True
         self.bch.set_flag_stop_bob(ctypes.c_bool(True))
 
     def do_error(self, line=""):
@@ -279,19 +357,61 @@ class TheoryBobLVE(QTheory):
         if not self.success_dialog:
             self.Qprint("Operation cancelled")
             return
+        try:
+            self.run_bob_lve(tt, ft)
+        finally:
+            self.release_polyconf()
+
+    def run_bob_lve(self, tt, ft):
+        """Run BoB LVE (or read its results from the cache) and copy the results in
+        the theory table tt"""
         QApplication.processEvents()
-        self.bch.link_c_callback()
-        self.bch.set_do_priority_seniority(ctypes.c_bool(self.do_priority_seniority))
-        # Run BoB C++ code
         self.start_time_cal = time.time()
-        try:
-            omega, gp, gpp = self.bch.return_bob_lve(self.argv)
-        except BobError:
-            self.Qprint("Operation cancelled")
-            return
+        task = {
+            "kind": "lve",
+            "argv": self.argv,
+            "virtual_input_file": self.virtual_input_file,
+            "do_priority_seniority": self.do_priority_seniority,
+            "freqmin": self.freqmin,
+            "freqmax": self.freqmax,
+            "freqint": self.freqint,
+        }
+        if self.polyconf is not None:
+            task["polyconf"] = self.polyconf
+        key = bob_cache.task_key(task)
+        cached = None if key is None else self.bob_cache.get(key)
+        if cached is not None:
+            self.Qprint("BoB results read from cache")
+            omega, gp, gpp = cached
+        elif CmdBase.calcmode == CalcMode.multithread:
+            # Run BoB in a worker process, that can be killed if stuck
+            self.stop_bob_flag = False
+            res = bob_runner.run_bob(
+                [task],
+                on_message=lambda i, msg: self.Qprint(msg),
+                should_stop=lambda: self.stop_bob_flag,
+            )[0]
+            if res["data"] is None:
+                self.Qprint("<font color=red><b>%s</b></font>" % res["error"])
+                self.Qprint("Operation cancelled")
+                return
+            omega, gp, gpp = res["data"]
+        else:
+            self.bch.link_c_callback()
+            self.bch.set_do_priority_seniority(
+                ctypes.c_bool(self.do_priority_seniority)
+            )
+            # Run BoB C++ code
+            try:
+                omega, gp, gpp = self.bch.return_bob_lve(self.argv)
+            except BobError:
+                self.Qprint("Operation cancelled")
+                return
+        if cached is None and key is not None:
+            self.bob_cache.put(key, [omega, gp, gpp])
 
         # copy results to RepTate data file
-        if omega:
+        if len(omega):
             tt.num_columns = ft.num_columns
             tt.num_rows = len(omega)
             tt.data = np.zeros((tt.num_rows, tt.num_columns))
@@ -42,11 +42,13 @@ from RepTate.gui.QTheory import QTheory
 import time
 
 import ctypes
+from RepTate.core.CmdBase import CmdBase, CalcMode
 from RepTate.theories.BobCtypesHelper import BobCtypesHelper, BobError
+from RepTate.theories import bob_runner, bob_cache
 from PySide6.QtWidgets import QApplication, QToolBar, QToolButton, QMenu
 from PySide6.QtWidgets import QDialog, QFileDialog, QMessageBox
 from PySide6.QtGui import QDesktopServices, QIcon
-from PySide6.QtCore import QUrl, Signal, QSize
+from PySide6.QtCore import QUrl, Signal, QSize, QStandardPaths
 from RepTate.theories.theory_helpers import FlowMode
 from RepTate.gui import Ui_bob_LVE
 
@@ -87,6 +89,13 @@ class TheoryBobNLVE(QTheory):
         self.argv = None
         self.inp_counter = 0  # counter for the 'virtual' input file for BoB
         self.virtual_input_file = []  # 'virtual' input file for BoB
+        self.stop_bob_flag = False  # kill the BoB worker processes
+        self.bob_cache = bob_cache.BobResultCache(
+            os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.AppDataLocation),
+                "bob_cache",
+            )
+        )
 
         # temp_dir = os.path.join('theories', 'temp')
         # #create temp folder if does not exist
@@ -299,12 +308,65 @@ class TheoryBobNLVE(QTheory):
     def request_stop_computations(self):
         """Called when user wants to terminate the current computation"""
         self.Qprint("<font color=red><b>Stop current calculation requested</b></font>")
+        self.stop_bob_flag = True
         self.bch.set_flag_stop_bob(ctypes.c_bool(True))
 
     def do_error(self, line=""):
         """This theory does not calculate the error"""
         pass
 
+    def nlve_task(self, f):
+        """Message describing the BoB NLVE calculation of file f for a worker
+        process. The time range is the one of the theory of f (see theory_x)"""
+        t = self.theory_x(f)
+        return {
+            "kind": "nlve",
+            "argv": self.argv,
+            "virtual_input_file": self.virtual_input_file,
+            "do_priority_seniority": self.do_priority_seniority,
+            "freqmin": 1.0 / np.max(t),
+            "freqmax": 1.0 / np.min(t),
+            "freqint": self.freqint,
+            "flowrate": float(f.file_parameters["gdot"]),
+            "tmin": t[0],
+            "tmax": t[-1],
+            "is_shear": self.flow_mode == FlowMode.shear,
+        }
+
+    def run_all_flowrates(self):
+        """Run BoB NLVE for the files of the pass (calc_files, one per flow rate)
+        concurrently, each in its own worker process"""
+        files = self.calc_files
+        tasks = [self.nlve_task(f) for f in files]
+        results = self.run_tasks(tasks)
+        return {f.file_name_short: res for f, res in zip(files, results)}
+
+    def run_tasks(self, tasks):
+        """Run the BoB NLVE tasks concurrently, each in its own worker process, or
+        read their results from the cache. Return the list of results, with the
+        task of each result"""
+        keys = [bob_cache.task_key(task) for task in tasks]
+        results = [None] * len(files)
+        todo = []  # tasks not found in the cache
+        for i, key in enumerate(keys):
+            cached = None if key is None else self.bob_cache.get(key)
+            if cached is None:
+                todo.append(i)
+            else:
+                msg = "BoB results read from cache"
+                results[i] = {"data": cached, "error": None, "messages": [msg]}
+        self.stop_bob_flag = False
+        run = bob_runner.run_bob(
+            [tasks[i] for i in todo], should_stop=lambda: self.stop_bob_flag
+        )
+        for i, res in zip(todo, run):
+            results[i] = res
+            if res["data"] is not None and keys[i] is not None:
+                self.bob_cache.put(keys[i], res["data"])
+        for task, res in zip(tasks, results):
+            res["task"] = task
+        return results
+
     def calculate(self, f=None):
         """Create polymer configuration file and calculate distribution characteristics"""
         ft = f.data_table
@@ -326,26 +388,53 @@ class TheoryBobNLVE(QTheory):
             self.Qprint("Operation cancelled")
             return
         QApplication.processEvents()
-        self.bch.link_c_callback()
-        self.bch.set_do_priority_seniority(ctypes.c_bool(self.do_priority_seniority))
-
-        # Run BoB C++ code
-        self.start_time_cal = time.time()
-        flowrate = float(f.file_parameters["gdot"])
-        tmin = ft.data[0, 0]
-        tmax = ft.data[-1, 0]
-        is_shear = self.flow_mode == FlowMode.shear
-        self.Qprint("<hr><h3>rate %.3g s<sup>-1</sup></h3>" % flowrate)
-        try:
-            time_arr, stress_arr = self.bch.return_bob_nlve(
-                self.argv, flowrate, tmin, tmax, is_shear
-            )
-        except BobError:
-            self.Qprint("Operation cancelled")
-            return
+        task = self.nlve_task(f)
+        self.Qprint("<hr><h3>rate %.3g s<sup>-1</sup></h3>" % task["flowrate"])
+        if CmdBase.calcmode == CalcMode.multithread:
+            # the first file of a calculation pass runs all the flow rates at once
+            key = (self.start_time_cal, tuple(self.calc_files))
+            if self.batch_key != key:
+                self.batch_key = key
+                self.batch = self.run_all_flowrates()
+            res = self.batch.get(f.file_name_short)
+            if res is None or res["task"] != task:
+                # file calculated outside a pass (e.g. new dummy file)
+                res = self.run_tasks([task])[0]
+            for msg in res["messages"]:
+                self.Qprint(msg)
+            if res["data"] is None:
+                self.Qprint("<font color=red><b>%s</b></font>" % res["error"])
+                self.Qprint("Operation cancelled")
+                return
+            time_arr, stress_arr = res["data"]
+        else:
+            key = bob_cache.task_key(task)
+            cached = None if key is None else self.bob_cache.get(key)
+            if cached is not None:
+                self.Qprint("BoB results read from cache")
+                time_arr, stress_arr = cached
+            else:
+                self.bch.link_c_callback()
+                self.bch.set_do_priority_seniority(
+                    ctypes.c_bool(self.do_priority_seniority)
+                )
+                # Run BoB C++ code
+                try:
+                    time_arr, stress_arr = self.bch.return_bob_nlve(
+                        self.argv,
+                        task["flowrate"],
+                        task["tmin"],
+                        task["tmax"],
+                        task["is_shear"],
+                    )
+                except BobError:
+                    self.Qprint("Operation cancelled")
+                    return
+                if key is not None:
+                    self.bob_cache.put(key, [time_arr, stress_arr])
 
         # copy results to RepTate data file
-        if time:
+        if len(time_arr):
             tt.num_columns = ft.num_columns
             tt.num_rows = len(time_arr)
             tt.data = np.zeros((tt.num_rows, tt.num_columns))
@@ -244,16 +244,17 @@ class TheoryDSMLinear(QTheory):
 
         return [alpha, tau, alphaR, tauR, GR]
 
-    def supp_prod(self, tau, alpha, i):
-        """Returns the product operator used in the G* calculation"""
-        result = 1
-        for j in range(1, i + 1):
-            result *= tau[j] ** (alpha[j - 1] - alpha[j])
+    def supp_prod(self, tau, alpha):
+        """Returns the product operators used in the G* calculation, for all the clusters
 
-        return result
+        The i-th element is the product over j = 1..i of tau_j^(alpha_(j-1) - alpha_j)
+        """
+        prod = np.ones(len(alpha))
+        prod[1:] = np.cumprod(tau[1 : len(alpha)] ** (alpha[:-1] - alpha[1:]))
+        return prod
 
     def Gstar(self, omega, params, Rouse=False):
-        """Calculates G* using DSM or Rouse parameters"""
+        """Calculates G* using DSM or Rouse parameters, for an array of frequencies"""
 
         if Rouse:
             alpha = params[2]
@@ -263,59 +264,25 @@ class TheoryDSMLinear(QTheory):
             alpha = params[0]
             tau = params[1]
             G0 = params[5]
+        alpha = np.asarray(alpha, dtype=float)
+        tau = np.asarray(tau, dtype=float)
+        omega = np.asarray(omega, dtype=float)
+        prod = self.supp_prod(tau, alpha)
+
+        # hypergeometric terms of G' (exponent alpha + 2) and G'' (alpha + 1),
+        # at both ends of each cluster, as a single (n_omega x 4 n_cluster) array
+        a = np.concatenate((alpha + 2, alpha + 2, alpha + 1, alpha + 1))
+        t = np.concatenate((tau[1:], tau[:-1], tau[1:], tau[:-1]))
+        hyp = t**a * special.hyp2f1(
+            1, a / 2, (a + 2) / 2, -(omega[..., None] ** 2) * t**2
+        )
+        hyp = np.split(hyp, 4, axis=-1)
 
-        sumGp1 = 0
-        sumGp2 = 0
-        sumGdp1 = 0
-        sumGdp2 = 0
-        for i in range(0, len(alpha)):
-            sumGp1 += (self.supp_prod(tau, alpha, i) / (alpha[i] + 2)) * (
-                tau[i + 1] ** (alpha[i] + 2)
-                * special.hyp2f1(
-                    1,
-                    (alpha[i] + 2) / 2,
-                    (alpha[i] + 4) / 2,
-                    -(omega**2) * tau[i + 1] ** 2,
-                )
-                - tau[i] ** (alpha[i] + 2)
-                * special.hyp2f1(
-                    1,
-                    (alpha[i] + 2) / 2,
-                    (alpha[i] + 4) / 2,
-                    -(omega**2) * tau[i] ** 2,
-                )
-            )
-
-            sumGp2 += (
-                self.supp_prod(tau, alpha, i)
-                * (tau[i + 1] ** alpha[i] - tau[i] ** alpha[i])
-                / alpha[i]
-            )
-
-            sumGdp1 += (self.supp_prod(tau, alpha, i) / (alpha[i] + 1)) * (
-                tau[i + 1] ** (alpha[i] + 1)
-                * special.hyp2f1(
-                    1,
-                    (alpha[i] + 1) / 2,
-                    (alpha[i] + 3) / 2,
-                    -(omega**2) * tau[i + 1] ** 2,
-                )
-                - tau[i] ** (alpha[i] + 1)
-                * special.hyp2f1(
-                    1,
-                    (alpha[i] + 1) / 2,
-                    (alpha[i] + 3) / 2,
-                    -(omega**2) * tau[i] ** 2,
-                )
-            )
-
-            sumGdp2 += (
-                self.supp_prod(tau, alpha, i)
-                * (tau[i + 1] ** alpha[i] - tau[i] ** alpha[i])
-                / alpha[i]
-            )
-
-        return G0 * omega**2 * sumGp1 / sumGp2 + 1j * (G0 * omega * sumGdp1 / sumGdp2)
+        sumGp1 = np.dot(hyp[0] - hyp[1], prod / (alpha + 2))
+        sumGdp1 = np.dot(hyp[2] - hyp[3], prod / (alpha + 1))
+        sumG2 = np.sum(prod * (tau[1:] ** alpha - tau[:-1] ** alpha) / alpha)
+
+        return G0 * omega**2 * sumGp1 / sumG2 + 1j * (G0 * omega * sumGdp1 / sumG2)
 
     def do_error(self, line):
         """Report the error of the current theory
@@ -409,15 +376,13 @@ class TheoryDSMLinear(QTheory):
         G0 = rho0 * R * T / Mw
         params.append(G0)
 
-        Gstar_vec = np.vectorize(self.Gstar, excluded=["Rouse", "params"])
-
         CFSM = (
             0.5
             * (Nc - 3)
-            * Gstar_vec(omega=tt.data[:, 0] * tau_c, params=params, Rouse=False)
+            * self.Gstar(omega=tt.data[:, 0] * tau_c, params=params, Rouse=False)
         )
         prefactor = G0 * ((N_K + beta) / (beta + 1))
-        Rouse = prefactor * Gstar_vec(
+        Rouse = prefactor * self.Gstar(
             omega=(tt.data[:, 0] * tau_K * (beta**2)), params=params, Rouse=True
         )
 
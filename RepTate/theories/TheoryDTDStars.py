@@ -120,7 +120,6 @@ class TheoryDTDStarsFreq(QTheory):
         self.alpha = self.parameters["alpha"].value
         self.Z = 1
         self.w = 0
-
     def calculate(self, f=None):
         """DTDStarsFreq function"""
         ft = f.data_table
@@ -139,8 +138,14 @@ class TheoryDTDStarsFreq(QTheory):
             return
         # self.Z = int(np.rint(Mw / self.Me))
         omega = ft.data[:, 0]
-        params = [self.G0, self.alpha, self.tau_e, Mw / self.Me, omega]
-        gp, gpp, success = dtdh.calculate_dtd_freq(params, self.eps)
+        gp, gpp, success = self.calculate_batched(
+            f,
+            Mw,
+            (self.G0, self.tau_e, self.Me, self.alpha, self.eps),
+            lambda Mw, x: [self.G0, self.alpha, self.tau_e, Mw / self.Me, x],
+            lambda params: dtdh.calculate_dtd_freq_batch(params, self.eps),
+            lambda params: dtdh.calculate_dtd_freq(params, self.eps),
+        )
         if not success:
             self.Qprint("Too many steps in routine qtrap")
             return
@@ -229,7 +234,6 @@ class TheoryDTDStarsTime(QTheory):
         self.tau_e = self.parameters["tau_e"].value
         self.Me = self.parameters["Me"].value
         self.alpha = self.parameters["alpha"].value
-
     def calculate(self, f=None):
         """DTDStarsTime function"""
         ft = f.data_table
@@ -254,8 +258,14 @@ class TheoryDTDStarsTime(QTheory):
             gamma = 1
         # self.Z = int(np.rint(Mw / self.Me))
         times = ft.data[:, 0]
-        params = [self.G0, self.alpha, self.tau_e, Mw / self.Me, times]
-        gt, success = dtdh.calculate_dtd_time(params, self.eps)
+        gt, success = self.calculate_batched(
+            f,
+            Mw,
+            (self.G0, self.tau_e, self.Me, self.alpha, self.eps),
+            lambda Mw, x: [self.G0, self.alpha, self.tau_e, Mw / self.Me, x],
+            lambda params: dtdh.calculate_dtd_time_batch(params, self.eps),
+            lambda params: dtdh.calculate_dtd_time(params, self.eps),
+        )
         if not success:
             self.Qprint("Too many steps in routine qtrap")
             return
@@ -43,6 +43,7 @@ from PySide6.QtWidgets import QToolBar, QSpinBox
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
 from RepTate.core.DraggableArtists import DragType, DraggableModesSeries
+from RepTate.theories.theory_helpers import KernelCache, mode_values
 
 
 class TheoryDebyeModesFrequency(QTheory):
@@ -75,6 +76,7 @@ class TheoryDebyeModesFrequency(QTheory):
         """**Constructor**"""
         super().__init__(name, parent_dataset, ax)
         self.function = self.DebyeModesFrequency
+        self.kernel_cache = KernelCache()
         self.has_modes = False
         self.MAX_MODES = 40
         self.view_modes = True
@@ -298,15 +300,21 @@ class TheoryDebyeModesFrequency(QTheory):
         )
         tau = 1.0 / freq
 
-        tt.data[:, 1] += einf
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            wT = tt.data[:, 0] * tau[i]
-            wTsq = wT ** 2
-            eps = np.power(10, self.parameters["logDe%02d" % i].value)
-            tt.data[:, 1] += eps * 1 / (1 + wTsq)
-            tt.data[:, 2] += eps * wT / (1 + wTsq)
+        if self.stop_theory_flag:
+            return
+        eps = mode_values(self.parameters, "logDe%02d", nmodes)
+        K1, K2 = self.kernel_cache.get(
+            f.file_name_short, tt.data[:, 0], tau, self.kernel
+        )
+        tt.data[:, 1] = einf + K1 @ eps
+        tt.data[:, 2] = K2 @ eps
+
+    @staticmethod
+    def kernel(w, tau):
+        """Real and imaginary kernels of the Debye modes, (npoints x nmodes) matrices"""
+        wT = np.outer(w, tau)
+        wTsq = wT**2
+        return 1 / (1 + wTsq), wT / (1 + wTsq)
 
     def plot_theory_stuff(self):
         """Plot theory graphic modes"""
@@ -35,15 +35,14 @@
 
 """
 import numpy as np
-import time
 from RepTate.core.Parameter import Parameter, ParameterType, OptType
 from RepTate.gui.QTheory import QTheory
-from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Signal
 
 import ctypes as ct
 import RepTate.theories.react_ctypes_helper as rch
 import RepTate.theories.react_gui_tools as rgt
+import RepTate.theories.react_ensemble as rens
 
 
 class TheoryDieneCSTR(QTheory):
@@ -161,7 +160,7 @@ class TheoryDieneCSTR(QTheory):
             name="num_to_make",
             value=1000,
             min_value=0,
-            description="Number of molecules made in the simulation",
+            description="Number of molecules made in the simulation (maximum if tol > 0)",
             type=ParameterType.real,
             opt_type=OptType.const,
         )
@@ -189,6 +188,22 @@ class TheoryDieneCSTR(QTheory):
             type=ParameterType.real,
             opt_type=OptType.const,
         )
+        self.parameters["nproc"] = Parameter(
+            name="nproc",
+            value=1,
+            description="Number of processes making the polymers (if >1, only their statistics are kept)",
+            type=ParameterType.integer,
+            opt_type=OptType.const,
+            min_value=1,
+        )
+        self.parameters["tol"] = Parameter(
+            name="tol",
+            value=0,
+            description="Stop making polymers when the relative change of MWD, Mn, Mw and Br/1000C is below tol (0: make num_to_make polymers; single process only)",
+            type=ParameterType.real,
+            opt_type=OptType.const,
+            min_value=0,
+        )
 
         self.signal_request_dist.connect(rgt.request_more_dist)
         self.signal_request_polymer.connect(rgt.request_more_polymer)
@@ -263,7 +278,7 @@ class TheoryDieneCSTR(QTheory):
         tt.data = np.zeros((tt.num_rows, tt.num_columns))
 
         if not self.dist_exists:
-            success = rch.request_dist(ct.byref(c_ndist))
+            success = rgt.request_dist(self, c_ndist)
             self.ndist = c_ndist.value
             if not success:
                 # launch dialog asking for more dist
@@ -287,97 +302,53 @@ class TheoryDieneCSTR(QTheory):
         if self.simexists:
             rch.return_dist_polys(ct.c_int(ndist))
 
-        # initialise diene batch
         ldiene = self.M_diene / monmass
-        rch.dieneCSTRstart(
-            ct.c_double(tau),
-            ct.c_double(kpM),
-            ct.c_double(kDLCB),
-            ct.c_double(kpLCB),
-            ct.c_double(kpD),
-            ct.c_double(keq),
-            ct.c_double(ks),
-            ct.c_double(D0),
-            ct.c_double(C0),
-            ct.c_double(ldiene),
-            ct.c_double(col_time),
-            ct.c_int(ndist),
-        )
-        rch.react_dist[ndist].contents.npoly = 0
-
-        c_m = ct.c_int()
-
-        # make numtomake polymers
-        i = 0
-        n_gel = 0
-        rate_print = np.trunc(numtomake / 20)
-        self.Qprint("Making polymers:")
-        self.Qprint("0% ", end="")
-        while i < numtomake:
-            if self.stop_theory_flag:
-                self.Qprint(
-                    "<br><big><font color=red><b>Polymer creation stopped by user</b></font></big>"
-                )
-                break
-            # get a polymer
-            success = rch.request_poly(ct.byref(c_m))
-            m = c_m.value
-            if success:  # check availability of polymers
-                # put it in list
-                # case of first polymer made
-                if rch.react_dist[ndist].contents.npoly == 0:
-                    rch.react_dist[ndist].contents.first_poly = m
-                    # br_poly[m].contents.nextpoly = 0
-                    rch.set_br_poly_nextpoly(ct.c_int(m), ct.c_int(0))
-                else:  # next polymer, put to top of list
-                    # br_poly[m].contents.nextpoly = rch.react_dist[ndist].contents.first_poly
-                    rch.set_br_poly_nextpoly(
-                        ct.c_int(m), ct.c_int(rch.react_dist[ndist].contents.first_poly)
-                    )
-                    rch.react_dist[ndist].contents.first_poly = m
-
-                # make a polymer
-                # routine returns false if arms ran out
-                if rch.dieneCSTR(ct.c_int(m), ct.c_int(ndist)):
-                    rch.react_dist[ndist].contents.npoly += 1
-                    i += 1
-                    # check for error
-                    if rch.dCSTR_global.dieneCSTRerrorflag:
-                        n_gel += 1
-                        rch.dCSTR_global.dieneCSTRerrorflag = False
-                        # self.Qprint(
-                        #     '<br><big><font color=red><b>Polymers too large: gelation occurs for these parameters</b></font></big>'
-                        # )
-                        # i = numtomake
-                else:  # error message if we ran out of arms
-                    self.success_increase_memory = None
-                    self.signal_request_arm.emit(self)
-                    # wait for the end of QDialog
-                    while self.success_increase_memory is None:
-                        # TODO: find a better way to wait for the dialog thread to finish
-                        time.sleep(0.5)
-                    if self.success_increase_memory:
-                        continue  # back to the start of while loop
-                    else:
-                        i = numtomake
-                        rch.dCSTR_global.dieneCSTRerrorflag = True
-
-                # update on number made
-                if i % rate_print == 0:
-                    self.Qprint("-", end="")
-                    # needed to use Qprint if in single-thread
-                    QApplication.processEvents()
-
-            else:  # polymer wasn't available
-                self.success_increase_memory = None
-                self.signal_request_polymer.emit(self)
-                while self.success_increase_memory is None:
-                    # TODO: find a better way to wait for the dialog thread to finish
-                    time.sleep(0.5)
-                if self.success_increase_memory:
-                    continue
-                else:
-                    i = numtomake
+        c_ngel = ct.c_int(0)
+        nproc = int(np.round(self.parameters["nproc"].value))
+        ensemble = nproc > 1 and rens.available()
+        if nproc > 1 and not ensemble:
+            self.Qprint(
+                "<font color=orange><b>The React library cannot merge parallel "
+                "simulations: running on 1 process</b></font>"
+            )
+        if ensemble:
+            # share the polymers to make between worker processes
+            rch.dCSTR_global.dieneCSTRerrorflag = False
+            rch.react_dist[ndist].contents.npoly = 0
+            args = (tau, kpM, kDLCB, kpLCB, kpD, keq, ks, D0, C0, ldiene, col_time)
+            status = rgt.make_polymers_ensemble(
+                self, "dieneCSTR", args, ndist, numtomake, nproc, c_ngel
+            )
+        else:
+            # initialise diene batch
+            rch.dieneCSTRstart(
+                ct.c_double(tau),
+                ct.c_double(kpM),
+                ct.c_double(kDLCB),
+                ct.c_double(kpLCB),
+                ct.c_double(kpD),
+                ct.c_double(keq),
+                ct.c_double(ks),
+                ct.c_double(D0),
+                ct.c_double(C0),
+                ct.c_double(ldiene),
+                ct.c_double(col_time),
+                ct.c_int(ndist),
+            )
+            rch.react_dist[ndist].contents.npoly = 0
+
+            # make numtomake polymers
+            status = rgt.make_polymers(
+                self,
+                lambda n: rch.dieneCSTR_make(n, ndist, c_ngel),
+                numtomake,
+                ndist,
+                self.parameters["tol"].value,
+            )
+        if status == rch.MAKE_POLYS_NO_ARM or (
+            ensemble and status != rch.MAKE_POLYS_DONE
+        ):  # user declined to add arm records, or ensemble failed
+            rch.dCSTR_global.dieneCSTRerrorflag = True
         # end make polymers loop
         if not rch.dCSTR_global.dieneCSTRerrorflag:
             self.Qprint("&nbsp;100%")
@@ -385,7 +356,8 @@ class TheoryDieneCSTR(QTheory):
         calc = 0
         # do analysis of polymers made
         if rch.react_dist[ndist].contents.npoly:
-            rch.molbin(ndist)
+            if not ensemble:  # ensemble: already binned
+                rch.molbin(ndist)
             ft = f.data_table
 
             # resize theory data table
@@ -395,23 +367,18 @@ class TheoryDieneCSTR(QTheory):
             tt.num_rows = rch.react_dist[ndist].contents.nummwdbins
             tt.data = np.zeros((tt.num_rows, tt.num_columns))
 
-            for i in range(1, rch.react_dist[ndist].contents.nummwdbins + 1):
-                tt.data[i - 1, 0] = np.power(
-                    10, rch.react_dist[ndist].contents.lgmid[i]
-                )
-                tt.data[i - 1, 1] = rch.react_dist[ndist].contents.wt[i]
-                tt.data[i - 1, 2] = rch.react_dist[ndist].contents.avg[i]
-                tt.data[i - 1, 3] = rch.react_dist[ndist].contents.avbr[i]
+            tt.data[:, :4] = rch.mwd_table(ndist)
             rch.end_print(self, ndist, self.do_priority_seniority)
             rch.prio_and_senio(self, f, ndist, self.do_priority_seniority)
 
             calc = rch.react_dist[ndist].contents.nummwdbins - 1
-            rch.react_dist[ndist].contents.polysaved = True
-        self.simexists = True
-        if n_gel != 0:
+            rch.react_dist[ndist].contents.polysaved = not ensemble
+        # the polymers of an ensemble simulation stay in the workers
+        self.simexists = not ensemble
+        if c_ngel.value != 0:
             self.Qprint(
                 "<br><big><font color=red><b>Gelation might occurs for these parameters.<br>%.3g%% of the molecules exceeded the maximum recursion level</b></font></big>"
-                % (n_gel / numtomake * 100.0)
+                % (c_ngel.value / numtomake * 100.0)
             )
         return calc
 
@@ -43,6 +43,7 @@ from PySide6.QtWidgets import QToolBar, QSpinBox
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
 from RepTate.core.DraggableArtists import DragType, DraggableModesSeries
+from RepTate.theories.theory_helpers import KernelCache, mode_values
 
 
 class TheoryHavriliakNegamiModesFrequency(QTheory):
@@ -74,6 +75,7 @@ class TheoryHavriliakNegamiModesFrequency(QTheory):
         """**Constructor**"""
         super().__init__(name, parent_dataset, ax)
         self.function = self.HavriliakNegamiModesFrequency
+        self.kernel_cache = KernelCache()
         self.has_modes = False
         self.MAX_MODES = 40
         self.view_modes = True
@@ -315,19 +317,22 @@ class TheoryHavriliakNegamiModesFrequency(QTheory):
         )
         tau = 1.0 / freq
 
-        sol = np.zeros(tt.num_rows, dtype="complex128")
-        sol += einf
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            eps = np.power(10, self.parameters["logDe%02d" % i].value)
-            sol += eps / np.power(
-                1.0 + np.power(1j * tt.data[:, 0] * tau[i], alpha), gamma
-            )
+        if self.stop_theory_flag:
+            return
+        eps = mode_values(self.parameters, "logDe%02d", nmodes)
+        K = self.kernel_cache.get(
+            f.file_name_short, tt.data[:, 0], tau, self.kernel, alpha, gamma
+        )
+        sol = einf + K @ eps
 
         tt.data[:, 1] = np.real(sol)
         tt.data[:, 2] = -np.imag(sol)
 
+    @staticmethod
+    def kernel(w, tau, alpha, gamma):
+        """Complex kernel of the Havriliak-Negami modes, (npoints x nmodes) matrix"""
+        return 1.0 / np.power(1.0 + np.power(1j * np.outer(w, tau), alpha), gamma)
+
     def plot_theory_stuff(self):
         """Plot graphical helpers"""
         # if not self.view_modes:
@@ -44,7 +44,7 @@ from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
 from RepTate.core.DraggableArtists import DragType, DraggableModesSeries
 
-from RepTate.theories.kww_ctypes_helper import kwwc, kwws
+from RepTate.theories.kww_ctypes_helper import kwwc_array, kwws_array, KWWTable
 
 
 class TheoryKWWModesFrequency(QTheory):
@@ -130,6 +130,14 @@ class TheoryKWWModesFrequency(QTheory):
             opt_type=OptType.const,
             display_flag=False,
         )
+        self.parameters["kwwtable"] = Parameter(
+            name="kwwtable",
+            value=False,
+            description="Interpolate the KWW transforms from a cached table",
+            type=ParameterType.boolean,
+            opt_type=OptType.const,
+        )
+        self.kww_table = KWWTable()
         # Interpolate modes from data
         w = np.logspace(np.log10(wmin), np.log10(wmax), nmodes)
         eps = np.abs(
@@ -316,14 +324,19 @@ class TheoryKWWModesFrequency(QTheory):
         )
         tau = 1.0 / freq
 
-        tt.data[:, 1] += einf
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            eps = np.power(10, self.parameters["logDe%02d" % i].value)
-            for j, w in enumerate(tt.data[:, 0]):
-                tt.data[j, 1] += eps * kwwc(w * tau[i], beta)
-                tt.data[j, 2] += eps * kwws(w * tau[i], beta)
+        if self.stop_theory_flag:
+            return
+        eps = np.power(
+            10, [self.parameters["logDe%02d" % i].value for i in range(nmodes)]
+        )
+        wtau = np.outer(tt.data[:, 0], tau)  # (npoints x nmodes)
+        if self.parameters["kwwtable"].value:
+            c, s = self.kww_table.kwwc_kwws(wtau, beta)
+        else:
+            c = kwwc_array(wtau, beta)
+            s = kwws_array(wtau, beta)
+        tt.data[:, 1] = einf + c @ eps
+        tt.data[:, 2] = s @ eps
 
     def plot_theory_stuff(self):
         """Plot theory helpers"""
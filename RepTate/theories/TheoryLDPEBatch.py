@@ -36,15 +36,14 @@
 TobitaBatch file for creating a new theory
 """
 import numpy as np
-import time
 from RepTate.core.Parameter import Parameter, ParameterType, OptType
 from RepTate.gui.QTheory import QTheory
 from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QApplication
 
 import ctypes as ct
 import RepTate.theories.react_ctypes_helper as rch
 import RepTate.theories.react_gui_tools as rgt
+import RepTate.theories.react_ensemble as rens
 
 
 class TheoryTobitaBatch(QTheory):
@@ -127,7 +126,7 @@ class TheoryTobitaBatch(QTheory):
         self.parameters["num_to_make"] = Parameter(
             name="num_to_make",
             value=1000,
-            description="Number of molecules made in the simulation",
+            description="Number of molecules made in the simulation (maximum if tol > 0)",
             type=ParameterType.real,
             opt_type=OptType.const,
         )
@@ -152,6 +151,22 @@ class TheoryTobitaBatch(QTheory):
             type=ParameterType.real,
             opt_type=OptType.const,
         )
+        self.parameters["nproc"] = Parameter(
+            name="nproc",
+            value=1,
+            description="Number of processes making the polymers (if >1, only their statistics are kept)",
+            type=ParameterType.integer,
+            opt_type=OptType.const,
+            min_value=1,
+        )
+        self.parameters["tol"] = Parameter(
+            name="tol",
+            value=0,
+            description="Stop making polymers when the relative change of MWD, Mn, Mw and Br/1000C is below tol (0: make num_to_make polymers; single process only)",
+            type=ParameterType.real,
+            opt_type=OptType.const,
+            min_value=0,
+        )
 
         self.signal_request_dist.connect(rgt.request_more_dist)
         self.signal_request_polymer.connect(rgt.request_more_polymer)
@@ -219,7 +234,7 @@ class TheoryTobitaBatch(QTheory):
         tt.data = np.zeros((tt.num_rows, tt.num_columns))
 
         if not self.dist_exists:
-            success = rch.request_dist(ct.byref(c_ndist))
+            success = rgt.request_dist(self, c_ndist)
             self.ndist = c_ndist.value
             if not success:  # no dist available
                 # launch dialog asking for more dist
@@ -242,93 +257,44 @@ class TheoryTobitaBatch(QTheory):
 
         if self.simexists:
             rch.return_dist_polys(ct.c_int(ndist))
-        # initialise tobita batch
-        rch.tobbatchstart(
-            ct.c_double(fin_conv),
-            ct.c_double(tau),
-            ct.c_double(beta),
-            ct.c_double(Cs),
-            ct.c_double(Cb),
-            ct.c_int(ndist),
-        )
-        rch.react_dist[ndist].contents.npoly = 0
-
-        c_m = ct.c_int()
-
-        # make numtomake polymers
-        i = 0
-        rate_print = np.trunc(numtomake / 20)
-        self.Qprint("Making polymers:")
-        self.Qprint("0% ", end="")
-        while i < numtomake:
-            if self.stop_theory_flag:
-                self.Qprint(
-                    "<br><big><font color=red><b>Polymer creation stopped by user</b></font></big>"
-                )
-                break
-            # get a polymer
-            success = rch.request_poly(ct.byref(c_m))
-            m = c_m.value
-            if success:  # check availability of polymers
-                # put it in list
-
-                if (
-                    rch.react_dist[ndist].contents.npoly == 0
-                ):  # case of first polymer made
-                    rch.react_dist[ndist].contents.first_poly = m
-                    rch.set_br_poly_nextpoly(
-                        ct.c_int(m), ct.c_int(0)
-                    )  # br_poly[m].contents.nextpoly = 0
-                else:  # next polymer, put to top of list
-                    rch.set_br_poly_nextpoly(
-                        ct.c_int(m), ct.c_int(rch.react_dist[ndist].contents.first_poly)
-                    )  # br_poly[m].contents.nextpoly = rch.react_dist[ndist].contents.first_poly
-                    rch.react_dist[ndist].contents.first_poly = m
-
-                # make a polymer
-                if rch.tobbatch(
-                    ct.c_int(m), ct.c_int(ndist)
-                ):  # routine returns false if arms ran out
-                    rch.react_dist[ndist].contents.npoly += 1
-                    i += 1
-                    # check for error
-                    if rch.tb_global.tobitabatcherrorflag:
-                        self.Qprint(
-                            "<br><big><font color=red><b>Polymers too large: gelation occurs for these parameters</b></font></big>"
-                        )
-                        i = numtomake
-                else:  # error message if we ran out of arms
-                    self.success_increase_memory = None
-                    self.signal_request_arm.emit(self)
-                    while (
-                        self.success_increase_memory is None
-                    ):  # wait for the end of QDialog
-                        time.sleep(
-                            0.5
-                        )  # TODO: find a better way to wait for the dialog thread to finish
-                    if self.success_increase_memory:
-                        continue  # back to the start of while loop
-                    else:
-                        i = numtomake
-                        rch.tb_global.tobitabatcherrorflag = True
-
-                # update on number made
-                if i % rate_print == 0:
-                    self.Qprint("-", end="")
-                    # needed to use Qprint if in single-thread
-                    QApplication.processEvents()
-
-            else:  # polymer wasn't available
-                self.success_increase_memory = None
-                self.signal_request_polymer.emit(self)
-                while self.success_increase_memory is None:
-                    time.sleep(
-                        0.5
-                    )  # TODO: find a better way to wait for the dialog thread to finish
-                if self.success_increase_memory:
-                    continue
-                else:
-                    i = numtomake
+        nproc = int(np.round(self.parameters["nproc"].value))
+        ensemble = nproc > 1 and rens.available()
+        if nproc > 1 and not ensemble:
+            self.Qprint(
+                "<font color=orange><b>The React library cannot merge parallel "
+                "simulations: running on 1 process</b></font>"
+            )
+        if ensemble:
+            # share the polymers to make between worker processes
+            rch.tb_global.tobitabatcherrorflag = False
+            rch.react_dist[ndist].contents.npoly = 0
+            status = rgt.make_polymers_ensemble(
+                self, "tobbatch", (fin_conv, tau, beta, Cs, Cb), ndist, numtomake, nproc
+            )
+        else:
+            # initialise tobita batch
+            rch.tobbatchstart(
+                ct.c_double(fin_conv),
+                ct.c_double(tau),
+                ct.c_double(beta),
+                ct.c_double(Cs),
+                ct.c_double(Cb),
+                ct.c_int(ndist),
+            )
+            rch.react_dist[ndist].contents.npoly = 0
+
+            # make numtomake polymers
+            status = rgt.make_polymers(
+                self,
+                lambda n: rch.tobbatch_make(n, ndist),
+                numtomake,
+                ndist,
+                self.parameters["tol"].value,
+            )
+        if status == rch.MAKE_POLYS_NO_ARM or (
+            ensemble and status != rch.MAKE_POLYS_DONE
+        ):  # user declined to add arm records, or ensemble failed
+            rch.tb_global.tobitabatcherrorflag = True
         # end make polymers loop
         if not rch.tb_global.tobitabatcherrorflag:
             self.Qprint("&nbsp;100%")
@@ -338,7 +304,8 @@ class TheoryTobitaBatch(QTheory):
         if (rch.react_dist[ndist].contents.npoly >= 100) and (
             not rch.tb_global.tobitabatcherrorflag
         ):
-            rch.molbin(ndist)
+            if not ensemble:  # ensemble: already binned
+                rch.molbin(ndist)
             # resize theory datatable
             ft = f.data_table
             ft = f.data_table
@@ -347,21 +314,16 @@ class TheoryTobitaBatch(QTheory):
             tt.num_rows = rch.react_dist[ndist].contents.nummwdbins
             tt.data = np.zeros((tt.num_rows, tt.num_columns))
 
-            for i in range(1, rch.react_dist[ndist].contents.nummwdbins + 1):
-                tt.data[i - 1, 0] = np.power(
-                    10, rch.react_dist[ndist].contents.lgmid[i]
-                )
-                tt.data[i - 1, 1] = rch.react_dist[ndist].contents.wt[i]
-                tt.data[i - 1, 2] = rch.react_dist[ndist].contents.avg[i]
-                tt.data[i - 1, 3] = rch.react_dist[ndist].contents.avbr[i]
+            tt.data[:, :4] = rch.mwd_table(ndist)
 
             rch.end_print(self, ndist, self.do_priority_seniority)
             rch.prio_and_senio(self, f, ndist, self.do_priority_seniority)
 
             calc = rch.react_dist[ndist].contents.nummwdbins - 1
-            rch.react_dist[ndist].contents.polysaved = True
+            rch.react_dist[ndist].contents.polysaved = not ensemble
 
-        self.simexists = True
+        # the polymers of an ensemble simulation stay in the workers
+        self.simexists = not ensemble
         # self.Qprint(
         # '%d arm records left in memory' % rch.pb_global.arms_left)
         return calc
@@ -43,6 +43,7 @@ from PySide6.QtWidgets import QToolBar, QSpinBox
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
 from RepTate.core.DraggableArtists import DragType, DraggableModesSeries
+from RepTate.theories.theory_helpers import KernelCache, mode_values
 
 
 class TheoryMaxwellModesFrequency(QTheory):
@@ -74,6 +75,7 @@ class TheoryMaxwellModesFrequency(QTheory):
         """**Constructor**"""
         super().__init__(name, parent_dataset, ax)
         self.function = self.MaxwellModesFrequency
+        self.kernel_cache = KernelCache()
         self.has_modes = True
         self.MAX_MODES = 40
         self.view_modes = True
@@ -350,15 +352,22 @@ class TheoryMaxwellModesFrequency(QTheory):
                 nmodes,
             )
         tau = 1.0 / freq
+        if self.stop_theory_flag:
+            return
 
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            wT = tt.data[:, 0] * tau[i]
-            wTsq = wT**2
-            G = np.power(10, self.parameters["logG%02d" % i].value)
-            tt.data[:, 1] += G * wTsq / (1 + wTsq)
-            tt.data[:, 2] += G * wT / (1 + wTsq)
+        G = mode_values(self.parameters, "logG%02d", nmodes)
+        K1, K2 = self.kernel_cache.get(
+            f.file_name_short, tt.data[:, 0], tau, self.kernel
+        )
+        tt.data[:, 1] = K1 @ G
+        tt.data[:, 2] = K2 @ G
+
+    @staticmethod
+    def kernel(w, tau):
+        """Storage and loss kernels of the Maxwell modes, (npoints x nmodes) matrices"""
+        wT = np.outer(w, tau)
+        wTsq = wT**2
+        return wTsq / (1 + wTsq), wT / (1 + wTsq)
 
     def plot_theory_stuff(self):
         """Plot theory helpers"""
@@ -433,6 +442,7 @@ class TheoryMaxwellModesTime(QTheory):
         """**Constructor**"""
         super().__init__(name, parent_dataset, ax)
         self.function = self.MaxwellModesTime
+        self.kernel_cache = KernelCache()
         self.has_modes = True
         self.MAX_MODES = 40
         self.view_modes = True
@@ -699,12 +709,16 @@ class TheoryMaxwellModesTime(QTheory):
                 nmodes,
             )
 
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            expT_tau = np.exp(-tt.data[:, 0] / tau[i])
-            G = np.power(10, self.parameters["logG%02d" % i].value)
-            tt.data[:, 1] += G * expT_tau * gamma
+        if self.stop_theory_flag:
+            return
+        G = mode_values(self.parameters, "logG%02d", nmodes)
+        K = self.kernel_cache.get(f.file_name_short, tt.data[:, 0], tau, self.kernel)
+        tt.data[:, 1] = gamma * (K @ G)
+
+    @staticmethod
+    def kernel(t, tau):
+        """Relaxation kernel of the Maxwell modes, (npoints x nmodes) matrix"""
+        return np.exp(-np.divide.outer(t, tau))
 
     def plot_theory_stuff(self):
         """Plot theory helpers"""
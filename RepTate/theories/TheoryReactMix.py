@@ -82,6 +82,7 @@ class TheoryReactMix(QTheory):
         self.n_inmix = 0  # number of theories in mix
         self.theory_names = []  # names of theories in mix
         self.theory_simnumber = []  # 'react_dist[].simnumber' of theories in mix
+        self.mix_cache = {}  # limits and bins of the dists, see mix_components
         self.calcexists = False
         self.do_priority_seniority = False
         self.signal_mix_dialog.connect(rgt.launch_mix_dialog)
@@ -150,23 +151,30 @@ class TheoryReactMix(QTheory):
             return
 
         # do multiple binning based on form results
-        c_weights = (ct.c_double * self.n_inmix)()
-        c_dists = (ct.c_int * self.n_inmix)()
-        for i in range(self.n_inmix):
-            c_weights[i] = ct.c_double(float(self.weights[i]))
-            c_dists[i] = ct.c_int(int(self.dists[i]))
-        rch.multimolbin(ct.c_int(nbins), c_weights, c_dists, ct.c_int(self.n_inmix))
+        weights = [float(w) for w in self.weights]
+        if rch.mix_component_bins is not None and rch.molbin_limits is not None:
+            mwd, m_n, m_w, brav = self.mix_components(nbins, weights)
+        else:
+            c_weights = (ct.c_double * self.n_inmix)(*weights)
+            c_dists = (ct.c_int * self.n_inmix)(*[int(d) for d in self.dists])
+            rch.multimolbin(
+                ct.c_int(nbins), c_weights, c_dists, ct.c_int(self.n_inmix)
+            )
+            mwd = np.zeros((rch.bab_global.multi_nummwdbins, 4))
+            for i in range(1, rch.bab_global.multi_nummwdbins + 1):
+                c_i = ct.c_int(i)
+                mwd[i - 1, 0] = np.power(10, rch.return_binsandbob_multi_lgmid(c_i))
+                mwd[i - 1, 1] = rch.return_binsandbob_multi_wt(c_i)
+                mwd[i - 1, 2] = rch.return_binsandbob_multi_avg(c_i)
+                mwd[i - 1, 3] = rch.return_binsandbob_multi_avbr(c_i)
+            m_n = rch.bab_global.multi_m_n
+            m_w = rch.bab_global.multi_m_w
+            brav = rch.bab_global.multi_brav
 
         # resize theory data table
-        tt.num_rows = rch.bab_global.multi_nummwdbins
+        tt.num_rows = len(mwd)
         tt.data = np.zeros((tt.num_rows, tt.num_columns))
-
-        for i in range(1, rch.bab_global.multi_nummwdbins + 1):
-            c_i = ct.c_int(i)
-            tt.data[i - 1, 0] = np.power(10, rch.return_binsandbob_multi_lgmid(c_i))
-            tt.data[i - 1, 1] = rch.return_binsandbob_multi_wt(c_i)
-            tt.data[i - 1, 2] = rch.return_binsandbob_multi_avg(c_i)
-            tt.data[i - 1, 3] = rch.return_binsandbob_multi_avbr(c_i)
+        tt.data[:, :4] = mwd
 
         totpoly = 0
         totsaved = 0
@@ -195,12 +203,37 @@ class TheoryReactMix(QTheory):
         table.append(["", ""])  # no header
         table.append(["Total polymers", "%d" % totpoly])
         table.append(["Total saved polymers", "%d" % totsaved])
-        table.append(["Mn", "%.3g" % rch.bab_global.multi_m_n])
-        table.append(["Mw", "%.3g" % rch.bab_global.multi_m_w])
-        table.append(["br/1000C", "%.3g" % rch.bab_global.multi_brav])
+        table.append(["Mn", "%.3g" % m_n])
+        table.append(["Mw", "%.3g" % m_w])
+        table.append(["br/1000C", "%.3g" % brav])
         self.Qprint(table)
         self.calcexists = True
-        return rch.bab_global.multi_nummwdbins - 1
+        return tt.num_rows - 1
+
+    def mix_components(self, nbins, weights):
+        """Mix the distributions of the mixture with the given weights.
+        The limits and bins of each distribution are cached until its simulation
+        changes, so that new weights only need a weighted sum of the bins"""
+        keys = [
+            (
+                dist,
+                rch.react_dist[dist].contents.simnumber,
+                rch.react_dist[dist].contents.npoly,
+            )
+            for dist in self.dists
+        ]
+        # forget the components no longer in the mixture or simulated again
+        cache = {key: self.mix_cache.get(key, {}) for key in keys}
+        for key in keys:
+            if "limits" not in cache[key]:
+                cache[key]["limits"] = rch.component_limits(key[0])
+        grid = rch.mix_grid([cache[key]["limits"] for key in keys], nbins)
+        for key in keys:
+            if cache[key].get("grid") != grid:
+                cache[key]["grid"] = grid
+                cache[key]["bins"] = rch.component_bins(key[0], grid)
+        self.mix_cache = cache
+        return rch.mix_bins([cache[key]["bins"] for key in keys], weights, grid)
 
     def do_error(self, line):
         """This theory does not calculate the error"""
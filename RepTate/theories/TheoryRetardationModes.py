@@ -43,6 +43,7 @@ from PySide6.QtWidgets import QToolBar, QSpinBox
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
 from RepTate.core.DraggableArtists import DragType, DraggableModesSeries
+from RepTate.theories.theory_helpers import KernelCache, mode_values
 
 
 class TheoryRetardationModesTime(QTheory):
@@ -76,6 +77,7 @@ class TheoryRetardationModesTime(QTheory):
         """**Constructor**"""
         super().__init__(name, parent_dataset, ax)
         self.function = self.RetardationModesTime
+        self.kernel_cache = KernelCache()
         self.has_modes = True
         self.MAX_MODES = 40
         self.view_modes = True
@@ -314,17 +316,21 @@ class TheoryRetardationModesTime(QTheory):
         except (ValueError, KeyError):
             rec = 0
 
-        for i in range(nmodes):
-            if self.stop_theory_flag:
-                break
-            expT_tau = 1.0 - np.exp(-tt.data[:, 0] / tau[i])
-            J = np.power(10, self.parameters["logJ%02d" % i].value)
-            tt.data[:, 1] += stress * J * expT_tau
+        if self.stop_theory_flag:
+            return
+        J = mode_values(self.parameters, "logJ%02d", nmodes)
+        K = self.kernel_cache.get(f.file_name_short, tt.data[:, 0], tau, self.kernel)
+        tt.data[:, 1] = stress * (K @ J)
         if rec == 1:
             tt.data[:, 1] += stress * J0
         else:
             tt.data[:, 1] += stress * (J0 + tt.data[:, 0] / eta0)
 
+    @staticmethod
+    def kernel(t, tau):
+        """Retardation kernel of the modes, (npoints x nmodes) matrix"""
+        return 1.0 - np.exp(-np.divide.outer(t, tau))
+
     def plot_theory_stuff(self):
         """Plot theory helpers"""
         if not self.view_modes:
@@ -100,7 +100,6 @@ class TheoryRouseTime(QTheory):
             opt_type=OptType.opt,
             min_value=0.01,
         )
-
     def calculate(self, f=None):
         """RouseTime function"""
         ft = f.data_table
@@ -128,10 +127,17 @@ class TheoryRouseTime(QTheory):
             gamma = 1
 
         t = ft.data[:, 0]
-        params = [G0, tau0, Mw / M0, t]
+        gt = self.calculate_batched(
+            f,
+            Mw,
+            (G0, tau0, M0),
+            lambda Mw, t: [G0, tau0, Mw / M0, t],
+            rh.approx_rouse_time_batch,
+            rh.approx_rouse_time,
+        )
 
         tt.data[:, 0] = t
-        tt.data[:, 1] = gamma * rh.approx_rouse_time(params)
+        tt.data[:, 1] = gamma * gt
 
 
 ####################################################################
@@ -200,7 +206,6 @@ class TheoryRouseFrequency(QTheory):
             opt_type=OptType.opt,
             min_value=0,
         )
-
     def calculate(self, f=None):
         """RouseFrequency function"""
         ft = f.data_table
@@ -218,8 +223,14 @@ class TheoryRouseFrequency(QTheory):
             return
 
         omega = ft.data[:, 0]
-        params = [G0, tau0, Mw / M0, omega]
-        gp, gpp = rh.approx_rouse_frequency(params)
+        gp, gpp = self.calculate_batched(
+            f,
+            Mw,
+            (G0, tau0, M0),
+            lambda Mw, w: [G0, tau0, Mw / M0, w],
+            rh.approx_rouse_frequency_batch,
+            rh.approx_rouse_frequency,
+        )
 
         tt.data[:, 0] = omega
         tt.data[:, 1] = gp
@@ -43,12 +43,14 @@ import numpy as np
 from RepTate.core.DataTable import DataTable
 from RepTate.core.Parameter import Parameter, ParameterType, OptType
 from RepTate.gui.QTheory import QTheory
+from RepTate.core.CmdBase import CmdBase, CalcMode
+import RepTate.theories.respect_helper as rsh
 from PySide6.QtWidgets import QToolBar, QToolButton, QMenu, QMessageBox, QFileDialog
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QIcon
-from scipy.optimize import nnls, minimize, least_squares
+from scipy.optimize import minimize, least_squares
 from scipy.interpolate import interp1d
-from scipy.integrate import cumulative_trapezoid, quad
+from scipy.integrate import quad
 import enum
 import RepTate
 import time
@@ -530,19 +532,7 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
         """furnish kerMat() which helps faster kernel evaluation, given s, w
         Generates a 2n*ns matrix [(ws^2/1+ws^2) | (ws/1+ws)]'*hs, which can be
         multiplied with exp(H) to get predicted G*"""
-
-        ns = len(s)
-        hsv = np.zeros(ns)
-
-        hsv[0] = 0.5 * np.log(s[1] / s[0])
-        hsv[ns - 1] = 0.5 * np.log(s[ns - 1] / s[ns - 2])
-        hsv[1 : ns - 1] = 0.5 * (np.log(s[2:ns]) - np.log(s[0 : ns - 2]))
-
-        S, W = np.meshgrid(s, w)
-        ws = S * W
-        ws2 = ws**2
-
-        return np.vstack((ws2 / (1 + ws2), ws / (1 + ws2))) * hsv
+        return rsh.kernel_cache.kernel("frequency", w, s)
 
     def getH(self, lam, Gexp, H, kernMat, G0=0):
         """
@@ -601,43 +591,12 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
             Hlam = self.getH(lam, Gexp, H, kernMat)
             return Hlam
 
-    def getAmatrix(self, ns):
-        """Generate symmetric matrix A = L' * L required for error analysis:
-        helper function for lcurve in error determination"""
-        # L is a ns*ns tridiagonal matrix with 1 -2 and 1 on its diagonal;
-        nl = ns - 2
-        L = (
-            np.diag(np.ones(ns - 1), 1)
-            + np.diag(np.ones(ns - 1), -1)
-            + np.diag(-2.0 * np.ones(ns))
-        )
-        L = L[1 : nl + 1, :]
-
-        return np.dot(L.T, L)
-
-    def getBmatrix(self, H, kernMat, Gexp, *argv):
-        """get the Bmatrix required for error analysis; helper for lcurve()
-        not explicitly accounting for G0 in Jr because otherwise I get underflow problems
-        """
-        n = int(len(Gexp) / 2)
-        ns = len(H)
-        nl = ns - 2
-        r = np.zeros(n)  # vector of size (n);
-
-        # furnish relevant portion of Jacobian and residual
-        Kmatrix = np.dot((1.0 / Gexp).reshape(2 * n, 1), np.ones((1, ns)))
-        Jr = -self.kernelD(H, kernMat) * Kmatrix
-
-        # if plateau then unfurl G0
-        if len(argv) > 0:
-            G0 = argv[0]
-            r = 1.0 - self.kernel_prestore(H, kernMat, G0) / Gexp
-        else:
-            r = 1.0 - self.kernel_prestore(H, kernMat) / Gexp
-
-        B = np.dot(Jr.T, Jr) + np.diag(np.dot(r.T, Jr))
-
-        return B
+    def lcurve_problem(self, Gexp, kernMat):
+        """Regularised fit solved by lcurve(); the plateau G0 only contributes to G'"""
+        n = int(kernMat.shape[0] / 2)
+        g0mask = np.zeros(2 * n)
+        g0mask[:n] = 1.0
+        return rsh.LcurveProblem(Gexp, kernMat, g0mask)
 
     def oldLamC(self, lam, rho, eta):
         #
@@ -703,8 +662,7 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
         """
 
         plateau = self.parameters["plateau"].value
-        if plateau:
-            G0 = argv[0]
+        G0 = argv[0] if plateau else None
 
         lamDensity = self.parameters["lamDensity"].value
         lam_max = self.parameters["lam_max"].value
@@ -712,61 +670,27 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
         npoints = int(lamDensity * (np.log10(lam_max) - np.log10(lam_min)))
         hlam = (lam_max / lam_min) ** (1.0 / (npoints - 1.0))
         lam = lam_min * hlam ** np.arange(npoints)
-        eta = np.zeros(npoints)
-        rho = np.zeros(npoints)
-        logP = np.zeros(npoints)
-        H = Hgs.copy()
-        n = len(Gexp)
-        ns = len(H)
-        nl = ns - 2
-        logPmax = -np.inf  # so nothing surprises me!
-        Hlambda = np.zeros((ns, npoints))
-
-        # Error Analysis: Furnish A_matrix
-        Amat = self.getAmatrix(len(H))
-        _, LogDetN = np.linalg.slogdet(Amat)
 
         #
-        # This is the costliest step
+        # This is the costliest step: warm-started scan from large to small lambda,
+        # shared between several processes in multithread mode
         #
-        for i in reversed(range(len(lam))):
-            self.Qprint(".", end="")
-            lamb = lam[i]
-
-            if plateau:
-                H, G0 = self.getH(lamb, Gexp, H, kernMat, G0)
-                rho[i] = np.linalg.norm(
-                    (1.0 - self.kernel_prestore(H, kernMat, G0) / Gexp)
-                )
-                Bmat = self.getBmatrix(H, kernMat, Gexp, G0)
-            else:
-                H = self.getH(lamb, Gexp, H, kernMat)
-                rho[i] = np.linalg.norm((1.0 - self.kernel_prestore(H, kernMat) / Gexp))
-                Bmat = self.getBmatrix(H, kernMat, Gexp)
-
-            eta[i] = np.linalg.norm(np.diff(H, n=2))
-            Hlambda[:, i] = H
-
-            _, LogDetC = np.linalg.slogdet(lamb * Amat + Bmat)
-            V = rho[i] ** 2 + lamb * eta[i] ** 2
-
-            # this assumes a prior exp(-lam)
-            logP[i] = -V + 0.5 * (LogDetN + ns * np.log(lamb) - LogDetC) - lamb
-
-            if logP[i] > logPmax:
-                logPmax = logP[i]
-            elif logP[i] < logPmax - 18:
-                break
+        nworkers = 1
+        if CmdBase.calcmode == CalcMode.multithread:
+            nworkers = os.cpu_count() or 1
+        i, Hlambda, rho, eta, logP = rsh.lcurve_scan(
+            self.lcurve_problem(Gexp, kernMat),
+            lam,
+            Hgs.copy(),
+            G0,
+            nworkers,
+            callback=lambda: self.Qprint(".", end=""),
+        )
 
         # truncate all to significant lambda
         lam = lam[i:]
-        logP = logP[i:]
-        eta = eta[i:]
-        rho = rho[i:]
         logP = logP - max(logP)
 
-        Hlambda = Hlambda[:, i:]
-
         #
         # currently using both schemes to get optimal lamC
         # new lamM works better with actual experimental data
@@ -804,33 +728,7 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
                 condKp = condition number
 
         """
-
-        N = len(z)
-        tau = np.exp(z)
-        n = len(w)
-
-        #
-        # Prune small -ve weights g(i)
-        #
-        g, error, condKp = self.nnLLS(w, tau, Gexp, isPlateau)
-
-        # first remove runaway modes outside window with potentially large weight
-        izero = np.where(
-            np.logical_or(max(w) * min(tau) < 0.02, min(w) * max(tau) > 50.0)
-        )
-        tau = np.delete(tau, izero)
-        g = np.delete(g, izero)
-
-        # search for small weights (gi)
-        if isPlateau:
-            izero = np.where(g[:-1] / np.max(g[:-1]) < 1e-8)
-        else:
-            izero = np.where(g / np.max(g) < 1e-8)
-
-        tau = np.delete(tau, izero)
-        g = np.delete(g, izero)
-
-        return g, tau, error, condKp
+        return rsh.maxwell_modes_frequency(z, w, Gexp, isPlateau)
 
     def nnLLS(self, w, tau, Gexp, isPlateau):
         """
@@ -839,28 +737,7 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
         # helps MaxwellModes
         #
         """
-        n = int(len(Gexp) / 2)
-        ntau = len(tau)
-        S, W = np.meshgrid(tau, w)
-        ws = S * W
-        ws2 = ws**2
-        K = np.vstack((ws2 / (1 + ws2), ws / (1 + ws2)))  # 2n * nmodes
-
-        # K is n*ns [or ns+1]
-        if isPlateau:
-            K = np.hstack((K, np.ones((len(Gexp), 1))))  # G' needs some G0
-            K[n:, ntau] = 0.0  # G" doesn't have G0 contrib
-        #
-        # gets (Gst/GstE - 1)^2, instead of  (Gst -  GstE)^2
-        #
-        Kp = np.dot(np.diag((1.0 / Gexp)), K)
-        condKp = np.linalg.cond(Kp)
-        g = nnls(Kp, np.ones(len(Gexp)))[0]
-
-        GstM = np.dot(K, g)
-        error = np.sum((GstM / Gexp - 1.0) ** 2)
-
-        return g, error, condKp
+        return rsh.nnls_frequency(w, tau, Gexp, isPlateau)
 
     def GetWeights(self, H, w, s, wb):
         """
@@ -929,42 +806,7 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
         #
         #  (c) Sachin Shanbhag, November 11, 2015
         #"""
-
-        npts = 100
-        # can potentially change
-        xi = np.linspace(min(x), max(x), npts)  # reinterpolate on equi-spaced axis
-        fint = interp1d(x, px, "cubic")  # smoothen using cubic splines
-        pint = fint(xi)  # interpolation
-        ci = cumulative_trapezoid(pint, xi, initial=0)
-        pint = pint / ci[npts - 1]
-        ci = ci / ci[npts - 1]  # normalize ci
-
-        alfa = 1.0 / (N - 1)  # alfa/2 + (N-1)*alfa + alfa/2
-        zij = np.zeros(N + 1)  # quadrature interval end marker
-        z = np.zeros(N)  # quadrature point
-
-        z[0] = min(x)
-        z[N - 1] = max(x)
-
-        #
-        # ci(Z_j,j+1) = (j - 0.5) * alfa
-        #
-        beta = np.arange(0.5, N - 0.5) * alfa
-        zij[0] = z[0]
-        zij[N] = z[N - 1]
-        fint = interp1d(ci, xi, "cubic")
-        zij[1:N] = fint(beta)
-        h = np.diff(zij)
-
-        #
-        # Quadrature points are not the centroids, but rather the center of masses
-        # of the quadrature intervals
-        #
-
-        beta = np.arange(1, N - 1) * alfa
-        z[1 : N - 1] = fint(beta)
-
-        return z, h
+        return rsh.GridDensity(x, px).points(N)
 
     def mergeModes_magic(self, g, tau, imode):
         """merge modes imode and imode+1 into a single mode
@@ -1225,44 +1067,46 @@ class TheoryShanbhagMaxwellModesFrequency(QTheory):
             Nv = np.arange(MaxNumModes, MaxNumModes + 1).astype(int)
 
         Cerror = 1.0 / (np.std(self.K / Gexp - 1.0))  # 	Cerror = 1.?
-        npts = len(Nv)
 
         # range of wtBaseDist scanned
         deltaBaseWeightDist = self.parameters["deltaBaseWeightDist"].value
         wtBase = deltaBaseWeightDist * np.arange(1, int(1.0 / deltaBaseWeightDist))
-        AICbst = np.zeros(len(wtBase))
-        Nbst = np.zeros(len(wtBase))  # nominal number of modes
-        nzNbst = np.zeros(len(wtBase))  # actual number of nonzero modes
-
-        # main loop over wtBaseDist
-        for ib, wb in enumerate(wtBase):
-            # Find the distribution of nodes you need
-            wt = self.GetWeights(H, w, s, wb)
 
-            # Scan the range of number of Maxwell modes N = (Nmin, Nmax)
-            ev = np.zeros(npts)
-            nzNv = np.zeros(npts)  # number of nonzero modes
-
-            for i, N in enumerate(Nv):
-                z, hz = self.GridDensity(np.log(s), wt, N)  # select "tau" Points
-                g, tau, ev[i], _ = self.MaxwellModes(z, w, Gexp, plateau)  # get g_i
-                nzNv[i] = len(g)
-
-            # store the best solution for this particular wb
-            AIC = 2.0 * Nv + 2.0 * Cerror * ev
+        # the weights only depend on wb through the mixing with an even distribution
+        wt0 = self.GetWeights(H, w, s, 0.0)
+        wts = [
+            (1.0 - wb) * wt0 + (wb * np.mean(wt0)) * np.ones(len(wt0)) for wb in wtBase
+        ]
 
-            AICbst[ib] = min(AIC)
-            Nbst[ib] = Nv[np.argmin(AIC)]
-            nzNbst[ib] = nzNv[np.argmin(AIC)]
+        # scan the grid of (wtBaseDist, N = (Nmin, Nmax)) for the best AIC
+        nworkers = 1
+        if CmdBase.calcmode == CalcMode.multithread:
+            nworkers = os.cpu_count() or 1
+        tic = time.time()
+        ibopt, iNopt, AIC, times = rsh.aic_grid(
+            rsh.maxwell_modes_frequency,
+            w,
+            Gexp,
+            plateau,
+            np.log(s),
+            wts,
+            Nv,
+            Cerror,
+            nworkers,
+        )
+        self.Qprint(
+            "AIC grid: {0:d} cells in {1:.2f} s ({2:.1f} ms/cell, slowest {3:.1f} ms)".format(
+                times.size, time.time() - tic, 1000 * np.mean(times), 1000 * np.max(times)
+            )
+        )
 
         # global best settings of wb and Nopt; note this is nominal Nopt (!= len(g) due to NNLS)
-        Nopt = int(Nbst[np.argmin(AICbst)])
-        wbopt = wtBase[np.argmin(AICbst)]
+        Nopt = int(Nv[iNopt])
 
         #
         # Recompute the best data-set stats
         #
-        wt = self.GetWeights(H, w, s, wbopt)
+        wt = wts[ibopt]
         z, hz = self.GridDensity(np.log(s), wt, Nopt)  # Select "tau" Points
         g, tau, error, cKp = self.MaxwellModes(z, w, Gexp, plateau)  # Get g_i, taui
         succ, gf, tauf = self.FineTuneSolution(tau, w, Gexp, plateau)
@@ -1770,14 +1614,7 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
         for trapezoidal rule integration.
 
         This matrix (K) times h = exp(H), Kh, is comparable with Gexp"""
-        ns = len(s)
-        hsv = np.zeros(ns)
-        hsv[0] = 0.5 * np.log(s[1] / s[0])
-        hsv[ns - 1] = 0.5 * np.log(s[ns - 1] / s[ns - 2])
-        hsv[1 : ns - 1] = 0.5 * (np.log(s[2:ns]) - np.log(s[0 : ns - 2]))
-        S, T = np.meshgrid(s, t)
-
-        return np.exp(-T / S) * hsv
+        return rsh.kernel_cache.kernel("time", t, s)
 
     def kernel_prestore(self, H, kernMat, *argv):
         """
@@ -1831,45 +1668,9 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
             Hlam = self.getH(lam, Gexp, H, kernMat)
             return Hlam
 
-    def getAmatrix(self, ns):
-        """Generate symmetric matrix A = L' * L required for error analysis:
-        helper function for lcurve in error determination"""
-        # L is a ns*ns tridiagonal matrix with 1 -2 and 1 on its diagonal;
-        nl = ns - 2
-        L = (
-            np.diag(np.ones(ns - 1), 1)
-            + np.diag(np.ones(ns - 1), -1)
-            + np.diag(-2.0 * np.ones(ns))
-        )
-        L = L[1 : nl + 1, :]
-
-        return np.dot(L.T, L)
-
-    def getBmatrix(self, H, kernMat, Gexp, *argv):
-        """get the Bmatrix required for error analysis; helper for lcurve()
-        not explicitly accounting for G0 in Jr because otherwise I get underflow problems
-        """
-        n = kernMat.shape[0]
-        ns = kernMat.shape[1]
-        nl = ns - 2
-        r = np.zeros(n)
-        # vector of size (n);
-
-        # furnish relevant portion of Jacobian and residual
-
-        Kmatrix = np.dot((1.0 / Gexp).reshape(n, 1), np.ones((1, ns)))
-        Jr = -self.kernelD(H, kernMat) * Kmatrix
-
-        # if plateau then unfurl G0
-        if len(argv) > 0:
-            G0 = argv[0]
-            r = 1.0 - self.kernel_prestore(H, kernMat, G0) / Gexp
-        else:
-            r = 1.0 - self.kernel_prestore(H, kernMat) / Gexp
-
-        B = np.dot(Jr.T, Jr) + np.diag(np.dot(r.T, Jr))
-
-        return B
+    def lcurve_problem(self, Gexp, kernMat):
+        """Regularised fit solved by lcurve()"""
+        return rsh.LcurveProblem(Gexp, kernMat, np.ones(kernMat.shape[0]))
 
     def oldLamC(self, lam, rho, eta):
         #
@@ -1934,8 +1735,7 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
 
         """
         plateau = self.parameters["plateau"].value
-        if plateau:
-            G0 = argv[0]
+        G0 = argv[0] if plateau else None
 
         lamDensity = self.parameters["lamDensity"].value
         lam_max = self.parameters["lam_max"].value
@@ -1943,61 +1743,27 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
         npoints = int(lamDensity * (np.log10(lam_max) - np.log10(lam_min)))
         hlam = (lam_max / lam_min) ** (1.0 / (npoints - 1.0))
         lam = lam_min * hlam ** np.arange(npoints)
-        eta = np.zeros(npoints)
-        rho = np.zeros(npoints)
-        logP = np.zeros(npoints)
-        H = Hgs.copy()
-        n = len(Gexp)
-        ns = len(H)
-        nl = ns - 2
-        logPmax = -np.inf  # so nothing surprises me!
-        Hlambda = np.zeros((ns, npoints))
-
-        # Error Analysis: Furnish A_matrix
-        Amat = self.getAmatrix(len(H))
-        _, LogDetN = np.linalg.slogdet(Amat)
 
         #
-        # This is the costliest step
+        # This is the costliest step: warm-started scan from large to small lambda,
+        # shared between several processes in multithread mode
         #
-        for i in reversed(range(len(lam))):
-            self.Qprint(".", end="")
-            lamb = lam[i]
-
-            if plateau:
-                H, G0 = self.getH(lamb, Gexp, H, kernMat, G0)
-                rho[i] = np.linalg.norm(
-                    (1.0 - self.kernel_prestore(H, kernMat, G0) / Gexp)
-                )
-                Bmat = self.getBmatrix(H, kernMat, Gexp, G0)
-            else:
-                H = self.getH(lamb, Gexp, H, kernMat)
-                rho[i] = np.linalg.norm((1.0 - self.kernel_prestore(H, kernMat) / Gexp))
-                Bmat = self.getBmatrix(H, kernMat, Gexp)
-
-            eta[i] = np.linalg.norm(np.diff(H, n=2))
-            Hlambda[:, i] = H
-
-            _, LogDetC = np.linalg.slogdet(lamb * Amat + Bmat)
-            V = rho[i] ** 2 + lamb * eta[i] ** 2
-
-            # this assumes a prior exp(-lam)
-            logP[i] = -V + 0.5 * (LogDetN + ns * np.log(lamb) - LogDetC) - lamb
-
-            if logP[i] > logPmax:
-                logPmax = logP[i]
-            elif logP[i] < logPmax - 18:
-                break
+        nworkers = 1
+        if CmdBase.calcmode == CalcMode.multithread:
+            nworkers = os.cpu_count() or 1
+        i, Hlambda, rho, eta, logP = rsh.lcurve_scan(
+            self.lcurve_problem(Gexp, kernMat),
+            lam,
+            Hgs.copy(),
+            G0,
+            nworkers,
+            callback=lambda: self.Qprint(".", end=""),
+        )
 
         # truncate all to significant lambda
         lam = lam[i:]
-        logP = logP[i:]
-        eta = eta[i:]
-        rho = rho[i:]
         logP = logP - max(logP)
 
-        Hlambda = Hlambda[:, i:]
-
         #
         # currently using both schemes to get optimal lamC
         # new lamM works better with actual experimental data
@@ -2165,26 +1931,7 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
                 error = relative error between the input data and the G(t) inferred from the DRS
                 condKp = condition number
         """
-        N = len(z)
-        tau = np.exp(z)
-        n = len(t)
-        Gexp = Gt
-
-        #
-        # Prune small and -ve weights g(i)
-        #
-        g, error, condKp = self.nnLLS(t, tau, Gexp, isPlateau)
-
-        # search for small
-        if isPlateau:
-            izero = np.where(g[:-1] / max(g[:-1]) < 1e-7)
-        else:
-            izero = np.where(g / max(g) < 1e-7)
-
-        tau = np.delete(tau, izero)
-        g = np.delete(g, izero)
-
-        return g, tau, error, condKp
+        return rsh.maxwell_modes_time(z, t, Gt, isPlateau)
 
     def nnLLS(self, t, tau, Gexp, isPlateau):
         """
@@ -2193,25 +1940,7 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
         # helps MaxwellModes; relies on nnls
         #
         """
-        n = len(Gexp)
-        S, T = np.meshgrid(tau, t)
-        K = np.exp(-T / S)  # n * nmodes
-
-        # K is n*ns [or ns+1]
-        if isPlateau:
-            K = np.hstack((K, np.ones((len(Gexp), 1))))
-
-        #
-        # gets (Gt/GtE - 1)^2, instead of  (Gt -  GtE)^2
-        #
-        Kp = np.dot(np.diag((1.0 / Gexp)), K)
-        condKp = np.linalg.cond(Kp)
-        g = nnls(Kp, np.ones(len(Gexp)))[0]
-
-        GtM = np.dot(K, g)
-        error = np.sum((GtM / Gexp - 1.0) ** 2)
-
-        return g, error, condKp
+        return rsh.nnls_time(t, tau, Gexp, isPlateau)
 
     def GetWeights(self, H, t, s, wb):
         """
@@ -2277,37 +2006,7 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
         #
         #  (c) Sachin Shanbhag, November 11, 2015
         #"""
-
-        npts = 100
-        # can potentially change
-        xi = np.linspace(min(x), max(x), npts)  # reinterpolate on equi-spaced axis
-        fint = interp1d(x, px, "cubic")  # smoothen using cubic splines
-        pint = fint(xi)  # interpolation
-        ci = cumulative_trapezoid(pint, xi, initial=0)
-        pint = pint / ci[npts - 1]
-        ci = ci / ci[npts - 1]  # normalize ci
-
-        alfa = 1.0 / (N - 1)  # alfa/2 + (N-1)*alfa + alfa/2
-        zij = np.zeros(N + 1)  # quadrature interval end marker
-        z = np.zeros(N)  # quadrature point
-
-        z[0] = min(x)
-        z[N - 1] = max(x)
-
-        # ci(Z_j,j+1) = (j - 0.5) * alfa
-        beta = np.arange(0.5, N - 0.5) * alfa
-        zij[0] = z[0]
-        zij[N] = z[N - 1]
-        fint = interp1d(ci, xi, "cubic")
-        zij[1:N] = fint(beta)
-        h = np.diff(zij)
-
-        # Quadrature points are not the centroids, but rather the center of masses
-        # of the quadrature intervals
-        beta = np.arange(1, N - 1) * alfa
-        z[1 : N - 1] = fint(beta)
-
-        return z, h
+        return rsh.GridDensity(x, px).points(N)
 
     def mergeModes_magic(self, g, tau, imode):
         """merge modes imode and imode+1 into a single mode
@@ -2533,53 +2232,48 @@ class TheoryShanbhagMaxwellModesTime(QTheory):
             Nv = np.arange(MaxNumModes, MaxNumModes + 1).astype(int)
 
         Cerror = 1.0 / (np.std(self.K / Gexp - 1.0))  # 	Cerror = 1.?
-        npts = len(Nv)
 
         # range of wtBaseDist scanned
         deltaBaseWeightDist = self.parameters["deltaBaseWeightDist"].value
         wtBase = deltaBaseWeightDist * np.arange(1, int(1.0 / deltaBaseWeightDist))
-        AICbst = np.zeros(len(wtBase))
-        Nbst = np.zeros(len(wtBase))  # nominal number of modes
-        nzNbst = np.zeros(len(wtBase))  # actual number of nonzero modes
-
-        # main loop over wtBaseDist
-        for ib, wb in enumerate(wtBase):
-            # Find the distribution of nodes you need
-            wt = self.GetWeights(H, t, s, wb)
-
-            # Scan the range of number of Maxwell modes N = (Nmin, Nmax)
-            ev = np.zeros(npts)
-            nzNv = np.zeros(npts)  # number of nonzero modes
 
-            for i, N in enumerate(Nv):
-                z, hz = self.GridDensity(np.log(s), wt, N)  # select "tau" Points
-                g, tau, ev[i], _ = self.MaxwellModes(z, t, Gexp, plateau)  # get g_i
-                nzNv[i] = len(g)
-
-            # store the best solution for this particular wb
-            AIC = 2.0 * Nv + 2.0 * Cerror * ev
-
-            # Fine-Tune the best in class-fit further by trying an NLLS optimization on it.
-            #
-            N = Nv[np.argmin(AIC)]
-            z, hz = self.GridDensity(np.log(s), wt, N)  # Select "tau" Points
-
-            g, tau, error, cKp = self.MaxwellModes(z, t, Gexp, plateau)  # Get g_i, taui
+        # the weights only depend on wb through the mixing with an even distribution
+        wt0 = self.GetWeights(H, t, s, 0.0)
+        wts = [
+            (1.0 - wb) * wt0 + (wb * np.mean(wt0)) * np.ones(len(wt0)) for wb in wtBase
+        ]
 
-            AICbst[ib] = min(AIC)
-            Nbst[ib] = Nv[np.argmin(AIC)]
-            nzNbst[ib] = nzNv[np.argmin(AIC)]
+        # scan the grid of (wtBaseDist, N = (Nmin, Nmax)) for the best AIC
+        nworkers = 1
+        if CmdBase.calcmode == CalcMode.multithread:
+            nworkers = os.cpu_count() or 1
+        tic = time.time()
+        ibopt, iNopt, AIC, times = rsh.aic_grid(
+            rsh.maxwell_modes_time,
+            t,
+            Gexp,
+            plateau,
+            np.log(s),
+            wts,
+            Nv,
+            Cerror,
+            nworkers,
+        )
+        self.Qprint(
+            "AIC grid: {0:d} cells in {1:.2f} s ({2:.1f} ms/cell, slowest {3:.1f} ms)".format(
+                times.size, time.time() - tic, 1000 * np.mean(times), 1000 * np.max(times)
+            )
+        )
 
         # global best settings of wb and Nopt; note this is nominal Nopt (!= len(g) due to NNLS)
-        Nopt = int(Nbst[np.argmin(AICbst)])
-        wbopt = wtBase[np.argmin(AICbst)]
+        Nopt = int(Nv[iNopt])
 
         #
         # Recompute the best data-set stats
         #
-        wt = self.GetWeights(H, t, s, wbopt)
+        wt = wts[ibopt]
         z, hz = self.GridDensity(np.log(s), wt, Nopt)  # Select "tau" Points
-        g, tau, _, _ = self.MaxwellModes(z, t, Gexp, plateau)  # Get g_i, taui
+        g, tau, _, cKp = self.MaxwellModes(z, t, Gexp, plateau)  # Get g_i, taui
         g, tau, dtau = self.FineTuneSolution(tau, t, Gexp, plateau, estimateError=True)
 
         #
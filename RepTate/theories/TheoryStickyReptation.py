@@ -109,21 +109,65 @@ class TheoryStickyReptation(QTheory):
             type=ParameterType.real,
             opt_type=OptType.const,
         )
+        self.ft_weights = {}  # cached G(t) -> G*(w) transform weights
 
     def g_descloizeaux(self, x, tol):
-        N = len(x)
+        """Truncated des Cloizeaux sum, evaluated for all the points of ``x`` at once.
+
+        Each point stops accumulating terms as soon as its own relative
+        increment drops below ``tol``; the loop ends when all points are done.
+        """
+        x = np.asarray(x, dtype=float)
         gx = np.zeros(len(x))  # output array
-        for n in range(0, N):
-            err = 2 * tol  # initialise error
-            m = 0
-            while err > tol:
-                m += 1
-                m2 = m * m
-                dgx = (1 - np.exp(-m2 * x[n])) / m2
-                gx[n] += dgx
-                err = dgx / gx[n]
+        active = np.ones(len(x), dtype=bool)
+        m = 0
+        while np.any(active):
+            m += 1
+            m2 = m * m
+            dgx = (1 - np.exp(-m2 * x[active])) / m2
+            gx[active] += dgx
+            with np.errstate(divide="ignore", invalid="ignore"):
+                done = ~(dgx / gx[active] > tol)
+            active[np.flatnonzero(active)[done]] = False
         return gx
 
+    def double_reptation_sum(self, Ut, tol):
+        """Truncated sum over odd modes of the double-reptation model, for all ``Ut`` at once"""
+        Ut = np.asarray(Ut, dtype=float)
+        GREP = np.zeros(len(Ut))
+        active = np.ones(len(Ut), dtype=bool)
+        q = -1
+        while np.any(active):
+            q += 2  # sum only over odd values of q
+            q2 = q * q
+            dGrep = np.exp(-q2 * Ut[active]) / q2
+            GREP[active] += dGrep
+            with np.errstate(divide="ignore", invalid="ignore"):
+                done = ~(dGrep / GREP[active] > tol)
+            active[np.flatnonzero(active)[done]] = False
+        return GREP
+
+    def fourier_weights(self, t, ind1, wp):
+        """Matrices of the piecewise-linear Fourier transform of G(t) on the grid (wp, t).
+
+        They only depend on the time and frequency grids, so they are kept
+        in ``self.ft_weights`` and reused while fitting Ge, tau_s, Zs or Ze.
+        """
+        key = (t[0], t[-1], len(t), ind1, wp[0], wp[-1], len(wp))
+        weights = self.ft_weights.get(key)
+        if weights is None:
+            wt1 = np.outer(wp, t[ind1:-1])
+            wt2 = np.outer(wp, t[ind1 + 1 :])
+            w_col = wp[:, None]
+            Ws = (np.sin(wt2) - np.sin(wt1)) / w_col
+            Wc = (np.cos(wt2) - np.cos(wt1)) / w_col
+            wt0 = wp * t[ind1]
+            weights = (np.sin(wt0) / wt0, (1 - np.cos(wt0)) / wt0, Ws, Wc)
+            if len(self.ft_weights) > 16:
+                self.ft_weights.clear()
+            self.ft_weights[key] = weights
+        return weights
+
     def calculate(self, f=None):
         """STICKY-REPTATION MODEL FOR LINEAR VISCOELASTICITY
 
@@ -203,21 +247,12 @@ class TheoryStickyReptation(QTheory):
 
         # - - - - - - - - - - - - - - - - - - - - - - -
         # CALCULATE DOUBLE-REPTATION RELAXATION MODULUS
-        GREP = np.zeros(len(t))  # initialise output
         tau_rep = Ze * tau_srouse  # sticky-reptation time
         tR = t / tau_rep  # Time in units of reptation time
         H = Ze / alpha  # Prefactor in des Cloizeaux model
         Ut = tR + self.g_descloizeaux(H * tR, tol) / H
 
-        for n in range(0, len(Ut)):
-            err = 2 * tol
-            q = -1
-            while err > tol:  # truncate infinite sum when tolerance is met
-                q += 2  # sum only over odd values of q
-                q2 = q * q
-                dGrep = np.exp(-q2 * Ut[n]) / q2
-                GREP[n] += dGrep
-                err = dGrep / GREP[n]
+        GREP = self.double_reptation_sum(Ut, tol)
         GREP = (GREP * 8 / np.pi**2) ** 2
 
         # Relaxation modulus G(t) = sum of Sticky Rouse and Reptation
@@ -227,44 +262,25 @@ class TheoryStickyReptation(QTheory):
 
         # ---------------------------------------------
         # GET DYNAMIC MODULI G(w) from G(t)
-        f = interpolate.interp1d(
-            t, G, kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
-        g0 = f(0)
+        g0 = interpolate.CubicSpline(t, G)(0.0)
         ind1 = np.argmax(t > 0)
         t1 = t[ind1]
         g1 = G[ind1]
         tinf = np.max(t)
         wp = np.logspace(np.log10(1 / tinf), np.log10(1 / t1), ntime)
-        tt.num_columns = ft.num_columns
-        tt.num_rows = ntime
         G1G2 = np.zeros((ntime, 3))
         G1G2[:, 0] = wp[:]
 
+        sinc0, cosc0, Ws, Wc = self.fourier_weights(t, ind1, wp)
         coeff = (G[ind1 + 1 :] - G[ind1:-1]) / (t[ind1 + 1 :] - t[ind1:-1])
-        for i, w in enumerate(wp):
-            G1G2[i, 1] = (
-                g0
-                + np.sin(w * t1) * (g1 - g0) / w / t1
-                + np.dot(coeff, -np.sin(w * t[ind1:-1]) + np.sin(w * t[ind1 + 1 :])) / w
-            )
-
-            G1G2[i, 2] = (
-                -(1 - np.cos(w * t1)) * (g1 - g0) / w / t1
-                - np.dot(coeff, np.cos(w * t[ind1:-1]) - np.cos(w * t[ind1 + 1 :])) / w
-            )
+        G1G2[:, 1] = g0 + sinc0 * (g1 - g0) + Ws @ coeff
+        G1G2[:, 2] = -cosc0 * (g1 - g0) + Wc @ coeff
 
         # STORE THE FUNCTION IN SOME OTHER TEMPORARY ARRAY
         # INTERPOLATE IT SO THAT THE OMEGA RANGE AND POINTS ARE THE SAME AS IN THE EXPERIMENTAL DATA
         tt.num_columns = ft.num_columns
         tt.num_rows = ft.num_rows
         tt.data = np.zeros((ft.num_rows, ft.num_columns))
-        f1 = interpolate.interp1d(
-            wp, G1G2[:, 1], kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
-        f2 = interpolate.interp1d(
-            wp, G1G2[:, 2], kind="cubic", assume_sorted=True, fill_value="extrapolate"
-        )
+        fG = interpolate.CubicSpline(wp, G1G2[:, 1:], axis=0)
         tt.data[:, 0] = ft.data[:, 0]
-        tt.data[:, 1] = f1(ft.data[:, 0])
-        tt.data[:, 2] = f2(ft.data[:, 0])
+        tt.data[:, 1:3] = fG(ft.data[:, 0])
@@ -0,0 +1,169 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module bob_cache
+
+Persistent on-disk cache of the results of BoB calculations. The result of a BoB
+run only depends on the content of the polyconf file (or of the polymers sent in
+memory by a React theory), on the 'virtual' input file (material parameters, BoB
+settings), on the bob.rc file read by BoB if present, and on the frequency grid
+(LVE) or flow parameters (NLVE). A hash of these is the key of the cache, so that
+the same calculation is not repeated when a project is re-opened or the theory is
+recalculated.
+
+Each result is stored as a NumPy .npz file named after its key. The least
+recently used files are deleted when the total size of the cache goes over its
+cap. The functions and classes of this module do not depend on Qt.
+"""
+import os
+import glob
+import hashlib
+import numpy as np
+
+CACHE_BYTES = 256 * 2**20  # size cap of the on-disk cache
+
+_file_digests = {}  # (path, mtime, size): digest of the polyconf files read
+
+
+def file_digest(path):
+    """sha256 of the content of the file `path`, memoised on its modification
+    time and size"""
+    st = os.stat(path)
+    stamp = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if stamp not in _file_digests:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        _file_digests[stamp] = h.hexdigest()
+    return _file_digests[stamp]
+
+
+def polyconf_digest(polyconf):
+    """sha256 of the polymers sent to BoB in memory (see
+    react_ctypes_helper.polyconf_arrays)"""
+    h = hashlib.sha256()
+    for k in ("narms", "links", "armz", "armwt"):
+        h.update(np.ascontiguousarray(polyconf[k]).tobytes())
+    return h.hexdigest()
+
+
+def task_key(task):
+    """Key of the result of a BoB task (see bob_runner.run_bob): hash of the
+    polyconf content (file or arrays) and of all the parameters of the task. File
+    names do not enter the key. Return None if the polyconf file cannot be read"""
+    argv = task["argv"]
+    h = hashlib.sha256()
+    try:
+        if task.get("polyconf") is not None:
+            h.update(polyconf_digest(task["polyconf"]).encode())
+        else:
+            h.update(file_digest(argv[argv.index("-c") + 1]).encode())
+        if os.path.isfile("bob.rc"):
+            h.update(file_digest("bob.rc").encode())
+    except OSError:
+        return None
+    params = [("options", [a for a in argv if a.startswith("-")])]
+    params.append(("inp", [float(x) for x in task["virtual_input_file"]]))
+    for k in sorted(task):
+        if k in ("argv", "virtual_input_file", "polyconf"):
+            continue
+        v = task[k]
+        params.append((k, v if isinstance(v, (bool, str)) else float(v)))
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+
+class BobResultCache:
+    """LRU cache of BoB results (lists of arrays) in the folder `directory`"""
+
+    def __init__(self, directory, max_bytes=CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def path(self, key):
+        return os.path.join(self.directory, "%s.npz" % key)
+
+    def get(self, key):
+        """Arrays stored under `key`, or None"""
+        path = self.path(key)
+        try:
+            with np.load(path) as npz:
+                arrays = [npz["arr_%d" % i] for i in range(len(npz.files))]
+            os.utime(path)  # most recently used
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # unreadable entry, e.g. written by an interrupted RepTate
+            self.remove(path)
+            return None
+        return arrays
+
+    def put(self, key, arrays):
+        """Store the list of arrays under `key`, then evict the least recently used
+        entries if the cache is too big"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = "%s.%d.tmp" % (self.path(key), os.getpid())
+            with open(tmp, "wb") as f:
+                np.savez(f, *[np.asarray(a, dtype=np.double) for a in arrays])
+            os.replace(tmp, self.path(key))
+            self.evict()
+        except OSError:
+            pass  # the cache is only an optimisation
+
+    def evict(self):
+        """Delete the least recently used entries until the cache fits in
+        max_bytes"""
+        entries = []
+        for path in glob.glob(os.path.join(self.directory, "*.npz")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(e[1] for e in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(path)
+            total -= size
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        for path in glob.glob(os.path.join(self.directory, "*.npz")):
+            self.remove(path)
@@ -0,0 +1,204 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module bob_runner
+
+Run BoB calculations in worker processes. BoB keeps global state in its shared
+library, so a process can only run one calculation at a time, and a crash of the
+library takes the whole process down. Here, each calculation is sent as a message
+(BoB arguments, 'virtual' input file, frequency range, etc.) to a new process that
+loads its own instance of the library, and the results come back as NumPy arrays.
+Several calculations can then run concurrently, and a stuck calculation can be
+killed without losing the RepTate session.
+
+The functions of this module do not depend on Qt, so that they can be imported by
+the worker processes.
+"""
+import os
+import multiprocessing
+from multiprocessing.connection import wait
+from ctypes import c_bool
+import numpy as np
+from RepTate.theories.BobCtypesHelper import BobCtypesHelper, BobError
+
+POLL_INTERVAL = 0.2  # seconds between checks of the stop request
+
+
+class WorkerTheory:
+    """Stand-in for the theory in the worker process: holds what BobCtypesHelper
+    asks to its parent theory, and sends the messages of BoB to the main process"""
+
+    def __init__(self, conn, task):
+        self.conn = conn
+        self.freqmin = task.get("freqmin", 0.0)
+        self.freqmax = task.get("freqmax", 0.0)
+        self.freqint = task.get("freqint", 1.1)
+        self.virtual_input_file = task["virtual_input_file"]
+        self.polyconf = task.get("polyconf")
+        self.inp_counter = 0
+
+    def Qprint(self, msg):
+        self.conn.send(("print", msg))
+
+
+def worker_main(conn, task):
+    """Entry point of the worker process: run the BoB calculation described by
+    `task` and send the results"""
+    bch = BobCtypesHelper(WorkerTheory(conn, task))
+    bch.set_do_priority_seniority(c_bool(task.get("do_priority_seniority", False)))
+    try:
+        if task["kind"] == "lve":
+            res = bch.return_bob_lve(task["argv"])
+        else:
+            res = bch.return_bob_nlve(
+                task["argv"],
+                task["flowrate"],
+                task["tmin"],
+                task["tmax"],
+                task["is_shear"],
+            )
+    except BobError:
+        conn.send(("error", "BoB encountered an error"))
+    else:
+        conn.send(("result", [np.array(x) for x in res]))
+    conn.close()
+
+
+class BobProcess:
+    """A BoB calculation running in its own process"""
+
+    def __init__(self, task):
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=worker_main, args=(child_conn, task), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.messages = []
+        self.result = None
+        self.error = None
+        self.done = False
+
+    def receive(self, on_message=None):
+        """Read the messages sent by the worker. Return True when the calculation
+        is finished"""
+        try:
+            while self.conn.poll():
+                kind, value = self.conn.recv()
+                if kind == "print":
+                    self.messages.append(value)
+                    if on_message is not None:
+                        on_message(value)
+                elif kind == "result":
+                    self.result = value
+                    self.done = True
+                else:
+                    self.error = value
+                    self.done = True
+        except (EOFError, OSError):
+            # the worker exited without sending results (e.g. crash in BoB)
+            self.process.join()
+            self.error = "BoB worker stopped (exit code %s)" % self.process.exitcode
+            self.done = True
+        if self.done:
+            self.close()
+        return self.done
+
+    def kill(self):
+        """Terminate the worker, whatever it is doing"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.error = "BoB calculation killed"
+        self.done = True
+        self.close()
+
+    def close(self):
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+def run_bob(tasks, nworkers=None, on_message=None, should_stop=None):
+    """Run the BoB calculations `tasks` on at most `nworkers` processes at a time.
+
+    Each task is a dict with the entries:
+        - kind: "lve" or "nlve"
+        - argv: arguments of BoB main
+        - virtual_input_file: list of values read by BoB as its input file
+        - polyconf (optional): polymers read by BoB instead of the polyconf file,
+          as returned by react_ctypes_helper.polyconf_arrays
+        - do_priority_seniority
+        - freqmin, freqmax, freqint (lve)
+        - flowrate, tmin, tmax, is_shear (nlve)
+
+    Messages printed by BoB are passed to on_message(i, msg), with i the index of
+    the task. should_stop() is called regularly; if it returns True, the running
+    calculations are killed and the others are not started.
+
+    Return a list with, for each task, a dict with the entries:
+        - data: arrays [omega, G', G''] (lve) or [time, stress] (nlve), None if
+          the calculation failed
+        - error: None, or the reason why the calculation failed
+        - messages: list of the messages printed by BoB
+    """
+    if nworkers is None:
+        nworkers = os.cpu_count() or 1
+    nworkers = max(1, min(nworkers, len(tasks)))
+    pending = list(range(len(tasks)))
+    running = {}
+    results = [None] * len(tasks)
+    stopped = False
+    while pending or running:
+        if not stopped and should_stop is not None and should_stop():
+            stopped = True
+            for p in running.values():
+                p.kill()
+        while pending and len(running) < nworkers and not stopped:
+            i = pending.pop(0)
+            running[i] = BobProcess(tasks[i])
+        if stopped:
+            pending = []
+        else:
+            wait([p.conn for p in running.values()], timeout=POLL_INTERVAL)
+        for i, p in list(running.items()):
+            cb = None if on_message is None else (lambda msg, i=i: on_message(i, msg))
+            if p.done or p.receive(cb):
+                results[i] = {
+                    "data": p.result,
+                    "error": p.error,
+                    "messages": p.messages,
+                }
+                del running[i]
+    for i, r in enumerate(results):
+        if r is None:
+            results[i] = {"data": None, "error": "not started", "messages": []}
+    return results
@@ -20,61 +20,133 @@ try:
 except:
     print("OS %s not recognized in DTD CH" % (sys.platform))
 
+array_1d_double = np.ctypeslib.ndpointer(
+    dtype=np.double, ndim=1, flags="C_CONTIGUOUS"
+)
+array_1d_int = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, flags="C_CONTIGUOUS")
+array_1d_bool = np.ctypeslib.ndpointer(dtype=np.bool_, ndim=1, flags="C_CONTIGUOUS")
+
 dynamic_tube_dilution_freq = dtd_lib.dynamic_tube_dilution_freq
 dynamic_tube_dilution_freq.restype = c_bool
+dynamic_tube_dilution_freq.argtypes = (
+    [c_double] * 4 + [c_int] + [array_1d_double] * 3 + [c_double]
+)
 
 dynamic_tube_dilution_time = dtd_lib.dynamic_tube_dilution_time
 dynamic_tube_dilution_time.restype = c_bool
+dynamic_tube_dilution_time.argtypes = (
+    [c_double] * 4 + [c_int] + [array_1d_double] * 2 + [c_double]
+)
 
+try:
+    dynamic_tube_dilution_freq_batch = dtd_lib.dynamic_tube_dilution_freq_batch
+    dynamic_tube_dilution_freq_batch.restype = c_bool
+    dynamic_tube_dilution_freq_batch.argtypes = (
+        [c_int, array_1d_int] + [array_1d_double] * 7 + [c_double, array_1d_bool]
+    )
+
+    dynamic_tube_dilution_time_batch = dtd_lib.dynamic_tube_dilution_time_batch
+    dynamic_tube_dilution_time_batch.restype = c_bool
+    dynamic_tube_dilution_time_batch.argtypes = (
+        [c_int, array_1d_int] + [array_1d_double] * 6 + [c_double, array_1d_bool]
+    )
+except AttributeError:
+    # library compiled without the batch entry points
+    dynamic_tube_dilution_freq_batch = None
+    dynamic_tube_dilution_time_batch = None
 
-def calculate_dtd_freq(params, EPS):
-    """Calculate dynamic tube dilution in frequency domain"""
+
+def calculate_dtd_freq(params, EPS, gp=None, gpp=None):
+    """Calculate dynamic tube dilution in frequency domain
+
+    The frequencies are passed by pointer (copied only if they are not a contiguous
+    array of doubles). The results are written in gp and gpp if given.
+    """
     G0, a, tau_e, z, w = params
+    w = np.ascontiguousarray(w, dtype=np.double)
     n = len(w)
+    if gp is None:
+        gp = np.zeros(n)
+    if gpp is None:
+        gpp = np.zeros(n)
 
-    w_arr = (c_double * n)()
-    gp_arr = (c_double * n)()
-    gpp_arr = (c_double * n)()
-    w_arr[:] = w[:]
-    gp_arr[:] = np.zeros(n)[:]
-    gpp_arr[:] = np.zeros(n)[:]
-
-    success = dynamic_tube_dilution_freq(
-        c_double(G0),
-        c_double(a),
-        c_double(tau_e),
-        c_double(z),
-        c_int(n),
-        w_arr,
-        gp_arr,
-        gpp_arr,
-        c_double(EPS),
-    )
+    success = dynamic_tube_dilution_freq(G0, a, tau_e, z, n, w, gp, gpp, EPS)
+
+    return gp, gpp, success
 
-    # convert ctypes array to numpy
-    return (np.asarray(gp_arr[:]), np.asarray(gpp_arr[:]), success)
 
+def calculate_dtd_time(params, EPS, gt=None):
+    """Calculate dynamic tube dilution in time domain
 
-def calculate_dtd_time(params, EPS):
-    """Calculate dynamic tube dilution in time domain"""
+    The times are passed by pointer (copied only if they are not a contiguous array
+    of doubles). The result is written in gt if given.
+    """
     G0, a, tau_e, z, t = params
+    t = np.ascontiguousarray(t, dtype=np.double)
     n = len(t)
+    if gt is None:
+        gt = np.zeros(n)
 
-    t_arr = (c_double * n)()
-    gt_arr = (c_double * n)()
-    t_arr[:] = t[:]
-    gt_arr[:] = np.zeros(n)[:]
-
-    success = dynamic_tube_dilution_time(
-        c_double(G0),
-        c_double(a),
-        c_double(tau_e),
-        c_double(z),
-        c_int(n),
-        t_arr,
-        gt_arr,
-        c_double(EPS),
+    success = dynamic_tube_dilution_time(G0, a, tau_e, z, n, t, gt, EPS)
+
+    return gt, success
+
+
+def batch_arrays(params_list):
+    """Pack a list of [G0, a, tau_e, z, x] problems into the arrays of the batch
+    entry points: sizes, G0, a, tau_e, z, concatenated x, and the slices of each
+    problem"""
+    n = np.array([len(p[4]) for p in params_list], dtype=np.intc)
+    G0, a, tau_e, z = (
+        np.array([p[k] for p in params_list], dtype=np.double) for k in range(4)
     )
+    x = np.concatenate([p[4] for p in params_list]).astype(np.double)
+    bounds = np.concatenate(([0], np.cumsum(n)))
+    slices = [slice(bounds[i], bounds[i + 1]) for i in range(len(n))]
+    return n, G0, a, tau_e, z, x, slices
+
+
+def calculate_dtd_freq_batch(params_list, EPS):
+    """Dynamic tube dilution in frequency domain of several [G0, a, tau_e, z, w]
+    problems (e.g. one per Mw) in a single call to the C library
+
+    Returns a list with the arrays G', G'' and the success flag of each problem
+    """
+    if len(params_list) == 0:
+        return []
+    n, G0, a, tau_e, z, w, slices = batch_arrays(params_list)
+    out = np.zeros((2, len(w)))
+    success = np.zeros(len(n), dtype=np.bool_)
+    if dynamic_tube_dilution_freq_batch is not None:
+        dynamic_tube_dilution_freq_batch(
+            len(n), n, G0, a, tau_e, z, w, out[0], out[1], EPS, success
+        )
+    else:
+        for k, s in enumerate(slices):
+            success[k] = dynamic_tube_dilution_freq(
+                G0[k], a[k], tau_e[k], z[k], int(n[k]), w[s], out[0, s], out[1, s], EPS
+            )
+    return [(out[0, s], out[1, s], bool(success[k])) for k, s in enumerate(slices)]
+
+
+def calculate_dtd_time_batch(params_list, EPS):
+    """Dynamic tube dilution in time domain of several [G0, a, tau_e, z, t]
+    problems (e.g. one per Mw) in a single call to the C library
 
-    # convert ctypes array to numpy
-    return (np.asarray(gt_arr[:]), success)
+    Returns a list with the array G(t) and the success flag of each problem
+    """
+    if len(params_list) == 0:
+        return []
+    n, G0, a, tau_e, z, t, slices = batch_arrays(params_list)
+    out = np.zeros(len(t))
+    success = np.zeros(len(n), dtype=np.bool_)
+    if dynamic_tube_dilution_time_batch is not None:
+        dynamic_tube_dilution_time_batch(
+            len(n), n, G0, a, tau_e, z, t, out, EPS, success
+        )
+    else:
+        for k, s in enumerate(slices):
+            success[k] = dynamic_tube_dilution_time(
+                G0[k], a[k], tau_e[k], z[k], int(n[k]), t[s], out[s], EPS
+            )
+    return [(out[s], bool(success[k])) for k, s in enumerate(slices)]
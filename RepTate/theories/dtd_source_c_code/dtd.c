@@ -152,3 +152,33 @@ bool dynamic_tube_dilution_time(double G0, double a0, double tau_e0, double z0,
     }
     return true;
 }
+
+bool dynamic_tube_dilution_freq_batch(int nprob, int *n, double *G0, double *a0, double *tau_e0, double *z0, double *omega, double *gp, double *gpp, double EPS, bool *success)
+{
+    // DTD in frequency domain for several problems, stored one after the other in omega, gp and gpp
+    int k, offset = 0;
+    bool all_success = true;
+
+    for (k = 0; k < nprob; k++)
+    {
+        success[k] = dynamic_tube_dilution_freq(G0[k], a0[k], tau_e0[k], z0[k], n[k], omega + offset, gp + offset, gpp + offset, EPS);
+        all_success = all_success && success[k];
+        offset += n[k];
+    }
+    return all_success;
+}
+
+bool dynamic_tube_dilution_time_batch(int nprob, int *n, double *G0, double *a0, double *tau_e0, double *z0, double *times, double *gt, double EPS, bool *success)
+{
+    // DTD in time domain for several problems, stored one after the other in times and gt
+    int k, offset = 0;
+    bool all_success = true;
+
+    for (k = 0; k < nprob; k++)
+    {
+        success[k] = dynamic_tube_dilution_time(G0[k], a0[k], tau_e0[k], z0[k], n[k], times + offset, gt + offset, EPS);
+        all_success = all_success && success[k];
+        offset += n[k];
+    }
+    return all_success;
+}
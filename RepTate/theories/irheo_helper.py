@@ -0,0 +1,239 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module irheo_helper
+
+Vectorised i-Rheo transformation of time-domain data (relaxation modulus
+:math:`G(t)` or creep compliance :math:`J(t)`) to the frequency domain, shared by
+ApplicationGt and ApplicationCreep.
+
+The data is treated as piecewise linear between consecutive time points. The sum
+over segments is evaluated as a matrix product by blocks of (frequency, time) pairs,
+so that the memory used is bounded whatever the number of data points.
+"""
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import numpy as np
+from scipy import interpolate
+
+BLOCK_SIZE = 2**20  # maximum number of (w, t) pairs evaluated at once
+PARALLEL_SIZE = 2**24  # minimum number of (w, t) pairs to use several threads
+
+
+def interpolator(t, y):
+    """Spline interpolating y(t), of the highest order (up to cubic) allowed by the number of points"""
+    kind = ["zero", "linear", "quadratic", "cubic"][min(len(t), 4) - 1]
+    return interpolate.interp1d(
+        t, y, kind=kind, assume_sorted=True, fill_value="extrapolate"
+    )
+
+
+def oversample(t, over):
+    """Return t with ``over - 1`` log-spaced points inserted between consecutive values
+
+    All the values of t must be positive and sorted in increasing order.
+    """
+    if over <= 1 or len(t) < 2:
+        return np.array(t, dtype=float)
+    logt = np.log10(t)
+    frac = np.arange(1, over + 1) / over
+    inner = logt[:-1, None] + np.outer(np.diff(logt), frac)
+    inner[:, -1] = logt[1:]
+    tover = np.empty(1 + inner.size)
+    tover[0] = t[0]
+    tover[1:] = np.power(10.0, inner.ravel())
+    return tover
+
+
+def segment_sum(t, y, w, block_size=BLOCK_SIZE):
+    """Sum over the linear segments of y(t) of the Fourier terms of the i-Rheo transform
+
+    .. math::
+        S(\\omega) = \\sum_k \\frac{y_{k+1} - y_k}{t_{k+1} - t_k}
+        \\left( e^{-i\\omega t_k} - e^{-i\\omega t_{k+1}} \\right)
+
+    The difference of exponentials is evaluated as
+    :math:`2i\\sin(\\omega h_k) e^{-i\\omega m_k}`, with :math:`m_k` and :math:`h_k`
+    the midpoint and half-width of each segment, to avoid cancellation errors.
+    """
+    w = np.asarray(w, dtype=float)
+    mid = 0.5 * (t[1:] + t[:-1])
+    half = 0.5 * (t[1:] - t[:-1])
+    coeff = 2 * (y[1:] - y[:-1]) / (t[1:] - t[:-1])
+    re = np.zeros(len(w))
+    im = np.zeros(len(w))
+    nseg = len(mid)
+    if nseg == 0:
+        return re + 1j * im
+    tblock = min(nseg, block_size)
+    wblock = max(1, block_size // tblock)
+
+    def wrange_sum(i):
+        wi = w[i : i + wblock, None]
+        for j in range(0, nseg, tblock):
+            sh = np.sin(wi * half[j : j + tblock])
+            sh *= coeff[j : j + tblock]
+            wm = wi * mid[j : j + tblock]
+            re[i : i + wblock] += np.einsum("ij,ij->i", sh, np.sin(wm))
+            im[i : i + wblock] += np.einsum("ij,ij->i", sh, np.cos(wm, out=wm))
+
+    starts = range(0, len(w), wblock)
+    if len(starts) > 1 and nseg * len(w) > PARALLEL_SIZE:
+        # numpy releases the GIL in the trigonometric functions
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            list(pool.map(wrange_sum, starts))
+    else:
+        for i in starts:
+            wrange_sum(i)
+    return re + 1j * im
+
+
+def frequency_grid(t1, tinf, n, max_points=None):
+    """Log-spaced frequencies between 1/tinf and 1/t1
+
+    If ``max_points`` is given, at most that number of frequencies is used (fast
+    evaluation of very large data sets on a coarser logarithmic grid).
+    """
+    if max_points is not None:
+        n = min(n, max_points)
+    return np.logspace(np.log10(1 / tinf), np.log10(1 / t1), n)
+
+
+def _prepare(t, y, over):
+    """Value at t=0 and time-domain segments (oversampled if required) of y(t)"""
+    f = interpolator(t, y)
+    y0 = float(f(0))
+    ind1 = np.argmax(t > 0)
+    tseg = t[ind1:]
+    yseg = y[ind1:]
+    if over > 1:
+        tseg = oversample(tseg, over)
+        yseg = f(tseg)
+    return y0, ind1, tseg, yseg
+
+
+def gt_to_gstar(t, g, over=1, max_points=None, block_size=BLOCK_SIZE):
+    """i-Rheo transformation of the relaxation modulus G(t)
+
+    Parameters:
+        - t: sorted array of unique times
+        - g: relaxation modulus at times t
+        - over: oversampling ratio (1 for no oversampling)
+        - max_points: maximum number of frequencies (None for as many as data points)
+
+    Returns:
+        - w, G', G'' (arrays), or None if the time range is not valid
+    """
+    y0, ind1, tseg, yseg = _prepare(t, g, over)
+    t1 = t[ind1]
+    g1 = g[ind1]
+    tinf = np.max(t)
+    if tinf <= 0 or t1 <= 0:
+        return None
+    w = frequency_grid(t1, tinf, len(t), max_points)
+    S = segment_sum(tseg, yseg, w, block_size)
+    wt1 = w * t1
+    Gp = y0 + np.sin(wt1) * (g1 - y0) / wt1 + S.imag / w
+    Gpp = -(1 - np.cos(wt1)) * (g1 - y0) / wt1 - S.real / w
+    return w, Gp, Gpp
+
+
+def jt_to_gstar(t, j, eta, over=1, max_points=None, block_size=BLOCK_SIZE):
+    """i-Rheo transformation of the creep compliance J(t)
+
+    Parameters:
+        - t: sorted array of unique times
+        - j: creep compliance at times t
+        - eta: steady-state viscosity
+        - over: oversampling ratio (1 for no oversampling)
+        - max_points: maximum number of frequencies (None for as many as data points)
+
+    Returns:
+        - w, G', G'' (arrays), or None if the time range is not valid
+    """
+    j0, ind1, tseg, jseg = _prepare(t, j, over)
+    t1 = t[ind1]
+    j1 = j[ind1]
+    tN = np.max(t)
+    if tN <= 0 or t1 <= 0:
+        return None
+    w = frequency_grid(t1, tN, len(t), max_points)
+    aux = (
+        1j * w * j0
+        + (1 - np.exp(-1j * w * t1)) * (j1 - j0) / t1
+        + np.exp(-1j * w * tN) / eta
+        + segment_sum(tseg, jseg, w, block_size)
+    )
+    Gstar = 1j * w / aux
+    return w, Gstar.real, Gstar.imag
+
+
+class TransformCache:
+    """Least-recently-used store of view transformations
+
+    Entries are keyed by the content of the data arrays and the settings of the
+    transformation, so that switching views does not recompute unchanged files.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    @staticmethod
+    def key(arrays, *settings):
+        """Key from the content of a list of arrays and a number of hashable settings"""
+        h = hashlib.sha1()
+        for a in arrays:
+            a = np.ascontiguousarray(a)
+            h.update(str(a.shape).encode())
+            h.update(a.view(np.uint8))
+        return (h.hexdigest(),) + settings
+
+    def get(self, key):
+        """Return a copy of the cached result, or None"""
+        value = self.entries.get(key)
+        if value is None:
+            return None
+        self.entries.move_to_end(key)
+        return tuple(np.copy(v) for v in value)
+
+    def put(self, key, value):
+        """Store a result (tuple of arrays)"""
+        self.entries[key] = tuple(np.copy(v) for v in value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
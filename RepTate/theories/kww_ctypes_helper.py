@@ -1,9 +1,12 @@
 """
 Define the C-variables and functions from the C-files that are needed in Python
 """
-from ctypes import c_double, CDLL
+from ctypes import c_double, c_int, CDLL
+from collections import OrderedDict
 import sys
 import os
+import numpy as np
+from scipy import interpolate
 
 dir_path = os.path.dirname(
     os.path.realpath(__file__)
@@ -26,3 +29,96 @@ kwws = kww_lib.kwws
 kwws.argtypes = [c_double, c_double]
 kwws.restype = c_double
 
+
+array_1d_double = np.ctypeslib.ndpointer(dtype=np.double, ndim=1, flags="C_CONTIGUOUS")
+try:
+    kwwc_array_c = kww_lib.kwwc_array
+    kwwc_array_c.argtypes = [c_int, array_1d_double, c_double, array_1d_double]
+    kwwc_array_c.restype = None
+    kwws_array_c = kww_lib.kwws_array
+    kwws_array_c.argtypes = [c_int, array_1d_double, c_double, array_1d_double]
+    kwws_array_c.restype = None
+except AttributeError:
+    # library compiled without the array entry points
+    kwwc_array_c = None
+    kwws_array_c = None
+
+
+def _kww_array(func_array, func, w, beta):
+    """Evaluate the KWW transform func for all the values of the array w"""
+    w = np.ascontiguousarray(w, dtype=np.double)
+    res = np.empty_like(w)
+    if func_array is not None:
+        func_array(w.size, w.reshape(-1), beta, res.reshape(-1))
+    else:
+        res.reshape(-1)[:] = [func(x, beta) for x in w.reshape(-1)]
+    return res
+
+
+def kwwc_array(w, beta):
+    """Cosine transform of the KWW function for an array of frequencies, in one foreign call"""
+    return _kww_array(kwwc_array_c, kwwc, w, beta)
+
+
+def kwws_array(w, beta):
+    """Sine transform of the KWW function for an array of frequencies, in one foreign call"""
+    return _kww_array(kwws_array_c, kwws, w, beta)
+
+
+class KWWTable:
+    """Cubic-spline tables of the KWW cosine and sine transforms against log10(w)
+
+    The tables are built once per value of beta (the last ``maxsize`` values of beta
+    are kept), so that evaluations where only the amplitudes or the relaxation times
+    of the modes change do not call the C library. Points outside the tabulated range
+    are evaluated directly.
+    """
+
+    LOGW_MIN = -8.0
+    LOGW_MAX = 8.0
+    POINTS_PER_DECADE = 50
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.tables = OrderedDict()
+
+    def get_table(self, beta):
+        """Return the splines of log10(kwwc) and log10(kwws), or None if they cannot be tabulated"""
+        if beta in self.tables:
+            self.tables.move_to_end(beta)
+            return self.tables[beta]
+        n = int((self.LOGW_MAX - self.LOGW_MIN) * self.POINTS_PER_DECADE) + 1
+        logw = np.linspace(self.LOGW_MIN, self.LOGW_MAX, n)
+        w = np.power(10.0, logw)
+        c = kwwc_array(w, beta)
+        s = kwws_array(w, beta)
+        if np.all(c > 0) and np.all(s > 0) and np.all(np.isfinite(c * s)):
+            table = (
+                interpolate.CubicSpline(logw, np.log10(c)),
+                interpolate.CubicSpline(logw, np.log10(s)),
+            )
+        else:
+            table = None  # e.g. Gaussian decay for beta close to 2
+        self.tables[beta] = table
+        while len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+        return table
+
+    def kwwc_kwws(self, w, beta):
+        """Return the cosine and sine transforms of the KWW function for the array w"""
+        w = np.asarray(w, dtype=np.double)
+        table = self.get_table(beta)
+        if table is None:
+            return kwwc_array(w, beta), kwws_array(w, beta)
+        c = np.empty_like(w)
+        s = np.empty_like(w)
+        with np.errstate(divide="ignore"):
+            logw = np.log10(w)
+        inside = (logw >= self.LOGW_MIN) & (logw <= self.LOGW_MAX)
+        c[inside] = np.power(10.0, table[0](logw[inside]))
+        s[inside] = np.power(10.0, table[1](logw[inside]))
+        outside = ~inside
+        if np.any(outside):
+            c[outside] = kwwc_array(w[outside], beta)
+            s[outside] = kwws_array(w[outside], beta)
+        return c, s
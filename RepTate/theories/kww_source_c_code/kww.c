@@ -237,6 +237,21 @@ double kwws( const double w_in, const double beta )
     return sign_out*res;
 }
 
+/* Array versions, to evaluate many points in a single call */
+void kwwc_array( const int n, const double* w, const double beta, double* res )
+{
+    int i;
+    for ( i=0; i<n; i++ )
+        res[i] = kwwc( w[i], beta );
+}
+
+void kwws_array( const int n, const double* w, const double beta, double* res )
+{
+    int i;
+    for ( i=0; i<n; i++ )
+        res[i] = kwws( w[i], beta );
+}
+
 /* \int_0^w dw' \int_0^\infty dt cos(w'*t) exp(-t^beta) */
 double kwwp( const double w_in, const double beta )
 {
@@ -59,6 +59,10 @@ double kwws( const double w, const double beta );
 /* \int_0^w dw' kwwc(w') */
 double kwwp( const double w, const double beta );
 
+/* Array versions: res[i] = kwwc(w[i], beta), kwws(w[i], beta), for i=0..n-1 */
+void kwwc_array( const int n, const double* w, const double beta, double* res );
+void kwws_array( const int n, const double* w, const double beta, double* res );
+
 
 /*****************************************************************************/
 /*  Low-level calls                                                          */
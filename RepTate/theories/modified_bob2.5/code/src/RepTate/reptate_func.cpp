@@ -34,7 +34,9 @@
 // --------------------------------------------------------------------------------------------------------
 //    THE FOLLOWING IS FOR REPTATE COMPATIBILITY
 #include <stdio.h>
+#include <string.h>
 #include <cstdlib>
+#include <string>
 #include <exception>
 #include <math.h>
 #include "../../include/bob.h"
@@ -123,6 +125,87 @@ void def_get_string(pyget_string F)
     get_string = F;
 }
 
+// bulk in-memory input: the 'virtual' inp and proto files and the strings are sent
+// in one call, and read from here instead of calling Python for each item
+static std::vector<double> bulk_inp, bulk_proto;
+static std::vector<std::string> bulk_str[2];
+static size_t bulk_inp_pos, bulk_proto_pos, bulk_str_pos[2];
+
+// polymers sent in memory instead of a polyconf file, read by polyread_bulk
+bool bulk_polyconf_set = false;
+std::vector<int> bulk_polyconf_narms, bulk_polyconf_links;
+std::vector<double> bulk_polyconf_armz, bulk_polyconf_armwt;
+
+static double next_item_from_bulk_inp()
+{
+    if (bulk_inp_pos >= bulk_inp.size())
+    {
+        my_abort((char *)"Unexpected end of the input file\n");
+    }
+    return bulk_inp[bulk_inp_pos++];
+}
+
+static double next_item_from_bulk_proto()
+{
+    if (bulk_proto_pos >= bulk_proto.size())
+    {
+        my_abort((char *)"Unexpected end of the proto file\n");
+    }
+    return bulk_proto[bulk_proto_pos++];
+}
+
+static void next_string_from_bulk(char *s, int code)
+{
+    if (code < 0 || code > 1 || bulk_str_pos[code] >= bulk_str[code].size())
+    {
+        my_abort((char *)"Missing file or polymer name in the input\n");
+    }
+    // the destination buffers hold 256 characters
+    strncpy(s, bulk_str[code][bulk_str_pos[code]++].c_str(), 255);
+    s[255] = '\0';
+}
+
+void set_bulk_input(int n_inp, double *inp, int n_proto, double *proto, int n_str, char *str, int *str_code)
+{
+    /* n_inp values of the inp file, n_proto values of the proto file, and n_str
+       null-terminated strings concatenated in str, str_code[i] being 0 for
+       filenames of polyconf inputs and 1 for polymer names */
+    bulk_inp.assign(inp, inp + n_inp);
+    bulk_proto.assign(proto, proto + n_proto);
+    bulk_str[0].clear();
+    bulk_str[1].clear();
+    const char *p = str;
+    for (int i = 0; i < n_str; i++)
+    {
+        std::string item(p);
+        p += item.size() + 1;
+        if (str_code[i] == 0 || str_code[i] == 1)
+        {
+            bulk_str[str_code[i]].push_back(item);
+        }
+    }
+    bulk_inp_pos = bulk_proto_pos = 0;
+    bulk_str_pos[0] = bulk_str_pos[1] = 0;
+    get_next_inp = next_item_from_bulk_inp;
+    get_next_proto = next_item_from_bulk_proto;
+    get_string = next_string_from_bulk;
+    // a new input: polymers are read from the polyconf file unless sent again
+    bulk_polyconf_set = false;
+}
+
+void set_bulk_polyconf(int npoly, int *narms, int n_arms, int *links, double *armz, double *armwt)
+{
+    /* npoly polymers, narms[i] being the number of arms of polymer i, and for each
+       of the n_arms arms, the 4 links L1, L2, R1, R2, the length (armz) and the
+       weight fraction (armwt), as in the lines of a polyconf file. Call after
+       set_bulk_input */
+    bulk_polyconf_narms.assign(narms, narms + npoly);
+    bulk_polyconf_links.assign(links, links + 4 * (size_t)n_arms);
+    bulk_polyconf_armz.assign(armz, armz + n_arms);
+    bulk_polyconf_armwt.assign(armwt, armwt + n_arms);
+    bulk_polyconf_set = true;
+}
+
 void my_abort(char *s)
 {
     if (reptate_flag)
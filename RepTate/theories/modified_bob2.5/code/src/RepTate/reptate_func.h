@@ -60,6 +60,8 @@ extern "C" void def_get_freqint(pyget_double F);
 extern "C" void def_get_next_item_from_inp_file(pyget_double F);
 extern "C" void def_get_next_item_from_proto_file(pyget_double F);
 extern "C" void def_get_string(pyget_string F);
+extern "C" void set_bulk_input(int n_inp, double *inp, int n_proto, double *proto, int n_str, char *str, int *str_code);
+extern "C" void set_bulk_polyconf(int npoly, int *narms, int n_arms, int *links, double *armz, double *armwt);
 extern "C" bool reptate_save_polyconf_and_return_gpc(int argc, char **argv, int nbin, int ncomp, int ni, int nf, double *mn, double *mw, double *lgmid_out, double *wtbin_out, double *brbin_out, double *gbin_out);
 extern "C" bool run_bob_lve(int argc, char **argv, int *n);
 extern "C" bool get_bob_lve(double *omega_out, double *gp_out, double *gpp_out);
@@ -26,6 +26,8 @@ void get_poly(void)
   extern char conffname[256];
   extern void get_poly_component(int, double);
   extern void polyread(void);
+  extern void polyread_bulk(void);
+  extern bool bulk_polyconf_set;
   extern void polywrite(void);
   int num_comp;
   int shouldread = 1;
@@ -87,7 +89,14 @@ void get_poly(void)
     extern FILE *inpfl;
     // fscanf(inpfl, "%d", &num_comp);
     num_comp = (int) get_next_inp();
-    if (num_comp == 0)
+    if (num_comp == 0 && bulk_polyconf_set)
+    {
+      // polymers sent by RepTate, no polyconf file
+      shouldread = 0;
+      conffl = NULL;
+      polyread_bulk();
+    }
+    else if (num_comp == 0)
     {
       shouldread = 0;
       conffl = fopen(conffname, "r");
@@ -140,5 +149,8 @@ void get_poly(void)
     }
   }
 
-  fclose(conffl);
+  if (conffl != NULL)
+  {
+    fclose(conffl);
+  }
 }
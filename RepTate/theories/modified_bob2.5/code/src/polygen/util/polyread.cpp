@@ -19,15 +19,43 @@ Copyright (C) 2006-2011, 2012 C. Das, D.J. Read, T.C.B. McLeish
 #include <stdio.h>
 #include <string.h>
 
+// add arm j, with links LL1, LL2, RR1, RR2, of the polymer i; nsv is the first
+// arm of the polymer
+static void polyread_arm(int i, int j, int &nsv, int LL1, int LL2, int RR1, int RR2, double seglen, double volfrac)
+{
+  extern std::vector<arm> arm_pool;
+  extern std::vector<polymer> branched_poly;
+  int n1;
+
+  int n = request_arm();
+  if (j == 0)
+  {
+    nsv = n;
+    branched_poly[i].first_end = n;
+    arm_pool[n].up = n;
+    arm_pool[n].down = n;
+  }
+  arm_pool[n].L1 = fold_rd(LL1, nsv);
+  arm_pool[n].L2 = fold_rd(LL2, nsv);
+  arm_pool[n].R1 = fold_rd(RR1, nsv);
+  arm_pool[n].R2 = fold_rd(RR2, nsv);
+  n1 = arm_pool[nsv].up;
+  arm_pool[nsv].up = n;
+  arm_pool[n].down = nsv;
+  arm_pool[n].up = n1;
+  arm_pool[n1].down = n;
+  arm_pool[n].arm_len = seglen;
+  arm_pool[n].vol_fraction = volfrac;
+}
+
 void polyread(void)
 {
   extern FILE *conffl;
   extern int num_poly;
-  extern std::vector<arm> arm_pool;
   extern std::vector<polymer> branched_poly;
   extern char polycode[10];
 
-  int segnum, LL1, LL2, RR1, RR2, nsv, n1;
+  int segnum, LL1, LL2, RR1, RR2, nsv;
   nsv = 0;
   double seglen, volfrac, N_e_dummy;
 
@@ -66,26 +94,43 @@ void polyread(void)
     for (int j = 0; j < segnum; j++)
     {
       fscanf(conffl, "%d %d %d %d %le %le", &LL1, &LL2, &RR1, &RR2, &seglen, &volfrac);
-      int n = request_arm();
-      if (j == 0)
-      {
-        nsv = n;
-        branched_poly[i].first_end = n;
-        arm_pool[n].up = n;
-        arm_pool[n].down = n;
-      }
-      arm_pool[n].L1 = fold_rd(LL1, nsv);
-      arm_pool[n].L2 = fold_rd(LL2, nsv);
-      arm_pool[n].R1 = fold_rd(RR1, nsv);
-      arm_pool[n].R2 = fold_rd(RR2, nsv);
-      n1 = arm_pool[nsv].up;
-      arm_pool[nsv].up = n;
-      arm_pool[n].down = nsv;
-      arm_pool[n].up = n1;
-      arm_pool[n1].down = n;
-      arm_pool[n].arm_len = seglen;
-      arm_pool[n].vol_fraction = volfrac;
+      polyread_arm(i, j, nsv, LL1, LL2, RR1, RR2, seglen, volfrac);
+    }
+    poly_start(&branched_poly[i]);
+  }
+}
+
+// same as polyread, for the polymers sent by RepTate as arrays instead of a
+// polyconf file (see set_bulk_polyconf). The arrays are released once read
+void polyread_bulk(void)
+{
+  extern int num_poly;
+  extern std::vector<polymer> branched_poly;
+  extern char polycode[10];
+  extern std::vector<int> bulk_polyconf_narms, bulk_polyconf_links;
+  extern std::vector<double> bulk_polyconf_armz, bulk_polyconf_armwt;
+  extern bool bulk_polyconf_set;
+
+  int nsv = 0;
+  size_t k = 0;
+  strcpy(polycode, "reactpol");
+  num_poly = bulk_polyconf_narms.size();
+  for (int i = 0; i < num_poly; i++)
+  {
+    if (flag_stop_bob)
+    {
+      my_abort((char *)"Calculations interrupted by user\n");
+    }
+    for (int j = 0; j < bulk_polyconf_narms[i]; j++, k++)
+    {
+      const int *links = &bulk_polyconf_links[4 * k];
+      polyread_arm(i, j, nsv, links[0], links[1], links[2], links[3], bulk_polyconf_armz[k], bulk_polyconf_armwt[k]);
     }
     poly_start(&branched_poly[i]);
   }
+  bulk_polyconf_set = false;
+  std::vector<int>().swap(bulk_polyconf_narms);
+  std::vector<int>().swap(bulk_polyconf_links);
+  std::vector<double>().swap(bulk_polyconf_armz);
+  std::vector<double>().swap(bulk_polyconf_armwt);
 }
@@ -52,6 +52,11 @@ try:
 except:
     print("OS %s not recognized in React CH module" % (sys.platform))
 
+array_1d_double = np.ctypeslib.ndpointer(
+    dtype=np.double, ndim=1, flags="C_CONTIGUOUS"
+)
+array_1d_int = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, flags="C_CONTIGUOUS")
+
 ###############
 # polybits.c
 ###############
@@ -234,6 +239,64 @@ set_do_prio_senio.restype = None
 set_flag_stop_all = react_lib.set_flag_stop_all
 set_flag_stop_all.restype = None
 
+try:
+    flag_stop_all = ct.c_bool.in_dll(react_lib, "flag_stop_all")
+except ValueError:
+    flag_stop_all = ct.c_bool(False)
+
+# status returned by make_polys and the <simulation>_batch functions
+MAKE_POLYS_DONE = 0  # all the polymers requested were made
+MAKE_POLYS_NO_POLY = 1  # ran out of polymer records
+MAKE_POLYS_NO_ARM = 2  # ran out of arm records
+MAKE_POLYS_ERROR = 3  # simulation error flag set (e.g. gelation)
+MAKE_POLYS_STOPPED = 4  # stop requested by the user
+
+
+def make_polys(nmake, ndist, make_one, errorflag=None):
+    """Make up to nmake polymers of distribution ndist with the simulation function
+    make_one, one C call per polymer. Python version of make_polys (polybits.c),
+    used if the library was compiled without the <simulation>_batch functions.
+    errorflag returns the error flag of the simulation.
+
+    Returns the status (MAKE_POLYS_...) and the number of polymers made
+    """
+    c_m = ct.c_int()
+    nmade = 0
+    while nmade < nmake:
+        if flag_stop_all.value:
+            return MAKE_POLYS_STOPPED, nmade
+        if not request_poly(ct.byref(c_m)):
+            return MAKE_POLYS_NO_POLY, nmade
+        m = c_m.value
+        # put it in list
+        if react_dist[ndist].contents.npoly == 0:  # case of first polymer made
+            react_dist[ndist].contents.first_poly = m
+            set_br_poly_nextpoly(ct.c_int(m), ct.c_int(0))
+        else:  # next polymer, put to top of list
+            set_br_poly_nextpoly(
+                ct.c_int(m), ct.c_int(react_dist[ndist].contents.first_poly)
+            )
+            react_dist[ndist].contents.first_poly = m
+        # make a polymer, returns false if arms ran out
+        if not make_one(ct.c_int(m), ct.c_int(ndist)):
+            return MAKE_POLYS_NO_ARM, nmade
+        react_dist[ndist].contents.npoly += 1
+        nmade += 1
+        if errorflag is not None and errorflag():
+            return MAKE_POLYS_ERROR, nmade
+    return MAKE_POLYS_DONE, nmade
+
+
+def batch_function(name):
+    """Return the <simulation>_batch function of the library, None if missing"""
+    try:
+        batch = getattr(react_lib, name)
+    except AttributeError:
+        return None
+    batch.restype = ct.c_int
+    return batch
+
+
 init_bin_prio_vs_senio = react_lib.init_bin_prio_vs_senio
 init_bin_prio_vs_senio.restype = None
 init_bin_prio_vs_senio.argtypes = [ct.c_int]
@@ -262,6 +325,39 @@ return_proba_senio.restype = ct.c_double
 return_max_senio = react_lib.return_max_senio
 return_max_senio.restype = ct.c_int
 
+# priority and seniority bins, to merge simulations run in separate processes
+PRIO_SENIO_NSUMS = 8  # number of double arrays in get_bin_prio_vs_senio
+try:
+    n_prio_senio_bins = react_lib.return_n_prio_senio_bins()
+
+    get_bin_prio_vs_senio = react_lib.get_bin_prio_vs_senio
+    get_bin_prio_vs_senio.restype = None
+    get_bin_prio_vs_senio.argtypes = [array_1d_double, array_1d_int]
+
+    add_bin_prio_vs_senio = react_lib.add_bin_prio_vs_senio
+    add_bin_prio_vs_senio.restype = None
+    add_bin_prio_vs_senio.argtypes = [array_1d_double, array_1d_int]
+except AttributeError:
+    # library compiled without the merging functions
+    n_prio_senio_bins = 0
+    get_bin_prio_vs_senio = None
+    add_bin_prio_vs_senio = None
+
+# priority and seniority histograms, copied in a single call
+PRIO_SENIO_NHIST = 3  # number of histograms in get_hist_v_senio/prio
+try:
+    get_hist_v_senio = react_lib.get_hist_v_senio
+    get_hist_v_senio.restype = None
+    get_hist_v_senio.argtypes = [ct.c_int, array_1d_double]
+
+    get_hist_v_prio = react_lib.get_hist_v_prio
+    get_hist_v_prio.restype = None
+    get_hist_v_prio.argtypes = [ct.c_int, array_1d_double]
+except AttributeError:
+    # library compiled without the histogram functions
+    get_hist_v_senio = None
+    get_hist_v_prio = None
+
 # initialise lists
 react_dist = None
 
@@ -304,6 +400,19 @@ tobbatchstart.restype = None
 tobbatch = react_lib.tobbatch
 tobbatch.restype = ct.c_bool
 
+tobbatch_batch = batch_function("tobbatch_batch")
+
+
+def tobbatch_make(nmake, ndist):
+    """Make nmake polymers with tobbatch, returns the status and number made"""
+    if tobbatch_batch is None:
+        return make_polys(
+            nmake, ndist, tobbatch, lambda: tb_global.tobitabatcherrorflag
+        )
+    nmade = ct.c_int()
+    status = tobbatch_batch(ct.c_int(nmake), ct.c_int(ndist), ct.byref(nmade))
+    return status, nmade.value
+
 ###############
 # binsandbob.c
 ###############
@@ -321,20 +430,107 @@ class binsandbob_global(ct.Structure):
 
 # global variable
 bab_global = binsandbob_global.in_dll(react_lib, "bab_global")
+iy3 = ct.c_long.in_dll(react_lib, "iy3")  # seed of the random numbers (ran3)
 
 # function
 molbin = react_lib.molbin
 molbin.restype = None
 
+# the three steps of molbin, to merge simulations run in separate processes
+MOLBIN_NSUMS = 7  # number of polymers, sum of M, M^2, M^3, M^4, 1/M and br/length
+try:
+    molbin_limits = react_lib.molbin_limits
+    molbin_limits.restype = None
+    molbin_limits.argtypes = [
+        ct.c_int,
+        ct.POINTER(ct.c_double),
+        ct.POINTER(ct.c_double),
+    ]
+
+    molbin_sums = react_lib.molbin_sums
+    molbin_sums.restype = None
+    molbin_sums.argtypes = [ct.c_int, ct.c_double, ct.c_double, array_1d_double]
+
+    molbin_finalise = react_lib.molbin_finalise
+    molbin_finalise.restype = None
+    molbin_finalise.argtypes = [ct.c_int, ct.c_double, ct.c_double, array_1d_double]
+except AttributeError:
+    # library compiled without the merging functions
+    molbin_limits = None
+    molbin_sums = None
+    molbin_finalise = None
+
 polyconfwrite = react_lib.polyconfwrite
 polyconfwrite.restype = None
 
 multipolyconfwrite = react_lib.multipolyconfwrite
 multipolyconfwrite.restype = ct.c_ulonglong
 
+# polyconf writers reporting their progress, which can be cancelled
+POLYCONF_PROGRESS_STEP = 100000  # arms written between progress reports
+# progress(nwritten) returns False to cancel
+polyconf_progress = ct.CFUNCTYPE(ct.c_bool, ct.c_ulonglong)
+try:
+    polyconfwrite_progress = react_lib.polyconfwrite_progress
+    polyconfwrite_progress.restype = ct.c_bool
+    polyconfwrite_progress.argtypes = [ct.c_int, ct.c_char_p, polyconf_progress]
+
+    multipolyconfwrite_progress = react_lib.multipolyconfwrite_progress
+    multipolyconfwrite_progress.restype = ct.c_bool
+    multipolyconfwrite_progress.argtypes = [
+        ct.c_char_p,
+        array_1d_double,
+        array_1d_int,
+        ct.c_int,
+        polyconf_progress,
+    ]
+except AttributeError:
+    # library compiled without the progress writers
+    polyconfwrite_progress = None
+    multipolyconfwrite_progress = None
+
+# saved polymers copied to arrays, for BoB to read them without a polyconf file
+try:
+    polyconf_count_arms = react_lib.polyconf_count_arms
+    polyconf_count_arms.restype = ct.c_ulonglong
+    polyconf_count_arms.argtypes = [array_1d_int, ct.c_int]
+
+    get_polyconf_arrays = react_lib.polyconf_arrays
+    get_polyconf_arrays.restype = ct.c_ulonglong
+    get_polyconf_arrays.argtypes = [
+        array_1d_double,
+        array_1d_int,
+        ct.c_int,
+        array_1d_int,
+        array_1d_int,
+        array_1d_double,
+        array_1d_double,
+    ]
+except AttributeError:
+    # library compiled without the array export
+    polyconf_count_arms = None
+    get_polyconf_arrays = None
+
 multimolbin = react_lib.multimolbin
 multimolbin.restype = None
 
+# bins of the components of a mixture, mixed in Python with any weights
+MIX_NSUMS = 4  # number of polymers, sum of M, 1/M and br/length
+try:
+    mix_component_bins = react_lib.mix_component_bins
+    mix_component_bins.restype = None
+    mix_component_bins.argtypes = [
+        ct.c_int,
+        ct.c_double,
+        ct.c_double,
+        ct.c_int,
+        array_1d_double,
+        array_1d_double,
+    ]
+except AttributeError:
+    # library compiled without the mixing functions
+    mix_component_bins = None
+
 return_binsandbob_multi_avbr = react_lib.return_binsandbob_multi_avbr
 return_binsandbob_multi_avbr.restype = ct.c_double
 
@@ -376,6 +572,19 @@ tobCSTRstart.restype = None
 tobCSTR = react_lib.tobCSTR
 tobCSTR.restype = ct.c_bool
 
+tobCSTR_batch = batch_function("tobCSTR_batch")
+
+
+def tobCSTR_make(nmake, ndist):
+    """Make nmake polymers with tobCSTR, returns the status and number made"""
+    if tobCSTR_batch is None:
+        return make_polys(
+            nmake, ndist, tobCSTR, lambda: tCSTR_global.tobitaCSTRerrorflag
+        )
+    nmade = ct.c_int()
+    status = tobCSTR_batch(ct.c_int(nmake), ct.c_int(ndist), ct.byref(nmade))
+    return status, nmade.value
+
 ###############
 # dieneCSTR.c
 ###############
@@ -396,6 +605,29 @@ dieneCSTRstart.restype = None
 dieneCSTR = react_lib.dieneCSTR
 dieneCSTR.restype = ct.c_bool
 
+dieneCSTR_batch = batch_function("dieneCSTR_batch")
+
+
+def dieneCSTR_make(nmake, ndist, ngel):
+    """Make nmake polymers with dieneCSTR, returns the status and number made.
+    Polymers too large (gelation) do not stop the batch, they are counted in
+    ngel (a ct.c_int)"""
+    if dieneCSTR_batch is None:
+
+        def make_one(m, n):
+            success = dieneCSTR(m, n)
+            if success and dCSTR_global.dieneCSTRerrorflag:
+                ngel.value += 1
+                dCSTR_global.dieneCSTRerrorflag = False
+            return success
+
+        return make_polys(nmake, ndist, make_one)
+    nmade = ct.c_int()
+    status = dieneCSTR_batch(
+        ct.c_int(nmake), ct.c_int(ndist), ct.byref(nmade), ct.byref(ngel)
+    )
+    return status, nmade.value
+
 ################
 # MultiMetCSTR.c
 ################
@@ -416,6 +648,19 @@ mulmetCSTRstart.restype = None
 mulmetCSTR = react_lib.mulmetCSTR
 mulmetCSTR.restype = ct.c_bool
 
+mulmetCSTR_batch = batch_function("mulmetCSTR_batch")
+
+
+def mulmetCSTR_make(nmake, ndist):
+    """Make nmake polymers with mulmetCSTR, returns the status and number made"""
+    if mulmetCSTR_batch is None:
+        return make_polys(
+            nmake, ndist, mulmetCSTR, lambda: MMCSTR_global.mulmetCSTRerrorflag
+        )
+    nmade = ct.c_int()
+    status = mulmetCSTR_batch(ct.c_int(nmake), ct.c_int(ndist), ct.byref(nmade))
+    return status, nmade.value
+
 #############
 # Other
 ############
@@ -486,23 +731,170 @@ def end_print(parent_theory, ndist, do_architecture):
             parent_theory.Qprint(table)
 
 
+def c_array(pointer, n):
+    """Copy of the n first values of a C array"""
+    return np.array(np.ctypeslib.as_array(pointer, shape=(n,)))
+
+
+def mwd_table(ndist):
+    """Molecular weight, weight fraction, g-factor and branches per 1000C of the
+    bins of distribution ndist (after molbin), as an array of shape (nummwdbins, 4)"""
+    d = react_dist[ndist].contents
+    n = d.nummwdbins + 1  # bins start at 1
+    table = np.array([c_array(x, n)[1:] for x in (d.lgmid, d.wt, d.avg, d.avbr)]).T
+    table[:, 0] = np.power(10, table[:, 0])
+    return table
+
+
+def convergence_estimates(ndist):
+    """Bin the polymers made so far in distribution ndist and return the estimates
+    followed by the adaptive React simulations: the MWD (molecular weight and
+    weight fraction of the bins), Mn, Mw and Br/1000C"""
+    molbin(ndist)
+    d = react_dist[ndist].contents
+    return mwd_table(ndist)[:, :2], d.m_n, d.m_w, d.brav
+
+
+def relative_change(new, old):
+    """Largest relative change between two convergence_estimates: of Mn, Mw and
+    Br/1000C, and of the MWD (total variation distance, on the grid of new)"""
+    mwd, *averages = new
+    old_mwd, *old_averages = old
+    change = max(
+        abs(x - x_old) / abs(x) if x != 0 else abs(x_old)
+        for x, x_old in zip(averages, old_averages)
+    )
+    lgm = np.log10(mwd[:, 0])
+    if len(lgm) > 1:
+        wt_old = np.interp(
+            lgm, np.log10(old_mwd[:, 0]), old_mwd[:, 1], left=0, right=0
+        )
+        tv = 0.5 * np.sum(np.abs(mwd[:, 1] - wt_old)) * (lgm[1] - lgm[0])
+        change = max(change, tv)
+    return change
+
+
+def component_limits(ndist):
+    """Molecular weight of the smallest and largest polymers of distribution ndist"""
+    lenmin, lenmax = ct.c_double(), ct.c_double()
+    molbin_limits(ndist, ct.byref(lenmin), ct.byref(lenmax))
+    monmass = react_dist[ndist].contents.monmass
+    return lenmin.value * monmass, lenmax.value * monmass
+
+
+def mix_grid(limits, nbins):
+    """Number of bins, lgmin and lgstep of the MWD of a mixture (as in multimolbin)
+    of components with the given component_limits"""
+    nbins = min(nbins, pb_global_const.maxmwdbins)
+    lgmax = np.log10(max(lim[1] for lim in limits) * 1.01)
+    lgmin = np.log10(min(lim[0] for lim in limits) / 1.01)
+    return nbins, lgmin, (lgmax - lgmin) / nbins
+
+
+def component_bins(ndist, grid):
+    """Bins (shape (4, nbins + 1): weight, branch points, g-factor and length) and
+    sums (number of polymers, sum of M, 1/M and br/length) of the polymers of
+    distribution ndist on the grid of a mixture (see mix_grid)"""
+    nbins, lgmin, lgstep = grid
+    bins = np.zeros(4 * (nbins + 1))
+    sums = np.zeros(MIX_NSUMS)
+    mix_component_bins(ndist, lgmin, lgstep, nbins, bins, sums)
+    return bins.reshape(4, nbins + 1), sums
+
+
+def mix_bins(components, weights, grid):
+    """MWD table (see mwd_table), Mn, Mw and Br/1000C of the mixture of the
+    component_bins with the given weights, as calculated by multimolbin"""
+    nbins, lgmin, lgstep = grid
+    bins = np.zeros((4, nbins + 1))
+    sums = np.zeros(MIX_NSUMS)
+    for (b, s), weight in zip(components, weights):
+        if weight > 0:
+            wtpoly = weight / s[0]
+            bins += wtpoly * b
+            sums += wtpoly * s
+    wt, avbr, avg, wmass = bins[:, 1:]
+    wttot, m_w, m_n, brav = sums
+    table = np.zeros((nbins, 4))
+    table[:, 0] = np.power(10, lgmin + np.arange(0.5, nbins) * lgstep)
+    table[:, 1] = wt / lgstep / wttot
+    table[:, 2] = avg / (wt + 1.0e-80)
+    table[:, 3] = avbr / (wmass + 1.0e-80) * 500.0
+    return table, wttot / m_n, m_w / wttot, brav / wttot * 500.0
+
+
+def polyconf_arrays(dists, weights):
+    """Saved polymers of the distributions dists, with weights, as the arrays of a
+    polyconf file: a dict with the number of arms of each polymer ("narms"), and
+    for each arm the links L1, L2, R1, R2 ("links", shape (n, 4)), the length in
+    entanglements ("armz") and the weight fraction ("armwt").
+    Return None if the library cannot export them"""
+    if get_polyconf_arrays is None:
+        return None
+    dists = np.array(dists, dtype=np.intc)
+    weights = np.array(weights, dtype=np.double)
+    npoly = sum(react_dist[dist].contents.nsaved for dist in dists)
+    narms_tot = polyconf_count_arms(dists, len(dists))
+    polyconf = {
+        "narms": np.zeros(npoly, dtype=np.intc),
+        "links": np.zeros((narms_tot, 4), dtype=np.intc),
+        "armz": np.zeros(narms_tot),
+        "armwt": np.zeros(narms_tot),
+    }
+    get_polyconf_arrays(
+        weights,
+        dists,
+        len(dists),
+        polyconf["narms"],
+        polyconf["links"].reshape(-1),
+        polyconf["armz"],
+        polyconf["armwt"],
+    )
+    return polyconf
+
+
+def hist_v_senio(ndist):
+    """Average arm length, average priority and probability versus seniority
+    (1 to max_senio), as an array of shape (PRIO_SENIO_NHIST, max_senio)"""
+    max_senio = return_max_senio()
+    hist = np.zeros(PRIO_SENIO_NHIST * max_senio)
+    if get_hist_v_senio is not None:
+        get_hist_v_senio(ndist, hist)
+    else:
+        for s in range(1, max_senio + 1):
+            hist[s - 1] = return_avarmlen_v_senio(ct.c_int(s), ct.c_int(ndist))
+            hist[max_senio + s - 1] = return_avprio_v_senio(ct.c_int(s))
+            hist[2 * max_senio + s - 1] = return_proba_senio(ct.c_int(s))
+    return hist.reshape(PRIO_SENIO_NHIST, max_senio)
+
+
+def hist_v_prio(ndist):
+    """Average arm length, average seniority and probability versus priority
+    (1 to max_prio), as an array of shape (PRIO_SENIO_NHIST, max_prio)"""
+    max_prio = return_max_prio()
+    hist = np.zeros(PRIO_SENIO_NHIST * max_prio)
+    if get_hist_v_prio is not None:
+        get_hist_v_prio(ndist, hist)
+    else:
+        for p in range(1, max_prio + 1):
+            hist[p - 1] = return_avarmlen_v_prio(ct.c_int(p), ct.c_int(ndist))
+            hist[max_prio + p - 1] = return_avsenio_v_prio(ct.c_int(p))
+            hist[2 * max_prio + p - 1] = return_proba_prio(ct.c_int(p))
+    return hist.reshape(PRIO_SENIO_NHIST, max_prio)
+
+
 def prio_and_senio(parent_theory, f, ndist, do_architecture):
     """Get the arm length prob. distr. and priority vs seniority form C and save it in the
-    theory DataTable"""
+    theory DataTable. The histograms are copied from C in bulk and kept in the
+    extra_tables of the DataTable, from where the views are drawn"""
     tt = parent_theory.tables[f.file_name_short]
     # arm length
     lgmax = np.log10(react_dist[ndist].contents.arch_maxwt * 1.01)
     lgmin = np.log10(react_dist[ndist].contents.monmass / 1.01)
     num_armwt_bin = react_dist[ndist].contents.num_armwt_bin
     lgstep = (lgmax - lgmin) / (1.0 * num_armwt_bin)
-    tmp_x = np.power(
-        10,
-        [lgmin + ibin * lgstep - 0.5 * lgstep for ibin in range(1, num_armwt_bin + 1)],
-    )
-    tmp_y = [
-        react_dist[ndist].contents.numin_armwt_bin[ibin]
-        for ibin in range(1, num_armwt_bin + 1)
-    ]
+    tmp_x = np.power(10, lgmin + np.arange(0.5, num_armwt_bin) * lgstep)
+    tmp_y = c_array(react_dist[ndist].contents.numin_armwt_bin, num_armwt_bin + 1)[1:]
     # trim right zeros
     tmp_y = np.trim_zeros(tmp_y, "b")
     new_len = len(tmp_y)
@@ -530,9 +922,9 @@ def prio_and_senio(parent_theory, f, ndist, do_architecture):
     rmax = min(max_num_br + 1, pb_global_const.MAX_NBR)
     tt.extra_tables["proba_br_pt"] = np.zeros((max_num_br + 1, 2))
     tt.extra_tables["proba_br_pt"][:, 0] = np.arange(max_num_br + 1)
-    tt.extra_tables["proba_br_pt"][:, 1] = [
-        react_dist[ndist].contents.numin_num_br_bin[i] for i in range(max_num_br + 1)
-    ]
+    tt.extra_tables["proba_br_pt"][:, 1] = c_array(
+        react_dist[ndist].contents.numin_num_br_bin, max_num_br + 1
+    )
     try:
         tt.extra_tables["proba_br_pt"][:, 1] /= tt.extra_tables["proba_br_pt"][
             :, 1
@@ -551,49 +943,15 @@ def prio_and_senio(parent_theory, f, ndist, do_architecture):
     if not do_architecture:
         return
     # P&S
-    max_prio = return_max_prio()
-    max_senio = return_max_senio()
-
-    avarmlen_v_senio = [
-        return_avarmlen_v_senio(ct.c_int(s), ct.c_int(ndist))
-        for s in range(1, max_senio + 1)
-    ]
-    avarmlen_v_prio = [
-        return_avarmlen_v_prio(ct.c_int(p), ct.c_int(ndist))
-        for p in range(1, max_prio + 1)
-    ]
-
-    avprio_v_senio = [
-        return_avprio_v_senio(ct.c_int(s)) for s in range(1, max_senio + 1)
-    ]
-    avsenio_v_prio = [
-        return_avsenio_v_prio(ct.c_int(p)) for p in range(1, max_prio + 1)
-    ]
-
-    proba_senio = [return_proba_senio(ct.c_int(s)) for s in range(1, max_senio + 1)]
-    proba_prio = [return_proba_prio(ct.c_int(p)) for p in range(1, max_prio + 1)]
-
-    tt.extra_tables["avarmlen_v_senio"] = np.zeros((max_senio, 2))
-    tt.extra_tables["avarmlen_v_senio"][:, 0] = np.arange(1, max_senio + 1)
-    tt.extra_tables["avarmlen_v_senio"][:, 1] = avarmlen_v_senio[:]
-
-    tt.extra_tables["avarmlen_v_prio"] = np.zeros((max_prio, 2))
-    tt.extra_tables["avarmlen_v_prio"][:, 0] = np.arange(1, max_prio + 1)
-    tt.extra_tables["avarmlen_v_prio"][:, 1] = avarmlen_v_prio[:]
-
-    tt.extra_tables["avprio_v_senio"] = np.zeros((max_senio, 2))
-    tt.extra_tables["avprio_v_senio"][:, 0] = np.arange(1, max_senio + 1)
-    tt.extra_tables["avprio_v_senio"][:, 1] = avprio_v_senio[:]
-
-    tt.extra_tables["avsenio_v_prio"] = np.zeros((max_prio, 2))
-    tt.extra_tables["avsenio_v_prio"][:, 0] = np.arange(1, max_prio + 1)
-    tt.extra_tables["avsenio_v_prio"][:, 1] = avsenio_v_prio[:]
-
-    tt.extra_tables["proba_senio"] = np.zeros((max_senio, 2))
-    tt.extra_tables["proba_senio"][:, 0] = np.arange(1, max_senio + 1)
-    tt.extra_tables["proba_senio"][:, 1] = proba_senio[:]
-
-    tt.extra_tables["proba_prio"] = np.zeros((max_prio, 2))
-    tt.extra_tables["proba_prio"][:, 0] = np.arange(1, max_prio + 1)
-    tt.extra_tables["proba_prio"][:, 1] = proba_prio[:]
+    avarmlen_v_senio, avprio_v_senio, proba_senio = hist_v_senio(ndist)
+    avarmlen_v_prio, avsenio_v_prio, proba_prio = hist_v_prio(ndist)
+    senio = np.arange(1, len(proba_senio) + 1)
+    prio = np.arange(1, len(proba_prio) + 1)
+
+    tt.extra_tables["avarmlen_v_senio"] = np.column_stack((senio, avarmlen_v_senio))
+    tt.extra_tables["avarmlen_v_prio"] = np.column_stack((prio, avarmlen_v_prio))
+    tt.extra_tables["avprio_v_senio"] = np.column_stack((senio, avprio_v_senio))
+    tt.extra_tables["avsenio_v_prio"] = np.column_stack((prio, avsenio_v_prio))
+    tt.extra_tables["proba_senio"] = np.column_stack((senio, proba_senio))
+    tt.extra_tables["proba_prio"] = np.column_stack((prio, proba_prio))
 
@@ -0,0 +1,360 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module react_ensemble
+
+Run a React simulation as an ensemble of independent simulations in worker
+processes. The React library keeps the polymers and their statistics in global
+variables, so a process can only run one simulation at a time. Here, the polymers
+to make are shared between several processes, each with its own instance of the
+library and its own random seed. The workers bin their polymers on a common
+molecular weight grid, and the main process adds up the bins, moments and
+architecture statistics of all the workers in its own distribution, as if it had
+made all the polymers itself.
+
+The polymers stay in the workers: an ensemble simulation gives the MWD, branching
+and priority/seniority statistics, but its polymers cannot be mixed (React Mix) or
+saved for BoB.
+
+The functions of this module do not depend on Qt, so that they can be imported by
+the worker processes.
+"""
+import multiprocessing
+from multiprocessing.connection import wait
+import ctypes as ct
+import numpy as np
+import RepTate.theories.react_ctypes_helper as rch
+import RepTate.theories.react_memory as rmem
+
+POLL_INTERVAL = 0.2  # seconds between checks of the stop request
+NUM_BATCHES = 100  # number of progress messages sent by each worker
+MAX_SEED = 100000000  # largest seed given to ran3
+
+# settings of the distribution copied to the workers
+DIST_SETTINGS = (
+    "monmass",
+    "M_e",
+    "nummwdbins",
+    "arch_minwt",
+    "arch_maxwt",
+    "numbobbins",
+    "boblgmin",
+    "boblgmax",
+    "bobbinmax",
+)
+# architecture statistics of the distribution, added up over the workers
+ARCH_STATS = (
+    "nlin",
+    "nstar",
+    "nH",
+    "n7arm",
+    "ncomb",
+    "nother",
+    "wlin",
+    "wstar",
+    "wH",
+    "w7arm",
+    "wcomb",
+    "wother",
+    "nsaved_arch",
+)
+
+
+class ReactEnsembleError(Exception):
+    """A worker process stopped without sending its results"""
+
+
+def available():
+    """True if the React library has the functions needed to merge simulations"""
+    return rch.molbin_sums is not None and rch.add_bin_prio_vs_senio is not None
+
+
+def start_simulation(sim, args, ndist):
+    """Call the <sim>start function of the library with the parameters args"""
+    if sim == "mulmetCSTR":
+        kp, kdb, ks, kplcb, conc, time_const, monomer_conc, numcat, numcat_max = args
+        rch.mulmetCSTRstart(
+            *[(ct.c_double * numcat)(*a) for a in (kp, kdb, ks, kplcb, conc)],
+            ct.c_double(time_const),
+            ct.c_double(monomer_conc),
+            ct.c_int(numcat),
+            ct.c_int(ndist),
+            ct.c_int(numcat_max),
+        )
+    else:
+        start = {
+            "tobCSTR": rch.tobCSTRstart,
+            "tobbatch": rch.tobbatchstart,
+            "dieneCSTR": rch.dieneCSTRstart,
+        }[sim]
+        start(*[ct.c_double(a) for a in args], ct.c_int(ndist))
+
+
+def make_function(sim, ndist, ngel):
+    """Return make(n), making n polymers of simulation sim in distribution ndist"""
+    if sim == "dieneCSTR":
+        return lambda n: rch.dieneCSTR_make(n, ndist, ngel)
+    make = {
+        "tobCSTR": rch.tobCSTR_make,
+        "tobbatch": rch.tobbatch_make,
+        "mulmetCSTR": rch.mulmetCSTR_make,
+    }[sim]
+    return lambda n: make(n, ndist)
+
+
+def increase_records(status):
+    """Grow the arm or polymer records within the memory budget (see react_memory).
+    Nobody can be asked in a worker, the simulation fails beyond the budget"""
+    name = "arm" if status == rch.MAKE_POLYS_NO_ARM else "polymer"
+    return rmem.grow(name)[1]
+
+
+def worker_main(conn, task):
+    """Entry point of the worker process: make the polymers described by `task`,
+    send their number and size range, then bin them on the grid sent back by the
+    main process and send the bins and statistics"""
+    rmem.MEMORY_BUDGET = task.get("memory_budget")
+    c_ndist = ct.c_int()
+    rch.request_dist(ct.byref(c_ndist))
+    ndist = c_ndist.value
+    d = rch.react_dist[ndist].contents
+    for name in DIST_SETTINGS:
+        setattr(d, name, task[name])
+    d.polysaved = False
+    d.nsaved_arch = 0
+    rch.set_do_prio_senio(ct.c_bool(task["do_prio_senio"]))
+    rch.set_flag_stop_all(ct.c_bool(False))
+    rch.init_bin_prio_vs_senio(ndist)
+    start_simulation(task["sim"], task["args"], ndist)
+    rch.iy3.value = -task["seed"]  # negative value (re)initialises ran3
+    d.npoly = 0
+
+    # make the polymers
+    ngel = ct.c_int(0)
+    make = make_function(task["sim"], ndist, ngel)
+    nmake = task["num_to_make"]
+    batch = max(1, nmake // NUM_BATCHES)
+    i = 0
+    status = rch.MAKE_POLYS_DONE
+    while i < nmake:
+        status, nmade = make(min(batch, nmake - i))
+        i += nmade
+        if status in (rch.MAKE_POLYS_NO_ARM, rch.MAKE_POLYS_NO_POLY):
+            if not increase_records(status):
+                break
+            status = rch.MAKE_POLYS_DONE
+        elif status != rch.MAKE_POLYS_DONE:
+            break
+        conn.send(("progress", i))
+    lenmin, lenmax = ct.c_double(), ct.c_double()
+    if status == rch.MAKE_POLYS_DONE:
+        rch.molbin_limits(ndist, ct.byref(lenmin), ct.byref(lenmax))
+    conn.send(("made", (status, i, lenmin.value, lenmax.value)))
+    if status != rch.MAKE_POLYS_DONE:
+        conn.close()
+        return
+
+    # bin them on the common grid
+    lgmin, lgstep = conn.recv()
+    sums = np.zeros(rch.MOLBIN_NSUMS)
+    rch.molbin_sums(ndist, lgmin, lgstep, sums)
+    nbins = d.nummwdbins + 1
+    result = {
+        "npoly": d.npoly,
+        "ngel": ngel.value,
+        "sums": sums,
+        "bins": np.array(
+            [rch.c_array(x, nbins) for x in (d.wt, d.avbr, d.avg, d.wmass)]
+        ),
+        "numin_armwt_bin": rch.c_array(d.numin_armwt_bin, d.num_armwt_bin + 1),
+        "numin_num_br_bin": rch.c_array(
+            d.numin_num_br_bin, rch.pb_global_const.MAX_NBR + 1
+        ),
+        "max_num_br": d.max_num_br,
+        "arch": {name: getattr(d, name) for name in ARCH_STATS},
+    }
+    if task["do_prio_senio"]:
+        ps_sums = np.zeros(rch.PRIO_SENIO_NSUMS * rch.n_prio_senio_bins)
+        ps_counts = np.zeros(2 * rch.n_prio_senio_bins + 3, dtype=np.intc)
+        rch.get_bin_prio_vs_senio(ps_sums, ps_counts)
+        result["prio_senio"] = (ps_sums, ps_counts)
+    conn.send(("result", result))
+    conn.close()
+
+
+class EnsembleProcess:
+    """A part of the ensemble simulation running in its own process"""
+
+    def __init__(self, task):
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=worker_main, args=(child_conn, task), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.finished = False
+
+    def receive(self):
+        """Return the list of the messages sent by the worker"""
+        messages = []
+        try:
+            while not self.finished and self.conn.poll():
+                kind, value = self.conn.recv()
+                messages.append((kind, value))
+                # the worker stops after sending its results or failing
+                self.finished = kind == "result" or (
+                    kind == "made" and value[0] != rch.MAKE_POLYS_DONE
+                )
+        except (EOFError, OSError):
+            # the worker exited without sending results (e.g. crash in React)
+            self.process.join()
+            raise ReactEnsembleError(
+                "React worker stopped (exit code %s)" % self.process.exitcode
+            )
+        return messages
+
+    def kill(self):
+        """Terminate the worker, whatever it is doing"""
+        if self.process.is_alive():
+            self.process.kill()
+        self.close()
+
+    def close(self):
+        self.process.join(timeout=5)
+        self.conn.close()
+
+
+def ensemble_tasks(sim, args, ndist, num_to_make, nproc, do_prio_senio):
+    """Share num_to_make polymers of the simulation sim (with the parameters args of
+    <sim>start) between nproc tasks, with the settings of distribution ndist and
+    independent random seeds"""
+    d = rch.react_dist[ndist].contents
+    d.nummwdbins = min(d.nummwdbins, rch.pb_global_const.maxmwdbins)
+    settings = {name: getattr(d, name) for name in DIST_SETTINGS}
+    seeds = np.random.SeedSequence().generate_state(nproc)
+    tasks = []
+    for k in range(nproc):
+        task = dict(settings)
+        task["sim"] = sim
+        task["args"] = args
+        task["num_to_make"] = num_to_make // nproc + (k < num_to_make % nproc)
+        task["seed"] = int(seeds[k]) % MAX_SEED + 1
+        task["do_prio_senio"] = do_prio_senio
+        if rmem.MEMORY_BUDGET is not None:
+            # the workers share the memory budget set by the user
+            task["memory_budget"] = rmem.MEMORY_BUDGET / nproc
+        tasks.append(task)
+    return tasks
+
+
+def run_ensemble(tasks, on_progress=None, should_stop=None):
+    """Run the tasks of the ensemble simulation, one process each.
+
+    on_progress(n) is called with the total number of polymers made so far.
+    should_stop() is called regularly; if it returns True, the workers are killed.
+
+    Return the status (rch.MAKE_POLYS_...) and, if all the polymers were made, the
+    list of the results of the workers and the grid (lgmin, lgstep) of their bins.
+    Raise ReactEnsembleError if a worker stops unexpectedly.
+    """
+    workers = [EnsembleProcess(task) for task in tasks]
+    made = [0] * len(tasks)
+    limits = [None] * len(tasks)
+    results = [None] * len(tasks)
+    grid = None
+    status = rch.MAKE_POLYS_DONE
+    try:
+        while any(r is None for r in results):
+            if should_stop is not None and should_stop():
+                status = rch.MAKE_POLYS_STOPPED
+                break
+            wait([w.conn for w in workers if not w.finished], timeout=POLL_INTERVAL)
+            for k, w in enumerate(workers):
+                for kind, value in w.receive():
+                    if kind == "progress":
+                        made[k] = value
+                        if on_progress is not None:
+                            on_progress(sum(made))
+                    elif kind == "made":
+                        st, made[k], lenmin, lenmax = value
+                        limits[k] = (lenmin, lenmax)
+                        if st != rch.MAKE_POLYS_DONE:
+                            status = st
+                    else:
+                        results[k] = value
+            if status != rch.MAKE_POLYS_DONE:
+                break
+            if grid is None and all(x is not None for x in limits):
+                # all the polymers are made: send the common grid of the bins
+                monmass = tasks[0]["monmass"]
+                lgmax = np.log10((max(x[1] for x in limits) * 1.01) * monmass)
+                lgmin = np.log10((min(x[0] for x in limits) / 1.01) * monmass)
+                grid = (lgmin, (lgmax - lgmin) / tasks[0]["nummwdbins"])
+                for w in workers:
+                    w.conn.send(grid)
+    finally:
+        for w in workers:
+            w.kill()
+    if status != rch.MAKE_POLYS_DONE:
+        return status, None, None
+    return status, results, grid
+
+
+def merge_results(ndist, results, lgmin, lgstep):
+    """Add up the bins and statistics of the workers in distribution ndist, as if
+    its polymers had been made in this process. Distribution ndist does not hold
+    the polymers themselves (first_poly is 0) and none are saved for BoB"""
+    d = rch.react_dist[ndist].contents
+    nbins = d.nummwdbins + 1
+    bins = np.sum([r["bins"] for r in results], axis=0)
+    for k, x in enumerate((d.wt, d.avbr, d.avg, d.wmass)):
+        np.ctypeslib.as_array(x, shape=(nbins,))[1:] = bins[k, 1:]
+    d.npoly = sum(r["npoly"] for r in results)
+    d.first_poly = 0
+    d.nsaved = 0
+    n = d.num_armwt_bin + 1
+    np.ctypeslib.as_array(d.numin_armwt_bin, shape=(n,))[:] = np.sum(
+        [r["numin_armwt_bin"] for r in results], axis=0
+    )
+    n = rch.pb_global_const.MAX_NBR + 1
+    np.ctypeslib.as_array(d.numin_num_br_bin, shape=(n,))[:] = np.sum(
+        [r["numin_num_br_bin"] for r in results], axis=0
+    )
+    d.max_num_br = max(r["max_num_br"] for r in results)
+    for name in ARCH_STATS:
+        setattr(d, name, sum(r["arch"][name] for r in results))
+    for r in results:
+        if "prio_senio" in r:
+            rch.add_bin_prio_vs_senio(*r["prio_senio"])
+    sums = np.sum([r["sums"] for r in results], axis=0)
+    rch.molbin_finalise(ndist, lgmin, lgstep, sums)
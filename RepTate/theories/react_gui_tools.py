@@ -32,10 +32,14 @@
 # --------------------------------------------------------------------------------------------------------
 import sys
 import os
+import tempfile
+import threading
 import numpy as np
 import ctypes as ct
 import RepTate
 import RepTate.theories.react_ctypes_helper as rch
+import RepTate.theories.react_ensemble as rens
+import RepTate.theories.react_memory as rmem
 
 # BoB form
 from PySide6.QtWidgets import (
@@ -58,10 +62,13 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QMessageBox,
     QFrame,
+    QApplication,
+    QProgressDialog,
 )
 from PySide6.QtGui import QIntValidator, QDoubleValidator, QIcon
 from PySide6.QtCore import QSize, Qt
-import psutil
+
+CONVERGENCE_FIRST_CHECK = 1000  # polymers made before the first convergence check
 
 if sys.platform == "darwin" or sys.platform == "linux":
     CHARCODE = "utf-8"
@@ -99,6 +106,7 @@ def request_more_polymer(parent_theory):
         parent_theory.Qprint("Number of polymers was increased to %.4g" % new_max)
 
     parent_theory.success_increase_memory = success_increase_memory
+    parent_theory.increase_memory_event.set()
 
 
 def request_more_arm(parent_theory):
@@ -119,6 +127,7 @@ def request_more_arm(parent_theory):
     else:
         parent_theory.Qprint("Number of arms was increased to %.4g" % new_max)
     parent_theory.success_increase_memory = success_increase_memory
+    parent_theory.increase_memory_event.set()
 
 
 def request_more_dist(parent_theory):
@@ -126,7 +135,6 @@ def request_more_dist(parent_theory):
     success_increase_memory = None
     new_max, success_increase_memory = handle_increase_records(parent_theory, "dist")
     if success_increase_memory:
-        rch.link_react_dist()  # re-link the python array with the C array
         parent_theory.Qprint("Number of dist. was increased to %.4g" % new_max)
         parent_theory.handle_actionCalculate_Theory()
     else:
@@ -135,6 +143,191 @@ def request_more_dist(parent_theory):
         )
 
 
+def grow_records(parent_theory, name):
+    """Grow the "name" records within the memory budget (see react_memory),
+    without asking. Return True on success"""
+    new_max, success = rmem.grow(name)
+    if success:
+        parent_theory.Qprint(
+            "<br>Number of %s records increased to %.4g. %s"
+            % (name, new_max, rmem.memory_report())
+        )
+    return success
+
+
+def request_dist(parent_theory, c_ndist):
+    """Request a distribution from the C library, growing the distribution
+    records if none is left and the memory budget allows it. Return True on
+    success; otherwise, the caller asks the user for more records"""
+    success = rch.request_dist(ct.byref(c_ndist))
+    if not success and grow_records(parent_theory, "dist"):
+        success = rch.request_dist(ct.byref(c_ndist))
+    return success
+
+
+def make_polymers(parent_theory, make, numtomake, ndist=None, tolerance=0):
+    """Generic polymer-making loop of the React theories.
+
+    make(n) makes n polymers in a single call to the C library and returns the
+    status (rch.MAKE_POLYS_...) and the number made. Polymers are made in batches
+    ending at each progress mark, so that control comes back to Python only to
+    print the progress or to grow the polymer/arm records. The records are grown
+    automatically within the memory budget; the user is asked only beyond it.
+    If tolerance > 0, the MWD, Mn, Mw and Br/1000C of distribution ndist are
+    estimated each time the number of polymers doubles (from
+    CONVERGENCE_FIRST_CHECK), and the loop stops as soon as their relative change
+    (see rch.relative_change) is below tolerance: numtomake is then an upper bound.
+    Returns the status of the last batch: MAKE_POLYS_NO_ARM if the user declined
+    to increase the arm records.
+    """
+    numtomake = int(numtomake)
+    rate_print = int(np.trunc(numtomake / 20))
+    adaptive = tolerance > 0 and ndist is not None
+    next_check = CONVERGENCE_FIRST_CHECK
+    estimates = None
+    change = None
+    i = 0
+    status = rch.MAKE_POLYS_DONE
+    parent_theory.Qprint("Making polymers:")
+    parent_theory.Qprint("0% ", end="")
+    while i < numtomake:
+        # make polymers up to the next progress mark
+        if rate_print > 0:
+            nmake = min(rate_print - i % rate_print, numtomake - i)
+        else:
+            nmake = numtomake - i
+        if adaptive:
+            nmake = min(nmake, next_check - i)
+        if parent_theory.stop_theory_flag:
+            status = rch.MAKE_POLYS_STOPPED
+        else:
+            status, nmade = make(nmake)
+            i += nmade
+
+        if status == rch.MAKE_POLYS_STOPPED:
+            parent_theory.Qprint(
+                "<br><big><font color=red><b>Polymer creation stopped by user</b></font></big>"
+            )
+            break
+        elif status == rch.MAKE_POLYS_ERROR:
+            parent_theory.Qprint(
+                "<br><big><font color=red><b>Polymers too large: gelation occurs for these parameters</b></font></big>"
+            )
+            i = numtomake
+        elif status in (rch.MAKE_POLYS_NO_ARM, rch.MAKE_POLYS_NO_POLY):
+            name = "arm" if status == rch.MAKE_POLYS_NO_ARM else "polymer"
+            if grow_records(parent_theory, name):
+                continue  # back to the start of while loop
+            # over budget: ask the user in the main GUI thread and wait for the
+            # answer (the slot sets the event)
+            parent_theory.success_increase_memory = None
+            parent_theory.increase_memory_event = threading.Event()
+            if status == rch.MAKE_POLYS_NO_ARM:
+                parent_theory.signal_request_arm.emit(parent_theory)
+            else:
+                parent_theory.signal_request_polymer.emit(parent_theory)
+            parent_theory.increase_memory_event.wait()
+            if parent_theory.success_increase_memory:
+                continue  # back to the start of while loop
+            i = numtomake
+            if status == rch.MAKE_POLYS_NO_POLY:
+                break
+
+        # update on number made
+        if rate_print > 0 and i % rate_print == 0:
+            parent_theory.Qprint("-", end="")
+            # needed to use Qprint if in single-thread
+            QApplication.processEvents()
+
+        # check the convergence each time the number of polymers doubles
+        if (
+            adaptive
+            and status == rch.MAKE_POLYS_DONE
+            and (i >= next_check or i == numtomake)
+        ):
+            new_estimates = rch.convergence_estimates(ndist)
+            if estimates is not None:
+                change = rch.relative_change(new_estimates, estimates)
+            estimates = new_estimates
+            next_check = 2 * max(i, next_check)
+            if change is not None and change < tolerance:
+                break
+
+    if adaptive and status == rch.MAKE_POLYS_DONE:
+        if change is None:
+            parent_theory.Qprint(
+                "<br>Too few polymers (%d) to estimate the convergence" % i
+            )
+        elif change < tolerance:
+            parent_theory.Qprint(
+                "<br>Converged after %d polymers: relative change %.3g%% "
+                "(tolerance %.3g%%)" % (i, 100 * change, 100 * tolerance)
+            )
+        else:
+            parent_theory.Qprint(
+                "<br><font color=red><b>Not converged after %d polymers</b></font>: "
+                "relative change %.3g%% (tolerance %.3g%%)"
+                % (i, 100 * change, 100 * tolerance)
+            )
+    return status
+
+
+def make_polymers_ensemble(
+    parent_theory, sim, args, ndist, numtomake, nproc, ngel=None
+):
+    """Make numtomake polymers of the simulation sim (with the parameters args of
+    <sim>start) in nproc worker processes, and merge their statistics into
+    distribution ndist (see react_ensemble). The polymers themselves are not kept.
+    The number of gelated polymers (Diene CSTR) is added to ngel.
+    Returns the status, like make_polymers.
+    """
+    numtomake = int(numtomake)
+    nproc = max(1, min(nproc, numtomake))
+    rate_print = int(np.trunc(numtomake / 20))
+    ndash = 0
+
+    def on_progress(nmade):
+        nonlocal ndash
+        if rate_print > 0 and nmade // rate_print > ndash:
+            parent_theory.Qprint("-" * (nmade // rate_print - ndash), end="")
+            ndash = nmade // rate_print
+        # needed to use Qprint if in single-thread
+        QApplication.processEvents()
+
+    parent_theory.Qprint(
+        "Making polymers in %d processes (only their statistics are kept):" % nproc
+    )
+    parent_theory.Qprint("0% ", end="")
+    tasks = rens.ensemble_tasks(
+        sim, args, ndist, numtomake, nproc, parent_theory.do_priority_seniority
+    )
+    try:
+        status, results, grid = rens.run_ensemble(
+            tasks, on_progress, lambda: parent_theory.stop_theory_flag
+        )
+    except rens.ReactEnsembleError as e:
+        parent_theory.Qprint("<br><font color=red><b>%s</b></font>" % e)
+        return rch.MAKE_POLYS_ERROR
+
+    if status == rch.MAKE_POLYS_STOPPED:
+        parent_theory.Qprint(
+            "<br><big><font color=red><b>Polymer creation stopped by user</b></font></big>"
+        )
+    elif status == rch.MAKE_POLYS_ERROR:
+        parent_theory.Qprint(
+            "<br><big><font color=red><b>Polymers too large: gelation occurs for these parameters</b></font></big>"
+        )
+    elif status != rch.MAKE_POLYS_DONE:
+        parent_theory.Qprint(
+            "<br><font color=red><b>A worker process ran out of records within the memory budget</b></font>"
+        )
+    else:
+        rens.merge_results(ndist, results, *grid)
+        if ngel is not None:
+            ngel.value += sum(r["ngel"] for r in results)
+    return status
+
+
 def set_extra_data(parent_theory, extra_data):
     try:
         if extra_data["prio_senio_checked"] == 1:
@@ -285,6 +478,28 @@ def theory_buttons_disabled(parent_theory, state):
     parent_theory.save_bob_configuration_button.setDisabled(state)
 
 
+def write_polyconf(parent_theory, write, nsaved):
+    """Write a polyconf file of nsaved polymers with write(progress), a C writer
+    that calls progress(nwritten) from time to time. The progress is shown in a
+    dialog that allows the user to cancel the writing.
+    Return False if the file was not written (the C writer deletes it)
+    """
+    dialog = QProgressDialog(
+        "Saving %d polymers..." % nsaved, "Cancel", 0, nsaved, parent_theory
+    )
+    dialog.setWindowModality(Qt.WindowModal)
+
+    def progress(nwritten):
+        dialog.setValue(min(nwritten, nsaved))
+        QApplication.processEvents()
+        return not dialog.wasCanceled()
+
+    c_progress = rch.polyconf_progress(progress)  # keep a reference during the call
+    complete = write(c_progress)
+    dialog.reset()
+    return complete
+
+
 def handle_save_mix_configuration(parent_theory):
     """
     Launch a dialog to select a filename where to save the polymer configurations.
@@ -324,16 +539,38 @@ def handle_save_mix_configuration(parent_theory):
     # output polymers
     b_out_file = out_file[0].encode(CHARCODE)
 
-    c_weights = (ct.c_double * parent_theory.n_inmix)()
-    c_dists = (ct.c_int * parent_theory.n_inmix)()
-    for i in range(parent_theory.n_inmix):
-        c_weights[i] = ct.c_double(float(parent_theory.weights[i]))
-        c_dists[i] = ct.c_int(int(parent_theory.dists[i]))
-    n_out = rch.multipolyconfwrite(
-        ct.c_char_p(b_out_file), c_weights, c_dists, ct.c_int(parent_theory.n_inmix)
-    )
+    if rch.multipolyconfwrite_progress is not None:
+        weights = np.array([float(w) for w in parent_theory.weights])
+        dists = np.array(parent_theory.dists, dtype=np.intc)
+        n_out = sum(rch.react_dist[dist].contents.nsaved for dist in dists)
+        complete = write_polyconf(
+            parent_theory,
+            lambda progress: rch.multipolyconfwrite_progress(
+                b_out_file, weights, dists, len(dists), progress
+            ),
+            n_out,
+        )
+    else:
+        c_weights = (ct.c_double * parent_theory.n_inmix)()
+        c_dists = (ct.c_int * parent_theory.n_inmix)()
+        for i in range(parent_theory.n_inmix):
+            c_weights[i] = ct.c_double(float(parent_theory.weights[i]))
+            c_dists[i] = ct.c_int(int(parent_theory.dists[i]))
+        n_out = rch.multipolyconfwrite(
+            ct.c_char_p(b_out_file),
+            c_weights,
+            c_dists,
+            ct.c_int(parent_theory.n_inmix),
+        )
+        complete = True
 
-    message = "<hr>Saved %d polymers in %s" % (n_out, out_file[0])
+    if complete:
+        message = "<hr>Saved %d polymers in %s" % (n_out, out_file[0])
+    else:
+        message = (
+            "<hr><font color=red><b>Polymers not saved in %s</b></font>"
+            % out_file[0]
+        )
     parent_theory.Qprint(message)
 
 
@@ -358,16 +595,101 @@ def handle_save_bob_configuration(parent_theory):
         # output polymers
         b_out_file = out_file[0].encode(CHARCODE)
 
-        rch.polyconfwrite(ct.c_int(ndist), ct.c_char_p(b_out_file))
-        message = "<hr>Saved %d polymers in %s" % (
-            rch.react_dist[ndist].contents.nsaved,
-            out_file[0],
-        )
+        nsaved = rch.react_dist[ndist].contents.nsaved
+        if rch.polyconfwrite_progress is not None:
+            complete = write_polyconf(
+                parent_theory,
+                lambda progress: rch.polyconfwrite_progress(
+                    ndist, b_out_file, progress
+                ),
+                nsaved,
+            )
+        else:
+            rch.polyconfwrite(ct.c_int(ndist), ct.c_char_p(b_out_file))
+            complete = True
+        if complete:
+            message = "<hr>Saved %d polymers in %s" % (nsaved, out_file[0])
+        else:
+            message = (
+                "<hr><font color=red><b>Polymers not saved in %s</b></font>"
+                % out_file[0]
+            )
     else:
         message = '<font color=green><b>No simulation performed yet. Press "Calculate"</b></font>'
     parent_theory.Qprint(message)
 
 
+def open_react_theories(manager):
+    """React theories (including mixes) open in RepTate that have polymers to send
+    to BoB, as a dict "App/Dataset/Theory": theory"""
+    theories = {}
+    for app in manager.applications.values():
+        if app.appname != "React":
+            continue
+        app_tab_name = manager.ApplicationtabWidget.tabText(
+            manager.ApplicationtabWidget.indexOf(app)
+        )
+        for ds in app.datasets.values():
+            ds_tab_name = app.DataSettabWidget.tabText(app.DataSettabWidget.indexOf(ds))
+            for th in ds.theories.values():
+                if th.reactname == "CreatePolyconf":
+                    continue
+                if th.simexists or (th.reactname == "ReactMix" and th.calcexists):
+                    th_tab_name = ds.TheorytabWidget.tabText(
+                        ds.TheorytabWidget.indexOf(th)
+                    )
+                    name = "%s/%s/%s" % (app_tab_name, ds_tab_name, th_tab_name)
+                    theories[name] = th
+    return theories
+
+
+def bob_polyconf(parent_theory, in_memory=True):
+    """Saved polymers of the React theory (or mix) parent_theory, to be read by BoB.
+    Return a tuple (polyconf, filename): the arrays of rch.polyconf_arrays and None
+    or, if in_memory is False or the React library cannot export the arrays, None
+    and the name of a temporary polyconf file (to be deleted by the caller).
+    Return None if the polymers have changed since the last calculation of the mix
+    or if there are no polymers"""
+    if parent_theory.reactname == "ReactMix":
+        if not parent_theory.calcexists or any(
+            simnumber != rch.react_dist[dist].contents.simnumber
+            for dist, simnumber in zip(
+                parent_theory.dists, parent_theory.theory_simnumber
+            )
+        ):
+            return None
+        dists = list(parent_theory.dists)
+        weights = [float(w) for w in parent_theory.weights]
+    elif parent_theory.simexists:
+        ndist = parent_theory.ndist
+        rch.react_dist[ndist].contents.M_e = parent_theory.parameters["Me"].value
+        rch.react_dist[ndist].contents.monmass = parent_theory.parameters[
+            "mon_mass"
+        ].value
+        dists, weights = [ndist], [1.0]
+    else:
+        return None
+    if sum(rch.react_dist[dist].contents.nsaved for dist in dists) == 0:
+        return None
+
+    polyconf = rch.polyconf_arrays(dists, weights) if in_memory else None
+    if polyconf is not None:
+        return polyconf, None
+    fd, fname = tempfile.mkstemp(prefix="polyconf_", suffix=".dat")
+    os.close(fd)
+    b_fname = fname.encode(CHARCODE)
+    if parent_theory.reactname == "ReactMix":
+        rch.multipolyconfwrite(
+            ct.c_char_p(b_fname),
+            (ct.c_double * len(dists))(*weights),
+            (ct.c_int * len(dists))(*dists),
+            ct.c_int(len(dists)),
+        )
+    else:
+        rch.polyconfwrite(ct.c_int(dists[0]), ct.c_char_p(b_fname))
+    return None, fname
+
+
 def handle_edit_bob_settings(parent_theory):
     """Launch a dialog and modify the BoB binning settings if the user press "OK", else nothing happend."""
     if parent_theory.simexists:
@@ -400,20 +722,10 @@ def handle_increase_records(parent_theory, name):
         'name' should be "arm", "polymer", or "dist".
         Return the new max value or zero if max value not changed
     """
-    if name == "arm":
-        current_max = rch.pb_global_const.maxarm
-        f = rch.increase_arm_records_in_arm_pool
-        size_of = 75e-6  # size of an 'arm' structure (MB) in C
-    elif name == "polymer":
-        current_max = rch.pb_global_const.maxpol
-        f = rch.increase_polymer_records_in_br_poly
-        size_of = 45e-6  # size of a 'polymer' structure (MB) in C
-    elif name == "dist":
-        current_max = rch.pb_global_const.maxreact
-        f = rch.increase_dist_records_in_react_dist
-        size_of = 60097e-6  # size of a 'dist' structure (MB) in C
-    else:
+    if name not in rmem.RECORDS:
         return 0, False
+    current_max = rmem.current_max(name)
+    size_of = rmem.size_of(name)
     d = IncreaseRecordsDialog(
         parent_theory, current_max, name, size_of
     )  # create the dialog
@@ -424,9 +736,8 @@ def handle_increase_records(parent_theory, name):
             new_max = int(current_max * 2)
         if d.r3.isChecked():
             new_max = int(current_max * 5)
-        success = f(
-            ct.c_int(new_max)
-        )  # call C routine to allocate more memory (using 'realloc')
+        # call C routine to allocate more memory (using 'realloc')
+        success = rmem.increase(name, new_max)
         if not success:
             parent_theory.Qprint(
                 "Allocation of new memory failed. %d %s records in memory"
@@ -992,12 +1303,18 @@ class IncreaseRecordsDialog(QDialog):
         layout.addWidget(
             QLabel("<b>Current number of %s records: %.4g</b>" % (name, current_max))
         )
+        layout.addWidget(
+            QLabel(
+                "(more records would exceed the memory budget of %dMB, %s)"
+                % (rmem.memory_budget(), rmem.budget_setting())
+            )
+        )
         layout.addWidget(QLabel("Increase to:"))
         layout.addWidget(self.r1)
         layout.addWidget(self.r2)
         layout.addWidget(self.r3)
         layout.addWidget(
-            QLabel("(%dMB of RAM available)" % (psutil.virtual_memory()[1] / 2.0 ** 20))
+            QLabel("(%dMB of RAM available)" % rmem.available_mb())
         )  # size of free RAM avaliable
         layout.addWidget(QLabel("Or press Cancel."))
         self.formGroupBox.setLayout(layout)
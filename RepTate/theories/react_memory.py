@@ -0,0 +1,128 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module react_memory
+
+Memory manager of the polymer, arm and distribution records of the React library.
+The records are arrays allocated by the C library with a fixed size. When a
+simulation runs out of records, they are grown geometrically (by GROWTH_FACTOR),
+without asking, as long as all the records fit in the memory budget. The user is
+asked only when the budget would be exceeded.
+
+The budget is MEMORY_BUDGET MB if set (RepTate option --react-memory), otherwise the
+records already allocated plus BUDGET_FRACTION of the RAM available at the time of
+the request.
+"""
+import ctypes as ct
+import numpy as np
+import psutil
+import RepTate.theories.react_ctypes_helper as rch
+
+GROWTH_FACTOR = 2  # the number of records is multiplied by this factor
+BUDGET_FRACTION = 0.5  # fraction of the available RAM the records can take
+MEMORY_BUDGET = None  # fixed budget (MB) for all the records, if not None
+
+# name: (size field in pb_global_const, C function that reallocates the records,
+#        size of one record (MB) in C)
+RECORDS = {
+    "arm": ("maxarm", rch.increase_arm_records_in_arm_pool, 75e-6),
+    "polymer": ("maxpol", rch.increase_polymer_records_in_br_poly, 45e-6),
+    "dist": ("maxreact", rch.increase_dist_records_in_react_dist, 60097e-6),
+}
+
+
+def current_max(name):
+    """Number of "name" records allocated by the C library"""
+    return getattr(rch.pb_global_const, RECORDS[name][0])
+
+
+def size_of(name):
+    """Size (MB) of one "name" record"""
+    return RECORDS[name][2]
+
+
+def records_mb(name=None):
+    """Memory (MB) taken by the "name" records, or by all of them if name is None"""
+    if name is None:
+        return sum(records_mb(n) for n in RECORDS)
+    return current_max(name) * size_of(name)
+
+
+def available_mb():
+    """RAM available (MB)"""
+    return psutil.virtual_memory().available / 2.0 ** 20
+
+
+def memory_budget():
+    """Memory (MB) all the records can take"""
+    if MEMORY_BUDGET is not None:
+        return MEMORY_BUDGET
+    return records_mb() + BUDGET_FRACTION * available_mb()
+
+
+def budget_setting():
+    """Description of how the memory budget is set"""
+    if MEMORY_BUDGET is not None:
+        return "fixed with --react-memory"
+    return "records + %.0f%% of the available RAM" % (100 * BUDGET_FRACTION)
+
+
+def increase(name, new_max):
+    """Reallocate the "name" records to new_max records. Return True on success"""
+    success = RECORDS[name][1](ct.c_int(new_max))
+    if success and name == "dist":
+        rch.link_react_dist()  # re-link the python array with the C array
+    return bool(success)
+
+
+def grow(name):
+    """Grow the "name" records by GROWTH_FACTOR if they fit in the budget.
+    Return the new number of records and True on success, or False if the budget
+    would be exceeded or the memory cannot be allocated"""
+    current = current_max(name)
+    new_max = int(np.ceil(current * GROWTH_FACTOR))
+    if records_mb() + (new_max - current) * size_of(name) > memory_budget():
+        return new_max, False
+    return new_max, increase(name, new_max)
+
+
+def memory_report():
+    """One line summary of the memory taken by the records"""
+    used = ", ".join(
+        "%.4g %s (%.0fMB)" % (current_max(n), n, records_mb(n)) for n in RECORDS
+    )
+    return "Records in memory: %s; budget %.0fMB (%s), %.0fMB of RAM available" % (
+        used,
+        memory_budget(),
+        budget_setting(),
+        available_mb(),
+    )
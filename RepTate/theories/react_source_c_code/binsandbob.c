@@ -50,29 +50,50 @@ long iy3;
 //  and MWD for polymers made in distribution n
 void molbin(int n)
 {
-    int i, ibin;
-    double wttot, m_w, m_2, m_3, m_4, m_n, brav, lgstep, lgmin, lgmax, cplen;
+    double lenmin, lenmax, lgstep, lgmin, lgmax;
+    double sums[MOLBIN_NSUMS];
 
     react_dist[n].nummwdbins = fmin(react_dist[n].nummwdbins, pb_global_const.maxmwdbins);
     // first find largest and smallest polymer
-    lgmax = 0.0;
-    lgmin = 1.0e80;
+    molbin_limits(n, &lenmin, &lenmax);
+    lgmax = log10((lenmax * 1.01) * react_dist[n].monmass);
+    lgmin = log10((lenmin / 1.01) * react_dist[n].monmass);
+    lgstep = (lgmax - lgmin) / react_dist[n].nummwdbins;
+
+    molbin_sums(n, lgmin, lgstep, sums);
+    molbin_finalise(n, lgmin, lgstep, sums);
+}
+
+// length (in monomers) of the smallest and largest polymers of distribution n
+void molbin_limits(int n, double *lenmin, double *lenmax)
+{
+    int i;
+    double cplen;
+
+    *lenmax = 0.0;
+    *lenmin = 1.0e80;
 
     i = react_dist[n].first_poly;
     while (true)
     {
         cplen = br_poly[i].tot_len;
-        lgmax = fmax(lgmax, cplen);
-        lgmin = fmin(lgmin, cplen);
+        *lenmax = fmax(*lenmax, cplen);
+        *lenmin = fmin(*lenmin, cplen);
         i = br_poly[i].nextpoly;
         if (i == 0)
         {
             break;
         }
     }
-    lgmax = log10((lgmax * 1.01) * react_dist[n].monmass);
-    lgmin = log10((lgmin / 1.01) * react_dist[n].monmass);
-    lgstep = (lgmax - lgmin) / react_dist[n].nummwdbins;
+}
+
+// bin the polymers of distribution n (bins of width lgstep from lgmin) without
+// normalising, so that the bins and sums of several simulations can be added
+// together before calling molbin_finalise
+void molbin_sums(int n, double lgmin, double lgstep, double *sums)
+{
+    int i, ibin;
+    double wttot, m_w, m_2, m_3, m_4, m_n, brav, cplen;
 
     //initialise bins and other counters
     for (ibin = 1; ibin <= react_dist[n].nummwdbins; ibin++)
@@ -116,6 +137,28 @@ void molbin(int n)
             break;
         }
     }
+    sums[0] = wttot;
+    sums[1] = m_w;
+    sums[2] = m_2;
+    sums[3] = m_3;
+    sums[4] = m_4;
+    sums[5] = m_n;
+    sums[6] = brav;
+}
+
+// normalise the bins and sums of molbin_sums: MWD ready for plotting and averages
+void molbin_finalise(int n, double lgmin, double lgstep, double *sums)
+{
+    int ibin;
+    double wttot, m_w, m_2, m_3, m_4, m_n, brav;
+
+    wttot = sums[0];
+    m_w = sums[1];
+    m_2 = sums[2];
+    m_3 = sums[3];
+    m_4 = sums[4];
+    m_n = sums[5];
+    brav = sums[6];
     // finalise bin data - ready for plotting
     for (ibin = 1; ibin <= react_dist[n].nummwdbins; ibin++)
     {
@@ -132,6 +175,51 @@ void molbin(int n)
     react_dist[n].brav = brav / wttot * 500.0;
 }
 
+// bin the polymers of distribution n for a mixture (see multimolbin), with a
+// weight of 1 per polymer and without touching the bins of the distribution:
+// bins (4 * (nbins + 1) doubles, bin 0 unused) receives the sums of weight,
+// branch points, g-factor and length of each bin, and sums (MIX_NSUMS doubles)
+// the number of polymers and the sums of M, 1/M and br/length. The bins of a
+// mixture are the weighted sums of the bins of its components
+void mix_component_bins(int n, double lgmin, double lgstep, int nbins, double *bins, double *sums)
+{
+    int i, ibin;
+    double cplen;
+    double *wt = bins, *avbr = bins + nbins + 1, *avg = bins + 2 * (nbins + 1), *wmass = bins + 3 * (nbins + 1);
+
+    for (ibin = 0; ibin < 4 * (nbins + 1); ibin++)
+    {
+        bins[ibin] = 0.0;
+    }
+    for (i = 0; i < MIX_NSUMS; i++)
+    {
+        sums[i] = 0.0;
+    }
+
+    i = react_dist[n].first_poly;
+    while (true)
+    {
+        cplen = br_poly[i].tot_len * react_dist[n].monmass;
+        ibin = trunc((log10(cplen) - lgmin) / lgstep) + 1;
+        sums[0] += 1.0;
+        sums[1] += cplen;
+        sums[2] += 1.0 / cplen;
+        sums[3] += br_poly[i].num_br / br_poly[i].tot_len;
+        if ((ibin <= nbins) && (ibin > 0))
+        {
+            wt[ibin] += 1.0;
+            avbr[ibin] += br_poly[i].num_br;
+            avg[ibin] += br_poly[i].gfactor;
+            wmass[ibin] += br_poly[i].tot_len;
+        }
+        i = br_poly[i].nextpoly;
+        if (i == 0)
+        {
+            break;
+        }
+    }
+}
+
 // call this procedure to calculate current averages
 //  and MWD for all polymers made in all distributions
 // with weights contained in weights array, and whether "in the mix" contained
@@ -284,292 +372,321 @@ void bobcount(int m, int n)
     }
 }
 
-void polyconfwrite(int n, char *fname)
+// write one arm (links to the arms L1, L2, R1, R2, length armz in entanglements,
+// weight fraction armwt) in the polyconf file out->fp, or in the arrays of out
+static void polyconf_arm(polyconf_out *out, int tL1, int tL2, int tR1, int tR2, double armz, double armwt)
 {
-    int i, atally, numarms, anum;
-    int first, tL1, tL2, tR1, tR2, m1, mc, npoly;
-    //F:    TextFile;
-    double enrich, polywt, armwt, armz, N_e;
-    FILE *fp;
+    unsigned long long k;
 
-    fp = fopen(fname, "w");
+    if (out->fp != NULL)
+    {
+        fprintf(out->fp, "%7d %7d %7d %7d %20.13e %20.13e\n", tL1, tL2, tR1, tR2, armz, armwt);
+        return;
+    }
+    k = out->iarm++;
+    out->links[4 * k] = tL1;
+    out->links[4 * k + 1] = tL2;
+    out->links[4 * k + 2] = tR1;
+    out->links[4 * k + 3] = tR2;
+    out->armz[k] = armz;
+    out->armwt[k] = armwt;
+}
 
-    react_dist[n].N_e = react_dist[n].M_e / react_dist[n].monmass;
-    // opening lines
-    fprintf(fp, "reactpol\n");
-    fprintf(fp, "%f\n", react_dist[n].N_e);
-    fprintf(fp, "%d\n", react_dist[n].nsaved);
+// start a polymer of numarms arms in out
+static void polyconf_start(polyconf_out *out, int numarms)
+{
+    if (out->fp != NULL)
+    {
+        fprintf(out->fp, "%d\n", numarms);
+        return;
+    }
+    out->narms[out->ipoly++] = numarms;
+}
+
+// write the arms of polymer i (weight polywt) in out and return the number of
+// arms written
+static int polyconf_polymer(polyconf_out *out, int i, double polywt, double N_e)
+{
+    int numarms, anum, first, tL1, tL2, tR1, tR2, m1, mc;
+    double armwt, armz;
+
+    if (br_poly[i].num_br == 0)
+    { //it's a linear polymer
+        first = br_poly[i].first_end;
+        armwt = 0.5 * arm_pool[first].arm_len / br_poly[i].tot_len * polywt;
+        armz = 0.5 * arm_pool[first].arm_len / N_e;
+        polyconf_start(out, 2);
+        polyconf_arm(out, -1, -1, 1, -1, armz, armwt);
+        polyconf_arm(out, 0, -1, -1, -1, armz, armwt);
+        return 2;
+    }
+    // it's a branched polymer
+    numarms = 2 * br_poly[i].num_br + 1;
+    polyconf_start(out, numarms); //number of arms
+    first = br_poly[i].first_end;
+
+    //renumber segments starting from zero
+    m1 = first;
+    anum = 0;
+    while (true)
+    {
+        arm_pool[m1].armnum = anum;
+        m1 = arm_pool[m1].down;
+        anum = anum + 1;
+        if (m1 == first)
+        {
+            break;
+        }
+    }
+    // now do output - loop over arms
+    m1 = first;
+    while (true)
+    {
+        armwt = arm_pool[m1].arm_len / br_poly[i].tot_len * polywt;
+        armz = arm_pool[m1].arm_len / N_e;
+        if (arm_pool[m1].L1 == 0)
+        {
+            tL1 = -1;
+        }
+        else
+        {
+            mc = abs(arm_pool[m1].L1);
+            tL1 = arm_pool[mc].armnum;
+        }
+        if (arm_pool[m1].L2 == 0)
+        {
+            tL2 = -1;
+        }
+        else
+        {
+            mc = abs(arm_pool[m1].L2);
+            tL2 = arm_pool[mc].armnum;
+        }
+        if (arm_pool[m1].R1 == 0)
+        {
+            tR1 = -1;
+        }
+        else
+        {
+            mc = abs(arm_pool[m1].R1);
+            tR1 = arm_pool[mc].armnum;
+        }
+        if (arm_pool[m1].R2 == 0)
+        {
+            tR2 = -1;
+        }
+        else
+        {
+            mc = abs(arm_pool[m1].R2);
+            tR2 = arm_pool[mc].armnum;
+        }
+        polyconf_arm(out, tL1, tL2, tR1, tR2, armz, armwt);
 
-    atally = 0;
+        m1 = arm_pool[m1].down;
+        if (m1 == first)
+        { //end output loop over arms
+            break;
+        }
+    }
+    return numarms;
+}
 
-    // loop through polymers, writing output
-    npoly = react_dist[n].npoly;
-    N_e = react_dist[n].N_e;
-    i = react_dist[n].first_poly;
+// write the saved polymers of distribution dist (weight distwt in the file) in
+// out, counting the polymers and arms written in nwritten and narms. progress (if
+// not NULL) is called with the number of polymers written every
+// POLYCONF_PROGRESS_STEP arms. Return false if progress cancelled
+static bool polyconf_dist(polyconf_out *out, int dist, double distwt, polyconf_progress progress, unsigned long long *nwritten, unsigned long long *narms)
+{
+    int i, npoly;
+    double enrich, polywt, N_e;
+    unsigned long long narms_before;
+
+    npoly = react_dist[dist].npoly;
+    N_e = react_dist[dist].N_e;
+    i = react_dist[dist].first_poly;
     while (true)
     {
         if (br_poly[i].saved)
         {
-
-            if (react_dist[n].numinbin[br_poly[i].bin] <= react_dist[n].bobbinmax)
+            if (react_dist[dist].numinbin[br_poly[i].bin] <= react_dist[dist].bobbinmax)
             {
                 enrich = 1.0;
             }
             else
             {
-                enrich = react_dist[n].numinbin[br_poly[i].bin] / react_dist[n].bobbinmax;
+                enrich = react_dist[dist].numinbin[br_poly[i].bin] / react_dist[dist].bobbinmax;
             }
-            polywt = enrich / npoly;
-
-            if (br_poly[i].num_br == 0)
-            { //it's a linear polymer
-                fprintf(fp, "2\n");
-                atally = atally + 2;
-                first = br_poly[i].first_end;
-                armwt = 0.5 * arm_pool[first].arm_len / br_poly[i].tot_len / npoly * enrich;
-                armz = 0.5 * arm_pool[first].arm_len / N_e;
-                fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", -1, -1, 1, -1, armz, armwt);
-                fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", 0, -1, -1, -1, armz, armwt);
+            polywt = enrich / npoly * distwt;
+            narms_before = *narms;
+            *narms += polyconf_polymer(out, i, polywt, N_e);
+            (*nwritten)++;
+            if (progress != NULL && *narms / POLYCONF_PROGRESS_STEP != narms_before / POLYCONF_PROGRESS_STEP && !progress(*nwritten))
+            {
+                return false;
             }
-            else
-            { // it's a branched polymer
-                numarms = 2 * br_poly[i].num_br + 1;
-                fprintf(fp, "%d\n", numarms); //number of arms
-                atally = atally + numarms;
-                first = br_poly[i].first_end;
-
-                //renumber segments starting from zero
-                m1 = first;
-                anum = 0;
-                while (true)
-                {
-                    arm_pool[m1].armnum = anum;
-                    m1 = arm_pool[m1].down;
-                    anum = anum + 1;
-                    if (m1 == first)
-                    {
-                        break;
-                    }
-                }
-                // now do output - loop over arms
-                m1 = first;
-                while (true)
-                {
-                    armwt = arm_pool[m1].arm_len / br_poly[i].tot_len / npoly * enrich;
-                    armz = arm_pool[m1].arm_len / N_e;
-                    if (arm_pool[m1].L1 == 0)
-                    {
-                        tL1 = -1;
-                    }
-                    else
-                    {
-                        mc = abs(arm_pool[m1].L1);
-                        tL1 = arm_pool[mc].armnum;
-                    }
-                    if (arm_pool[m1].L2 == 0)
-                    {
-                        tL2 = -1;
-                    }
-                    else
-                    {
-                        mc = abs(arm_pool[m1].L2);
-                        tL2 = arm_pool[mc].armnum;
-                    }
-                    if (arm_pool[m1].R1 == 0)
-                    {
-                        tR1 = -1;
-                    }
-                    else
-                    {
-                        mc = abs(arm_pool[m1].R1);
-                        tR1 = arm_pool[mc].armnum;
-                    }
-                    if (arm_pool[m1].R2 == 0)
-                    {
-                        tR2 = -1;
-                    }
-                    else
-                    {
-                        mc = abs(arm_pool[m1].R2);
-                        tR2 = arm_pool[mc].armnum;
-                    }
-                    fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", tL1, tL2, tR1, tR2, armz, armwt);
-
-                    m1 = arm_pool[m1].down;
-                    if (m1 == first)
-                    { //end output loop over arms
-                        break;
-                    }
-                }
-            } // end of if (it's a linear or branched polymer )
-
-        } //end of "if saved"
+        }
         i = br_poly[i].nextpoly;
         if (i == 0)
         {
             break;
         }
+    }
+    return true;
+}
 
-    } //end of loop over polymers
+// open the polyconf file fname with a large output buffer
+static FILE *polyconf_open(char *fname)
+{
+    FILE *fp = fopen(fname, "w");
+    if (fp != NULL)
+    {
+        setvbuf(fp, NULL, _IOFBF, POLYCONF_BUFFER_SIZE);
+    }
+    return fp;
+}
 
-    fclose(fp);
+// close the polyconf file fname, and delete it if it is not complete
+static bool polyconf_close(FILE *fp, char *fname, bool complete)
+{
+    complete = (fclose(fp) == 0) && complete;
+    if (!complete)
+    {
+        remove(fname);
+    }
+    return complete;
 }
 
-// version for mixtures
-// double *weights, int *dists, int n_inmix)
-unsigned long long multipolyconfwrite(char *fname, double *weights, int *dists, int n_inmix)
+// write the saved polymers of distribution n in the BoB polyconf file fname,
+// reporting the progress (see polyconf_dist). Return false if the file cannot be
+// written or the user cancelled (the file is then deleted)
+bool polyconfwrite_progress(int n, char *fname, polyconf_progress progress)
+{
+    unsigned long long nwritten = 0, narms = 0;
+    bool complete;
+    FILE *fp;
+    polyconf_out out = {NULL};
+
+    fp = polyconf_open(fname);
+    if (fp == NULL)
+    {
+        return false;
+    }
+
+    react_dist[n].N_e = react_dist[n].M_e / react_dist[n].monmass;
+    // opening lines
+    fprintf(fp, "reactpol\n");
+    fprintf(fp, "%f\n", react_dist[n].N_e);
+    fprintf(fp, "%d\n", react_dist[n].nsaved);
+
+    out.fp = fp;
+    complete = polyconf_dist(&out, n, 1.0, progress, &nwritten, &narms);
+    return polyconf_close(fp, fname, complete);
+}
+
+void polyconfwrite(int n, char *fname)
+{
+    polyconfwrite_progress(n, fname, NULL);
+}
+
+// version for mixtures: write the saved polymers of the n_inmix distributions
+// dists, with weights, in fname
+bool multipolyconfwrite_progress(char *fname, double *weights, int *dists, int n_inmix, polyconf_progress progress)
 {
-    int i, atally, numarms, anum, n, nmix;
-    int first, tL1, tL2, tR1, tR2, m1, mc, npoly;
-    int dist;
-    // F: TextFile;
-    double enrich, polywt, armwt, armz, N_e, N_e_av, distwt;
+    int n, dist;
+    double N_e_av;
+    unsigned long long numsaved_out = 0, nwritten = 0, narms = 0;
+    bool complete = true;
     FILE *fp;
+    polyconf_out out = {NULL};
 
-    fp = fopen(fname, "w");
+    fp = polyconf_open(fname);
+    if (fp == NULL)
+    {
+        return false;
+    }
 
     // count polymers over all distributions
-    unsigned long long numsaved_out = 0;
-    nmix = 0;
     N_e_av = 0;
-
     for (n = 0; n < n_inmix; n++)
     {
         dist = dists[n];
         react_dist[dist].N_e = react_dist[dist].M_e / react_dist[dist].monmass;
         N_e_av = N_e_av + react_dist[dist].N_e;
-        nmix++;
         numsaved_out += react_dist[dist].nsaved;
     }
-    N_e_av = N_e_av / nmix;
+    N_e_av = N_e_av / n_inmix;
 
     // opening lines
     fprintf(fp, "reactmix\n");
     fprintf(fp, "%g\n", N_e_av);
     fprintf(fp, "%llu\n", numsaved_out);
 
-    atally = 0;
-
     // now loop through distributions writing output
+    out.fp = fp;
+    for (n = 0; n < n_inmix && complete; n++)
+    {
+        complete = polyconf_dist(&out, dists[n], weights[n], progress, &nwritten, &narms);
+    }
+    return polyconf_close(fp, fname, complete);
+}
+
+unsigned long long multipolyconfwrite(char *fname, double *weights, int *dists, int n_inmix)
+{
+    int n;
+    unsigned long long numsaved_out = 0;
+
     for (n = 0; n < n_inmix; n++)
     {
-        dist = dists[n];
-        distwt = weights[n];
+        numsaved_out += react_dist[dists[n]].nsaved;
+    }
+    multipolyconfwrite_progress(fname, weights, dists, n_inmix, NULL);
+    return numsaved_out;
+}
 
-        // loop through polymers, writing output
-        npoly = react_dist[dist].npoly;
-        N_e = react_dist[dist].N_e;
-        i = react_dist[dist].first_poly;
+// number of arms of the saved polymers of the n_inmix distributions dists, i.e.
+// the size of the arrays filled by polyconf_arrays
+unsigned long long polyconf_count_arms(int *dists, int n_inmix)
+{
+    int n, i;
+    unsigned long long narms = 0;
+
+    for (n = 0; n < n_inmix; n++)
+    {
+        i = react_dist[dists[n]].first_poly;
         while (true)
         {
             if (br_poly[i].saved)
             {
-                if (react_dist[dist].numinbin[br_poly[i].bin] <= react_dist[dist].bobbinmax)
-                {
-                    enrich = 1.0;
-                }
-                else
-                {
-                    enrich = react_dist[dist].numinbin[br_poly[i].bin] / react_dist[dist].bobbinmax;
-                }
-                polywt = enrich / npoly * distwt;
-
-                if (br_poly[i].num_br == 0)
-                { //it's a linear polymer
-                    fprintf(fp, "2\n");
-                    atally = atally + 2;
-                    first = br_poly[i].first_end;
-                    armwt = 0.5 * arm_pool[first].arm_len / br_poly[i].tot_len * polywt;
-                    armz = 0.5 * arm_pool[first].arm_len / N_e;
-                    fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", -1, -1, 1, -1, armz, armwt);
-                    fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", 0, -1, -1, -1, armz, armwt);
-                }
-                else
-                { // it's a branched polymer
-                    numarms = 2 * br_poly[i].num_br + 1;
-                    fprintf(fp, "%d\n", numarms); //number of arms
-                    atally = atally + numarms;
-                    first = br_poly[i].first_end;
-
-                    //renumber segments starting from zero
-                    m1 = first;
-                    anum = 0;
-                    while (true)
-                    {
-                        arm_pool[m1].armnum = anum;
-                        m1 = arm_pool[m1].down;
-                        anum = anum + 1;
-                        if (m1 == first)
-                        {
-                            break;
-                        }
-                    }
-                    // now do output - loop over arms
-                    m1 = first;
-                    while (true)
-                    {
-                        armwt = arm_pool[m1].arm_len / br_poly[i].tot_len * polywt;
-                        armz = arm_pool[m1].arm_len / N_e;
-                        if (arm_pool[m1].L1 == 0)
-                        {
-                            tL1 = -1;
-                        }
-                        else
-                        {
-                            mc = abs(arm_pool[m1].L1);
-                            tL1 = arm_pool[mc].armnum;
-                        }
-                        if (arm_pool[m1].L2 == 0)
-                        {
-                            tL2 = -1;
-                        }
-                        else
-                        {
-                            mc = abs(arm_pool[m1].L2);
-                            tL2 = arm_pool[mc].armnum;
-                        }
-                        if (arm_pool[m1].R1 == 0)
-                        {
-                            tR1 = -1;
-                        }
-                        else
-                        {
-                            mc = abs(arm_pool[m1].R1);
-                            tR1 = arm_pool[mc].armnum;
-                        }
-                        if (arm_pool[m1].R2 == 0)
-                        {
-                            tR2 = -1;
-                        }
-                        else
-                        {
-                            mc = abs(arm_pool[m1].R2);
-                            tR2 = arm_pool[mc].armnum;
-                        }
-                        fprintf(fp, "%7d %7d %7d %7d %20.13e %20.13e\n", tL1, tL2, tR1, tR2, armz, armwt);
-
-                        m1 = arm_pool[m1].down;
-
-                        if (m1 == first)
-                        {
-                            break;
-                        }
-                    } //end output loop over arms
-
-                } // end of if (it's a linear or branched polymer )
-
-            } //end of "if saved"
+                narms += (br_poly[i].num_br == 0) ? 2 : 2 * br_poly[i].num_br + 1;
+            }
             i = br_poly[i].nextpoly;
             if (i == 0)
             {
                 break;
-            } //end of loop over polymers
+            }
         }
+    }
+    return narms;
+}
 
-    } // end of loop over distributions
+// copy the saved polymers of the n_inmix distributions dists, with weights, in
+// arrays instead of a polyconf file: number of arms of each polymer (narms), and
+// for each arm the 4 links L1, L2, R1, R2, the length in entanglements (armz) and
+// the weight fraction (armwt), as in the lines of the file.
+// Return the number of arms copied
+unsigned long long polyconf_arrays(double *weights, int *dists, int n_inmix, int *narms, int *links, double *armz, double *armwt)
+{
+    int n, dist;
+    unsigned long long nwritten = 0, narms_out = 0;
+    polyconf_out out = {NULL, narms, links, armz, armwt, 0, 0};
 
-    fclose(fp);
-    return numsaved_out;
+    for (n = 0; n < n_inmix; n++)
+    {
+        dist = dists[n];
+        react_dist[dist].N_e = react_dist[dist].M_e / react_dist[dist].monmass;
+        polyconf_dist(&out, dist, weights[n], NULL, &nwritten, &narms_out);
+    }
+    return narms_out;
 }
 
 double return_binsandbob_multi_avbr(int i)
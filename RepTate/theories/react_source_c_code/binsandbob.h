@@ -36,14 +36,39 @@
 #define BINSANDBOB_H
 
 #include <stdbool.h>
+#include <stdio.h>
 #include "react_structs.h"
 
 extern void molbin(int);
+#define MOLBIN_NSUMS 7 // number of polymers, sum of M, M^2, M^3, M^4, 1/M and br/length
+extern void molbin_limits(int n, double *lenmin, double *lenmax);
+extern void molbin_sums(int n, double lgmin, double lgstep, double *sums);
+extern void molbin_finalise(int n, double lgmin, double lgstep, double *sums);
 extern void multimolbin(int reqbins, double *weights, int *dist, int ndists);
+#define MIX_NSUMS 4 // number of polymers, sum of M, 1/M and br/length
+extern void mix_component_bins(int n, double lgmin, double lgstep, int nbins, double *bins, double *sums);
 extern void bobinit(int n);
 extern void bobcount(int m, int n);
 extern void polyconfwrite(int, char *fname);
 unsigned long long multipolyconfwrite(char *fname, double *weights, int *dists, int n_inmix);
+#define POLYCONF_PROGRESS_STEP 100000 // arms written between progress reports
+#define POLYCONF_BUFFER_SIZE 1048576 // size (bytes) of the output buffer
+typedef bool (*polyconf_progress)(unsigned long long nwritten); // false: cancel
+bool polyconfwrite_progress(int n, char *fname, polyconf_progress progress);
+bool multipolyconfwrite_progress(char *fname, double *weights, int *dists, int n_inmix, polyconf_progress progress);
+// destination of the polyconf writers: the file fp or, if fp is NULL, the arrays
+// of numbers of arms (filled up to ipoly) and of arms (filled up to iarm)
+typedef struct
+{
+    FILE *fp;
+    int *narms;
+    int *links;
+    double *armz;
+    double *armwt;
+    unsigned long long ipoly, iarm;
+} polyconf_out;
+unsigned long long polyconf_count_arms(int *dists, int n_inmix);
+unsigned long long polyconf_arrays(double *weights, int *dists, int n_inmix, int *narms, int *links, double *armz, double *armwt);
 // extern void multipolyconfwrite(char *fname, double *weights, bool *inmix, int *numsaved_out);
 extern double return_binsandbob_multi_avbr(int i);
 extern double return_binsandbob_multi_avg(int i);
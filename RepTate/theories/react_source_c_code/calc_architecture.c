@@ -310,6 +310,91 @@ int return_max_senio(void)
     return max_senio;
 }
 
+int return_n_prio_senio_bins(void)
+{
+    return N_PS;
+}
+
+// copy the priority/seniority bins in sums (PRIO_SENIO_NSUMS * N_PS doubles) and
+// counts (2 * N_PS + 3 integers: arm numbers, number of polymers, max prio and
+// max senio), e.g. to merge them with those of another simulation
+void get_bin_prio_vs_senio(double *sums, int *counts)
+{
+    int i;
+    for (i = 0; i < N_PS; i++)
+    {
+        sums[i] = sphi_avprio_v_senio[i];
+        sums[N_PS + i] = sphi_avsenio_v_prio[i];
+        sums[2 * N_PS + i] = avprio_v_senio[i];
+        sums[3 * N_PS + i] = avsenio_v_prio[i];
+        sums[4 * N_PS + i] = avarmlen_v_senio[i];
+        sums[5 * N_PS + i] = avarmlen_v_prio[i];
+        sums[6 * N_PS + i] = proba_prio[i];
+        sums[7 * N_PS + i] = proba_senio[i];
+        counts[i] = n_armlen_v_senio[i];
+        counts[N_PS + i] = n_armlen_v_prio[i];
+    }
+    counts[2 * N_PS] = n_polymer;
+    counts[2 * N_PS + 1] = max_prio;
+    counts[2 * N_PS + 2] = max_senio;
+}
+
+// add bins obtained with get_bin_prio_vs_senio to the current ones
+void add_bin_prio_vs_senio(double *sums, int *counts)
+{
+    int i;
+    for (i = 0; i < N_PS; i++)
+    {
+        sphi_avprio_v_senio[i] += sums[i];
+        sphi_avsenio_v_prio[i] += sums[N_PS + i];
+        avprio_v_senio[i] += sums[2 * N_PS + i];
+        avsenio_v_prio[i] += sums[3 * N_PS + i];
+        avarmlen_v_senio[i] += sums[4 * N_PS + i];
+        avarmlen_v_prio[i] += sums[5 * N_PS + i];
+        proba_prio[i] += sums[6 * N_PS + i];
+        proba_senio[i] += sums[7 * N_PS + i];
+        n_armlen_v_senio[i] += counts[i];
+        n_armlen_v_prio[i] += counts[N_PS + i];
+    }
+    n_polymer += counts[2 * N_PS];
+    if (counts[2 * N_PS + 1] > max_prio)
+    {
+        max_prio = counts[2 * N_PS + 1];
+    }
+    if (counts[2 * N_PS + 2] > max_senio)
+    {
+        max_senio = counts[2 * N_PS + 2];
+    }
+}
+
+// copy the average arm length, the average priority and the probability versus
+// seniority (1 to max_senio) in out (3 * max_senio doubles), as returned by
+// return_avarmlen_v_senio, return_avprio_v_senio and return_proba_senio
+void get_hist_v_senio(int dist, double *out)
+{
+    int s;
+    for (s = 1; s <= max_senio; s++)
+    {
+        out[s - 1] = return_avarmlen_v_senio(s, dist);
+        out[max_senio + s - 1] = return_avprio_v_senio(s);
+        out[2 * max_senio + s - 1] = return_proba_senio(s);
+    }
+}
+
+// copy the average arm length, the average seniority and the probability versus
+// priority (1 to max_prio) in out (3 * max_prio doubles), as returned by
+// return_avarmlen_v_prio, return_avsenio_v_prio and return_proba_prio
+void get_hist_v_prio(int dist, double *out)
+{
+    int p;
+    for (p = 1; p <= max_prio; p++)
+    {
+        out[p - 1] = return_avarmlen_v_prio(p, dist);
+        out[max_prio + p - 1] = return_avsenio_v_prio(p);
+        out[2 * max_prio + p - 1] = return_proba_prio(p);
+    }
+}
+
 void save_architect(int npol, int ndist)
 {
     int narm, first, m;
@@ -44,6 +44,13 @@ void senio_prio(int npoly, int ndistr);
 void set_do_prio_senio(bool b);
 void set_flag_stop_all(bool b);
 void bin_arm_length(int npoly, int ndistr);
+#define PRIO_SENIO_NSUMS 8 // number of double arrays in get_bin_prio_vs_senio
+int return_n_prio_senio_bins(void);
+void get_bin_prio_vs_senio(double *sums, int *counts);
+void add_bin_prio_vs_senio(double *sums, int *counts);
+#define PRIO_SENIO_NHIST 3 // number of histograms in get_hist_v_senio/prio
+void get_hist_v_senio(int dist, double *out);
+void get_hist_v_prio(int dist, double *out);
 
 extern bool do_prio_senio;
 extern bool flag_stop_all;
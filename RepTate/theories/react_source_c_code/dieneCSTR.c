@@ -517,3 +517,28 @@ void getconv_future_reac_P(double cur_conv, double *new_conv)
     }
     *new_conv = cur_conv - conv_future_P * log(rnd);
 }
+
+static int dieneCSTR_ngel;
+
+static bool dieneCSTR_count_gel(int n, int n1)
+{
+    // make a polymer and count (without stopping) those that reached gelation
+    bool success = dieneCSTR(n, n1);
+    if (success && dCSTR_global.dieneCSTRerrorflag)
+    {
+        dieneCSTR_ngel++;
+        dCSTR_global.dieneCSTRerrorflag = false;
+    }
+    return success;
+}
+
+int dieneCSTR_batch(int nmake, int ndist, int *nmade, int *ngel)
+{
+    // make nmake polymers in one call, see make_polys. The number of
+    // polymers too large (gelation) is added to ngel
+    int status;
+    dieneCSTR_ngel = 0;
+    status = make_polys(nmake, ndist, dieneCSTR_count_gel, NULL, nmade);
+    *ngel += dieneCSTR_ngel;
+    return status;
+}
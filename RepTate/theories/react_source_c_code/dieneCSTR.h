@@ -40,6 +40,7 @@
 
 void dieneCSTRstart(double _tau, double _kpM, double _kDLCB, double _kpLCB, double _kpD, double _keq, double _ks, double _D0, double _C0, double _ldiene, double t_collection, int n);
 bool dieneCSTR(int n, int n1);     // returns false it we ran out of arm-storage
+int dieneCSTR_batch(int nmake, int ndist, int *nmade, int *ngel); // make nmake polymers, returns a MAKE_POLYS_ status
 
 extern dieneCSTR_global dCSTR_global;
 
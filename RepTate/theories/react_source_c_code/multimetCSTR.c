@@ -574,4 +574,10 @@ bool init_local_arrays(int numcat_max)
 //     local_arrays_initialized = true;
 //     old_n = n;
 //     return true;
-// }
\ No newline at end of file
+// }
+
+int mulmetCSTR_batch(int nmake, int ndist, int *nmade)
+{
+    // make nmake polymers in one call, see make_polys
+    return make_polys(nmake, ndist, mulmetCSTR, &MMCSTR_global.mulmetCSTRerrorflag, nmade);
+}
@@ -40,6 +40,7 @@
 
 extern void mulmetCSTRstart(double *kp, double *kdb, double *ks, double *kplcb, double *yconc, double tau, double mconc, int n, int ndist, int numcat_max);
 extern bool mulmetCSTR(int n, int n1); // returns false it we ran out of arm-storage
+int mulmetCSTR_batch(int nmake, int ndist, int *nmade); // make nmake polymers, returns a MAKE_POLYS_ status
 
 extern mulmetCSTR_global MMCSTR_global;
 
@@ -394,3 +394,50 @@ bool increase_dist_records_in_react_dist(int new_size)
     pb_global.dists_avail = true;
     return true;
 }
+
+int make_polys(int nmake, int ndist, bool (*make_one)(int, int), bool *errorflag, int *nmade)
+{
+    /* make up to nmake polymers of distribution ndist with the simulation
+       function make_one, adding them to the top of the list of polymers of the
+       distribution. Stop early if records run out, if the error flag of the
+       simulation is set (errorflag may be NULL) or if the user asks to stop. The number of polymers made
+       is returned in nmade */
+    extern bool flag_stop_all;
+    int m;
+
+    *nmade = 0;
+    while (*nmade < nmake)
+    {
+        if (flag_stop_all)
+        {
+            return MAKE_POLYS_STOPPED;
+        }
+        if (!request_poly(&m))
+        {
+            return MAKE_POLYS_NO_POLY;
+        }
+        // put it in list
+        if (react_dist[ndist].npoly == 0)
+        { // case of first polymer made
+            react_dist[ndist].first_poly = m;
+            br_poly[m].nextpoly = 0;
+        }
+        else
+        { // next polymer, put to top of list
+            br_poly[m].nextpoly = react_dist[ndist].first_poly;
+            react_dist[ndist].first_poly = m;
+        }
+        // make a polymer, returns false if arms ran out
+        if (!make_one(m, ndist))
+        {
+            return MAKE_POLYS_NO_ARM;
+        }
+        react_dist[ndist].npoly++;
+        (*nmade)++;
+        if (errorflag != NULL && *errorflag)
+        {
+            return MAKE_POLYS_ERROR;
+        }
+    }
+    return MAKE_POLYS_DONE;
+}
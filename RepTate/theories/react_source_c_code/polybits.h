@@ -58,6 +58,14 @@ extern void return_dist_polys(int);
 extern void armupdown(int, int);
 extern reactresults *return_react_dist(int i);
 
+// status returned by make_polys and the <simulation>_batch functions
+#define MAKE_POLYS_DONE 0     // all the polymers requested were made
+#define MAKE_POLYS_NO_POLY 1  // ran out of polymer records
+#define MAKE_POLYS_NO_ARM 2   // ran out of arm records
+#define MAKE_POLYS_ERROR 3    // simulation error flag set (e.g. gelation)
+#define MAKE_POLYS_STOPPED 4  // stop requested by the user
+extern int make_polys(int nmake, int ndist, bool (*make_one)(int, int), bool *errorflag, int *nmade);
+
 // random number generator seed
 extern long iy3;
 
@@ -412,3 +412,9 @@ void getconv2(double cur_conv, double *new_conv)
     rnd = ran3(&iy3);
     *new_conv = rnd * cur_conv;
 }
+
+int tobCSTR_batch(int nmake, int ndist, int *nmade)
+{
+    // make nmake polymers in one call, see make_polys
+    return make_polys(nmake, ndist, tobCSTR, &tCSTR_global.tobitaCSTRerrorflag, nmade);
+}
@@ -40,6 +40,7 @@
 
 void tobCSTRstart(double ttau,double  tbeta,double  tsigma, double  tlambda, int n);
 bool tobCSTR(int n, int n1);     // returns false it we ran out of arm-storage
+int tobCSTR_batch(int nmake, int ndist, int *nmade); // make nmake polymers, returns a MAKE_POLYS_ status
 
 extern tobitaCSTR_global tCSTR_global;
 
@@ -398,3 +398,9 @@ void getconv2(double cur_conv, double *new_conv)
     rnd = ran3(&iy3);
     *new_conv = 1.0 - (1.0 - cur_conv) * exp(-rnd * log((1.0 - cur_conv) / (1.0 - fin_conv)));
 }
+
+int tobbatch_batch(int nmake, int ndist, int *nmade)
+{
+    // make nmake polymers in one call, see make_polys
+    return make_polys(nmake, ndist, tobbatch, &tb_global.tobitabatcherrorflag, nmade);
+}
@@ -40,6 +40,7 @@
 
 extern void tobbatchstart(double pfin_conv, double ptau, double pbeta, double pCs, double pCb, int n);
 extern bool tobbatch(int, int); // returns false it we ran out of arm-storage
+int tobbatch_batch(int nmake, int ndist, int *nmade); // make nmake polymers, returns a MAKE_POLYS_ status
 
 extern tobitabatch_global tb_global;
 
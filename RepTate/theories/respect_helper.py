@@ -0,0 +1,562 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+"""Module respect_helper
+
+Numerical core of the ReSpect theories (TheoryShanbhagMaxwellModesFrequency and
+TheoryShanbhagMaxwellModesTime): L-curve scan of the continuous spectrum and AIC
+grid search of the discrete spectrum.
+
+The scan solves the regularised least-squares problem for a decreasing sequence of
+values of lambda, each solution being the starting guess of the next one. To use
+several processes, the lambda grid is split in contiguous chunks: a coarse serial
+pass solves the problem at the top of each chunk, and every chunk is then completed
+on a worker process, warm-started from its coarse solution. The functions and
+classes of this module do not depend on Qt, so that they can be sent to worker
+processes.
+
+Kernel matrices and regularisation matrices only depend on the experimental grid
+and on the grid of relaxation times, and are kept in kernel_cache, shared by the
+frequency and time theories, so that changing other parameters of the theories
+does not rebuild them.
+
+The discrete spectrum is selected on a grid of base weight distributions (wb) and
+number of modes (N). Rows of the grid (one wb, all N) are evaluated independently,
+on worker processes in multithread mode, and the best cell is found by reduction.
+"""
+import time
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from scipy.optimize import least_squares, nnls
+from scipy.interpolate import interp1d
+from scipy.integrate import cumulative_trapezoid
+
+LOGP_CUTOFF = 18  # stop the scan when logP falls this much below its maximum
+MIN_CHUNK = 4  # minimum number of lambda values per worker
+KERNEL_CACHE_BYTES = 64 * 2**20  # memory cap of the kernel cache
+
+_executor = None
+_executor_workers = 0
+
+
+def second_difference_matrix(ns):
+    """(ns-2)*ns tridiagonal matrix with 1 -2 and 1 on its diagonals"""
+    nl = ns - 2
+    L = np.zeros((nl, ns))
+    i = np.arange(nl)
+    L[i, i] = 1.0
+    L[i, i + 1] = -2.0
+    L[i, i + 2] = 1.0
+    return L
+
+
+def kernel_weights(s):
+    """Trapezoidal integration weights of the log-spaced relaxation times s"""
+    ns = len(s)
+    hsv = np.zeros(ns)
+    hsv[0] = 0.5 * np.log(s[1] / s[0])
+    hsv[ns - 1] = 0.5 * np.log(s[ns - 1] / s[ns - 2])
+    hsv[1 : ns - 1] = 0.5 * (np.log(s[2:ns]) - np.log(s[0 : ns - 2]))
+    return hsv
+
+
+def kernel_frequency(s, w):
+    """2n*ns matrix [(ws^2/1+ws^2) | (ws/1+ws)]'*hs, which can be multiplied with
+    exp(H) to get predicted G*"""
+    S, W = np.meshgrid(s, w)
+    ws = S * W
+    ws2 = ws**2
+    return np.vstack((ws2 / (1 + ws2), ws / (1 + ws2))) * kernel_weights(s)
+
+
+def kernel_time(s, t):
+    """n*ns matrix hs * exp(-T/S), which can be multiplied with exp(H) to get
+    predicted G(t)"""
+    S, T = np.meshgrid(s, t)
+    return np.exp(-T / S) * kernel_weights(s)
+
+
+class KernelCache:
+    """Least-recently-used store of kernel and regularisation matrices
+
+    Kernel matrices are keyed by the kind of kernel and by hashes of the
+    experimental grid (w or t) and of the grid of relaxation times s. Entries are
+    evicted when the total size of the stored arrays exceeds max_bytes. The arrays
+    returned are read-only, as they are shared by all the callers.
+    """
+
+    builders = {"frequency": kernel_frequency, "time": kernel_time}
+
+    def __init__(self, max_bytes=KERNEL_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+
+    @staticmethod
+    def digest(a):
+        a = np.ascontiguousarray(a, dtype=float)
+        return hashlib.sha1(a.view(np.uint8)).hexdigest()
+
+    def lookup(self, key, build):
+        """Return the arrays stored under key, building them with build() if needed"""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            return value
+        value = build()
+        arrays = value if isinstance(value, tuple) else (value,)
+        for a in arrays:
+            if isinstance(a, np.ndarray):
+                a.setflags(write=False)
+                self.nbytes += a.nbytes
+        self.entries[key] = value
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            old = old if isinstance(old, tuple) else (old,)
+            self.nbytes -= sum(a.nbytes for a in old if isinstance(a, np.ndarray))
+        return value
+
+    def kernel(self, kind, x, s):
+        """Kernel matrix ("frequency" or "time") on the grids x and s"""
+        key = (kind, self.digest(x), self.digest(s))
+        return self.lookup(key, lambda: self.builders[kind](s, x))
+
+    def regularisation(self, ns):
+        """Second-difference matrix L, its Gram matrix A = L'L and log(det(A))"""
+
+        def build():
+            L = second_difference_matrix(ns)
+            Amat = np.dot(L.T, L)
+            _, LogDetN = np.linalg.slogdet(Amat)
+            return L, Amat, LogDetN
+
+        return self.lookup(("regularisation", ns), build)
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+
+kernel_cache = KernelCache()
+
+
+def get_executor(nworkers):
+    """Process pool shared by all the L-curve scans
+
+    The pool is created on first use and kept alive, so that the cost of starting
+    the worker processes is only paid once per session. Processes are spawned
+    (not forked), as the calculations are launched from a Qt thread.
+    """
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != nworkers:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = ProcessPoolExecutor(
+            max_workers=nworkers, mp_context=multiprocessing.get_context("spawn")
+        )
+        _executor_workers = nworkers
+    return _executor
+
+
+class LcurveProblem:
+    """Regularised fit of the continuous spectrum H(s) to the data Gexp
+
+    The matrices that do not depend on lambda nor on H (second-difference matrix L,
+    A = L'L and its log-determinant) are taken from kernel_cache and shared by all
+    the values of lambda of the scan.
+
+    Input: Gexp    = experimental data,
+           kernMat = matrix for faster kernel evaluation (Gexp ~ kernMat.exp(H) + G0),
+           g0mask  = vector of the size of Gexp, 1 where the plateau G0 contributes
+    """
+
+    def __init__(self, Gexp, kernMat, g0mask):
+        self.Gexp = Gexp
+        self.kernMat = kernMat
+        self.g0mask = g0mask
+        self.ns = kernMat.shape[1]
+        self.L, self.Amat, self.LogDetN = kernel_cache.regularisation(self.ns)
+
+    def kernel(self, H, G0=0.0):
+        """K*h + G0, where h = exp(H)"""
+        return np.dot(self.kernMat, np.exp(H)) + G0 * self.g0mask
+
+    def kernelD(self, H):
+        """Scaled derivative dK_i/dH_j / Gexp_i"""
+        return (self.kernMat * np.exp(H)) * (1.0 / self.Gexp)[:, None]
+
+    def residual(self, H, lam):
+        """Residuals of the kernel followed by the smoothness criterion
+        (H carries G0 as last element if there is a plateau)"""
+        ns = self.ns
+        n = len(self.Gexp)
+        r = np.zeros(n + ns - 2)
+        if len(H) > ns:
+            r[:n] = 1.0 - self.kernel(H[:-1], H[-1]) / self.Gexp
+            H = H[:-1]
+        else:
+            r[:n] = 1.0 - np.dot(self.kernMat, np.exp(H)) / self.Gexp
+        r[n:] = np.sqrt(lam) * np.diff(H, n=2)
+        return r
+
+    def jacobian(self, H, lam):
+        """Jacobian of residual(); the last column is dr_i/dG0 if there is a plateau"""
+        ns = self.ns
+        n = len(self.Gexp)
+        Jr = np.zeros((n + ns - 2, len(H)))
+        Jr[:n, :ns] = -self.kernelD(H[:ns])
+        if len(H) > ns:
+            Jr[:n, ns] = -self.g0mask / self.Gexp
+        Jr[n:, :ns] = np.sqrt(lam) * self.L
+        return Jr
+
+    def solve(self, lam, H, G0=None):
+        """H (and G0 if not None) minimising ||1 - kernel(H)/Gexp||^2 + lam ||L H||^2"""
+        if G0 is not None:
+            res_lsq = least_squares(
+                self.residual, np.append(H, G0), jac=self.jacobian, args=(lam,)
+            )
+            return res_lsq.x[:-1], res_lsq.x[-1]
+        res_lsq = least_squares(self.residual, H, jac=self.jacobian, args=(lam,))
+        return res_lsq.x, None
+
+    def evaluate(self, lam, H, G0=None):
+        """rho, eta and log-probability of the solution H for the given lambda"""
+        r = 1.0 - self.kernel(H, 0.0 if G0 is None else G0) / self.Gexp
+        rho = np.linalg.norm(r)
+        eta = np.linalg.norm(np.diff(H, n=2))
+
+        # error analysis, not explicitly accounting for G0 in Jr (underflow problems)
+        Jr = -self.kernelD(H)
+        Bmat = np.dot(Jr.T, Jr) + np.diag(np.dot(r.T, Jr))
+        _, LogDetC = np.linalg.slogdet(lam * self.Amat + Bmat)
+        V = rho**2 + lam * eta**2
+
+        # this assumes a prior exp(-lam)
+        logP = -V + 0.5 * (self.LogDetN + self.ns * np.log(lam) - LogDetC) - lam
+        return rho, eta, logP
+
+    def scan(self, lams, H, G0=None, cutoff=False, callback=None):
+        """Solve for each value of lams in turn, warm-started from the previous solution
+
+        If cutoff is True, stop as soon as logP falls LOGP_CUTOFF below its maximum.
+        Returns the arrays H(lambda) (ns*m), rho, eta and logP of the m solved values.
+        """
+        m = len(lams)
+        Hlambda = np.zeros((self.ns, m))
+        rho = np.zeros(m)
+        eta = np.zeros(m)
+        logP = np.zeros(m)
+        logPmax = -np.inf
+        for i, lam in enumerate(lams):
+            if callback is not None:
+                callback()
+            H, G0 = self.solve(lam, H, G0)
+            Hlambda[:, i] = H
+            rho[i], eta[i], logP[i] = self.evaluate(lam, H, G0)
+            if logP[i] > logPmax:
+                logPmax = logP[i]
+            elif cutoff and logP[i] < logPmax - LOGP_CUTOFF:
+                m = i + 1
+                break
+        return Hlambda[:, :m], rho[:m], eta[:m], logP[:m]
+
+
+def scan_chunk(problem, lams, H, G0):
+    """Worker task: scan a contiguous chunk of lambda values"""
+    # floating point warnings cannot be reported to the theory from a worker
+    with np.errstate(all="ignore"):
+        return problem.scan(lams, H, G0)
+
+
+def lcurve_scan(problem, lam, H, G0=None, nworkers=1, callback=None):
+    """Scan the grid of lambda values lam (increasing), from the largest to the smallest
+
+    The scan stops at the first value of lambda (from the top) whose logP falls
+    LOGP_CUTOFF below the maximum logP of the larger values. Returns the index i of
+    that value and the arrays H(lambda), rho, eta and logP for lam[i:].
+
+    With nworkers > 1, the grid is split in contiguous chunks scanned in parallel
+    (see module documentation). The solutions differ from the serial scan only
+    by the tolerance of the least-squares solver.
+    """
+    npoints = len(lam)
+    nchunks = min(nworkers, npoints // MIN_CHUNK)
+    if nchunks < 2:
+        Hlambda, rho, eta, logP = problem.scan(
+            lam[::-1], H, G0, cutoff=True, callback=callback
+        )
+        return npoints - len(rho), Hlambda[:, ::-1], rho[::-1], eta[::-1], logP[::-1]
+
+    chunks = np.array_split(np.arange(npoints)[::-1], nchunks)
+    Hlambda = np.zeros((problem.ns, npoints))
+    rho = np.zeros(npoints)
+    eta = np.zeros(npoints)
+    logP = np.zeros(npoints)
+
+    # coarse serial pass over the top of each chunk, which also tells how many
+    # chunks are needed before logP drops below the cutoff
+    starts = []
+    logPmax = -np.inf
+    for chunk in chunks:
+        if callback is not None:
+            callback()
+        i = chunk[0]
+        H, G0 = problem.solve(lam[i], H, G0)
+        Hlambda[:, i] = H
+        rho[i], eta[i], logP[i] = problem.evaluate(lam[i], H, G0)
+        if logP[i] > logPmax:
+            logPmax = logP[i]
+        elif logP[i] < logPmax - LOGP_CUTOFF:
+            # the serial scan stops before the end of the previous chunk
+            break
+        starts.append((H, G0))
+
+    pool = get_executor(nworkers)
+    futures = [
+        (chunk, pool.submit(scan_chunk, problem, lam[chunk[1:]], *start))
+        for chunk, start in zip(chunks, starts)
+    ]
+    for chunk, future in futures:
+        Hc, rhoc, etac, logPc = future.result()
+        Hlambda[:, chunk[1:]] = Hc
+        rho[chunk[1:]] = rhoc
+        eta[chunk[1:]] = etac
+        logP[chunk[1:]] = logPc
+        if callback is not None:
+            for _ in chunk[1:]:
+                callback()
+
+    # apply the cutoff in the same order as the serial scan
+    logPmax = -np.inf
+    for i in reversed(range(npoints)):
+        if logP[i] > logPmax:
+            logPmax = logP[i]
+        elif logP[i] < logPmax - LOGP_CUTOFF:
+            break
+    return i, Hlambda[:, i:], rho[i:], eta[i:], logP[i:]
+
+
+def nnls_frequency(w, tau, Gexp, isPlateau):
+    """Non-negative least squares weights g of the modes tau fitted to G* = [G'|G"]
+
+    Output: g, error (relative), condition number of the scaled kernel
+    """
+    n = int(len(Gexp) / 2)
+    ntau = len(tau)
+    S, W = np.meshgrid(tau, w)
+    ws = S * W
+    ws2 = ws**2
+    K = np.vstack((ws2 / (1 + ws2), ws / (1 + ws2)))  # 2n * nmodes
+
+    # K is n*ns [or ns+1]
+    if isPlateau:
+        K = np.hstack((K, np.ones((len(Gexp), 1))))  # G' needs some G0
+        K[n:, ntau] = 0.0  # G" doesn't have G0 contrib
+    #
+    # gets (Gst/GstE - 1)^2, instead of  (Gst -  GstE)^2
+    #
+    Kp = np.dot(np.diag((1.0 / Gexp)), K)
+    condKp = np.linalg.cond(Kp)
+    g = nnls(Kp, np.ones(len(Gexp)))[0]
+
+    GstM = np.dot(K, g)
+    error = np.sum((GstM / Gexp - 1.0) ** 2)
+
+    return g, error, condKp
+
+
+def nnls_time(t, tau, Gexp, isPlateau):
+    """Non-negative least squares weights g of the modes tau fitted to G(t)
+
+    Output: g, error (relative), condition number of the scaled kernel
+    """
+    S, T = np.meshgrid(tau, t)
+    K = np.exp(-T / S)  # n * nmodes
+
+    # K is n*ns [or ns+1]
+    if isPlateau:
+        K = np.hstack((K, np.ones((len(Gexp), 1))))
+
+    #
+    # gets (Gt/GtE - 1)^2, instead of  (Gt -  GtE)^2
+    #
+    Kp = np.dot(np.diag((1.0 / Gexp)), K)
+    condKp = np.linalg.cond(Kp)
+    g = nnls(Kp, np.ones(len(Gexp)))[0]
+
+    GtM = np.dot(K, g)
+    error = np.sum((GtM / Gexp - 1.0) ** 2)
+
+    return g, error, condKp
+
+
+def maxwell_modes_frequency(z, w, Gexp, isPlateau):
+    """Discrete spectrum g, tau = exp(z) fitted to G*, pruning runaway and small modes
+
+    Output: g, tau, error, condKp
+    """
+    tau = np.exp(z)
+    g, error, condKp = nnls_frequency(w, tau, Gexp, isPlateau)
+
+    # first remove runaway modes outside window with potentially large weight
+    izero = np.where(np.logical_or(max(w) * min(tau) < 0.02, min(w) * max(tau) > 50.0))
+    tau = np.delete(tau, izero)
+    g = np.delete(g, izero)
+
+    # search for small weights (gi)
+    if isPlateau:
+        izero = np.where(g[:-1] / np.max(g[:-1]) < 1e-8)
+    else:
+        izero = np.where(g / np.max(g) < 1e-8)
+
+    tau = np.delete(tau, izero)
+    g = np.delete(g, izero)
+
+    return g, tau, error, condKp
+
+
+def maxwell_modes_time(z, t, Gexp, isPlateau):
+    """Discrete spectrum g, tau (tau = exp(z)) fitted to G(t), pruning small modes
+
+    Output: g, tau, error, condKp
+    """
+    tau = np.exp(z)
+    g, error, condKp = nnls_time(t, tau, Gexp, isPlateau)
+
+    # search for small
+    if isPlateau:
+        izero = np.where(g[:-1] / max(g[:-1]) < 1e-7)
+    else:
+        izero = np.where(g / max(g) < 1e-7)
+
+    tau = np.delete(tau, izero)
+    g = np.delete(g, izero)
+
+    return g, tau, error, condKp
+
+
+class GridDensity:
+    """Points distributed according to a density function
+
+    The cumulative distribution of the density px(x) and its inverse interpolant are
+    built once, so that point sets of any size N can be drawn from the same density.
+
+    (c) Sachin Shanbhag, November 11, 2015
+    """
+
+    def __init__(self, x, px, npts=100):
+        xi = np.linspace(min(x), max(x), npts)  # reinterpolate on equi-spaced axis
+        pint = interp1d(x, px, "cubic")(xi)  # smoothen using cubic splines
+        ci = cumulative_trapezoid(pint, xi, initial=0)
+        ci = ci / ci[npts - 1]  # normalize ci
+        self.xmin = min(x)
+        self.xmax = max(x)
+        self.inverse = interp1d(ci, xi, "cubic")
+
+    def points(self, N):
+        """N >= 3 points, including the end points of x
+
+        Output: z  = points distributed according to the density
+                h  = width of the "intervals" - useful to apportion domain to points
+                     if you are doing quadrature with the results, for example.
+        """
+        alfa = 1.0 / (N - 1)  # alfa/2 + (N-1)*alfa + alfa/2
+        zij = np.zeros(N + 1)  # quadrature interval end marker
+        z = np.zeros(N)  # quadrature point
+
+        z[0] = self.xmin
+        z[N - 1] = self.xmax
+
+        #
+        # ci(Z_j,j+1) = (j - 0.5) * alfa
+        #
+        beta = np.arange(0.5, N - 0.5) * alfa
+        zij[0] = z[0]
+        zij[N] = z[N - 1]
+        zij[1:N] = self.inverse(beta)
+        h = np.diff(zij)
+
+        #
+        # Quadrature points are not the centroids, but rather the center of masses
+        # of the quadrature intervals
+        #
+        beta = np.arange(1, N - 1) * alfa
+        z[1 : N - 1] = self.inverse(beta)
+
+        return z, h
+
+
+def aic_row(modes, x, Gexp, isPlateau, lns, wt, Nv):
+    """Fit error and computing time of the cells (wb, N) of one row of the AIC grid,
+    for the weight distribution wt over lns = log(s)"""
+    ev = np.zeros(len(Nv))
+    dt = np.zeros(len(Nv))
+    grid = GridDensity(lns, wt)
+    for i, N in enumerate(Nv):
+        tic = time.time()
+        z, _ = grid.points(N)  # select "tau" Points
+        _, _, ev[i], _ = modes(z, x, Gexp, isPlateau)  # get g_i
+        dt[i] = time.time() - tic
+    return ev, dt
+
+
+def aic_row_task(*args):
+    """Worker task: evaluate one row of the AIC grid"""
+    with np.errstate(all="ignore"):
+        return aic_row(*args)
+
+
+def aic_grid(modes, x, Gexp, isPlateau, lns, wts, Nv, Cerror, nworkers=1):
+    """Evaluate the AIC on the grid of weight distributions wts * number of modes Nv
+
+    modes is maxwell_modes_frequency or maxwell_modes_time. Returns the indices
+    (ib, iN) of the best cell (the first one found if there are ties), the AIC
+    matrix and the time spent in each cell.
+    """
+    if nworkers > 1 and len(wts) > 1:
+        pool = get_executor(nworkers)
+        rows = [
+            pool.submit(aic_row_task, modes, x, Gexp, isPlateau, lns, wt, Nv)
+            for wt in wts
+        ]
+        rows = [row.result() for row in rows]
+    else:
+        rows = [aic_row(modes, x, Gexp, isPlateau, lns, wt, Nv) for wt in wts]
+    ev = np.array([row[0] for row in rows])
+    times = np.array([row[1] for row in rows])
+    AIC = 2.0 * Nv + 2.0 * Cerror * ev
+    ib, iN = np.unravel_index(np.argmin(AIC), AIC.shape)
+    return ib, iN, AIC, times
@@ -20,46 +20,125 @@ try:
 except:
     print("OS %s not recognized in Rouse CH module" % (sys.platform))
 
+array_1d_double = np.ctypeslib.ndpointer(
+    dtype=np.double, ndim=1, flags="C_CONTIGUOUS"
+)
+array_1d_int = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, flags="C_CONTIGUOUS")
+
 continuous_rouse_freq_interp = rouse_lib.continuous_rouse_freq_interp
 continuous_rouse_freq_interp.restype = None
+continuous_rouse_freq_interp.argtypes = [c_int, c_double, c_double, c_double] + [
+    array_1d_double
+] * 3
 
 continuous_rouse_time_interp = rouse_lib.continuous_rouse_time_interp
 continuous_rouse_time_interp.restype = None
+continuous_rouse_time_interp.argtypes = [c_int, c_double, c_double, c_double] + [
+    array_1d_double
+] * 2
+
+try:
+    continuous_rouse_freq_batch = rouse_lib.continuous_rouse_freq_batch
+    continuous_rouse_freq_batch.restype = None
+    continuous_rouse_freq_batch.argtypes = [c_int, array_1d_int] + [array_1d_double] * 6
+
+    continuous_rouse_time_batch = rouse_lib.continuous_rouse_time_batch
+    continuous_rouse_time_batch.restype = None
+    continuous_rouse_time_batch.argtypes = [c_int, array_1d_int] + [array_1d_double] * 5
+except AttributeError:
+    # library compiled without the batch entry points
+    continuous_rouse_freq_batch = None
+    continuous_rouse_time_batch = None
 
 
-def approx_rouse_frequency(params):
-    """Continuous Rouse frequency with interpolation for N"""
+def approx_rouse_frequency(params, gp=None, gpp=None):
+    """Continuous Rouse frequency with interpolation for N
+
+    The frequencies are passed by pointer (copied only if they are not a contiguous
+    array of doubles). The results are written in gp and gpp if given.
+    """
     G0, tau0, N, w = params
+    w = np.ascontiguousarray(w, dtype=np.double)
     n = len(w)
+    if gp is None:
+        gp = np.zeros(n)
+    else:
+        gp.fill(0.0)
+    if gpp is None:
+        gpp = np.zeros(n)
+    else:
+        gpp.fill(0.0)
 
-    w_arr = (c_double * n)()
-    gp_arr = (c_double * n)()
-    gpp_arr = (c_double * n)()
-    w_arr[:] = w[:]
-    gp_arr[:] = np.zeros(n)[:]
-    gpp_arr[:] = np.zeros(n)[:]
+    continuous_rouse_freq_interp(n, G0, tau0, N, w, gp, gpp)
 
-    continuous_rouse_freq_interp(
-        c_int(n), c_double(G0), c_double(tau0), c_double(N), w_arr, gp_arr, gpp_arr
-    )
+    return gp, gpp
 
-    # convert ctypes array to numpy
-    return (np.asarray(gp_arr[:]), np.asarray(gpp_arr[:]))
 
+def approx_rouse_time(params, gt=None):
+    """Continuous Rouse time with interpolation for N
 
-def approx_rouse_time(params):
-    """Continuous Rouse time with interpolation for N"""
+    The times are passed by pointer (copied only if they are not a contiguous array
+    of doubles). The result is written in gt if given.
+    """
     G0, tau0, N, t = params
+    t = np.ascontiguousarray(t, dtype=np.double)
     n = len(t)
+    if gt is None:
+        gt = np.zeros(n)
+    else:
+        gt.fill(0.0)
+
+    continuous_rouse_time_interp(n, G0, tau0, N, t, gt)
 
-    t_arr = (c_double * n)()
-    gt_arr = (c_double * n)()
-    t_arr[:] = t[:]
-    gt_arr[:] = np.zeros(n)[:]
+    return gt
 
-    continuous_rouse_time_interp(
-        c_int(n), c_double(G0), c_double(tau0), c_double(N), t_arr, gt_arr
+
+def batch_arrays(params_list):
+    """Pack a list of [G0, tau0, N, x] problems into the arrays of the batch entry
+    points: sizes, G0, tau0, N, concatenated x, and the slices of each problem"""
+    n = np.array([len(p[3]) for p in params_list], dtype=np.intc)
+    G0, tau0, N = (
+        np.array([p[k] for p in params_list], dtype=np.double) for k in range(3)
     )
+    x = np.concatenate([p[3] for p in params_list]).astype(np.double)
+    bounds = np.concatenate(([0], np.cumsum(n)))
+    slices = [slice(bounds[i], bounds[i + 1]) for i in range(len(n))]
+    return n, G0, tau0, N, x, slices
+
+
+def approx_rouse_frequency_batch(params_list):
+    """Continuous Rouse frequency of several [G0, tau0, N, w] problems (e.g. one per
+    Mw) in a single call to the C library
+
+    Returns a list with the arrays (G', G'') of each problem
+    """
+    if len(params_list) == 0:
+        return []
+    n, G0, tau0, N, w, slices = batch_arrays(params_list)
+    out = np.zeros((2, len(w)))
+    if continuous_rouse_freq_batch is not None:
+        continuous_rouse_freq_batch(len(n), n, G0, tau0, N, w, out[0], out[1])
+    else:
+        for k, s in enumerate(slices):
+            continuous_rouse_freq_interp(
+                int(n[k]), G0[k], tau0[k], N[k], w[s], out[0, s], out[1, s]
+            )
+    return [(out[0, s], out[1, s]) for s in slices]
+
+
+def approx_rouse_time_batch(params_list):
+    """Continuous Rouse time of several [G0, tau0, N, t] problems (e.g. one per Mw)
+    in a single call to the C library
 
-    # convert ctypes array to numpy
-    return np.asarray(gt_arr[:])
+    Returns a list with the array G(t) of each problem
+    """
+    if len(params_list) == 0:
+        return []
+    n, G0, tau0, N, t, slices = batch_arrays(params_list)
+    out = np.zeros(len(t))
+    if continuous_rouse_time_batch is not None:
+        continuous_rouse_time_batch(len(n), n, G0, tau0, N, t, out)
+    else:
+        for k, s in enumerate(slices):
+            continuous_rouse_time_interp(int(n[k]), G0[k], tau0[k], N[k], t[s], out[s])
+    return [out[s] for s in slices]
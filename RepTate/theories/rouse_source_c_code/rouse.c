@@ -165,3 +165,32 @@ void continuous_rouse_time_interp(int n, double G, double tau, double N, double
             gt[i] = G * ((1.0 - aux) * sum1[i] / N1 + aux * sum2[i] / N2);
     }
 }
+
+void continuous_rouse_freq_batch(int nprob, int *n, double *G, double *tau, double *N, double *w, double *gp, double *gpp)
+{ //Continuous Rouse model in frequency domain for several problems, stored one after the other in w, gp and gpp
+    int i, k, offset = 0;
+
+    for (k = 0; k < nprob; k++)
+    {
+        for (i = offset; i < offset + n[k]; i++)
+        {
+            gp[i] = 0.0;
+            gpp[i] = 0.0;
+        }
+        continuous_rouse_freq_interp(n[k], G[k], tau[k], N[k], w + offset, gp + offset, gpp + offset);
+        offset += n[k];
+    }
+}
+
+void continuous_rouse_time_batch(int nprob, int *n, double *G, double *tau, double *N, double *t, double *gt)
+{ //Continuous Rouse model in time domain for several problems, stored one after the other in t and gt
+    int i, k, offset = 0;
+
+    for (k = 0; k < nprob; k++)
+    {
+        for (i = offset; i < offset + n[k]; i++)
+            gt[i] = 0.0;
+        continuous_rouse_time_interp(n[k], G[k], tau[k], N[k], t + offset, gt + offset);
+        offset += n[k];
+    }
+}
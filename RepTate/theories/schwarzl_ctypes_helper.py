@@ -36,6 +36,7 @@ Define the C-variables and functions from the C-files that are needed in Python
 from ctypes import *
 import sys
 import os
+import numpy as np
 
 dir_path = os.path.dirname(
     os.path.realpath(__file__)
@@ -51,23 +52,64 @@ try:
 except:
     print("OS %s not recognized in Schwarzl CH module" % (sys.platform))
 
+array_1d_double = np.ctypeslib.ndpointer(dtype=np.double, ndim=1, flags="C_CONTIGUOUS")
+array_1d_int = np.ctypeslib.ndpointer(dtype=np.intc, ndim=1, flags="C_CONTIGUOUS")
+
 schwarzl_gt = schwarzl_lib.schwarzl_gt
 schwarzl_gt.restype = None
+schwarzl_gt.argtypes = [c_int] + [array_1d_double] * 6
+
+try:
+    schwarzl_gt_batch = schwarzl_lib.schwarzl_gt_batch
+    schwarzl_gt_batch.restype = None
+    schwarzl_gt_batch.argtypes = [c_int, array_1d_int] + [array_1d_double] * 6
+except AttributeError:
+    # library compiled without the batch entry point
+    schwarzl_gt_batch = None
 
 
 def do_schwarzl_gt(n_data, value_g_of_t, time_g_of_t):
+    """Schwarzl transformation of G(t). The input arrays are passed by pointer
+    (copied only if they are not contiguous arrays of doubles).
+
+    Returns the NumPy arrays wp, G'(wp), wpp, G''(wpp)
+    """
+    c_gt = np.ascontiguousarray(value_g_of_t[:n_data], dtype=np.double)
+    c_time = np.ascontiguousarray(time_g_of_t[:n_data], dtype=np.double)
+    out = np.zeros((4, n_data))
+
+    schwarzl_gt(n_data, c_gt, c_time, out[0], out[1], out[2], out[3])
+
+    return out[0], out[1], out[2], out[3]
+
 
-    c_gt = (c_double * n_data)()
-    c_time = (c_double * n_data)()
-    out_wp = (c_double * n_data)()
-    out_Gp = (c_double * n_data)()
-    out_wpp = (c_double * n_data)()
-    out_Gpp = (c_double * n_data)()
+def do_schwarzl_gt_batch(values_g_of_t, times_g_of_t):
+    """Schwarzl transformation of several G(t) curves (e.g. all the files of a dataset)
+    in a single call to the C library.
 
-    for i in range(n_data):
-        c_gt[i] = c_double(value_g_of_t[i])
-        c_time[i] = c_double(time_g_of_t[i])
+    Returns a list with the arrays (wp, G'(wp), wpp, G''(wpp)) of each curve
+    """
+    n_data = np.array([len(v) for v in values_g_of_t], dtype=np.intc)
+    if len(n_data) == 0:
+        return []
+    c_gt = np.ascontiguousarray(np.concatenate(values_g_of_t), dtype=np.double)
+    c_time = np.ascontiguousarray(np.concatenate(times_g_of_t), dtype=np.double)
+    out = np.zeros((4, len(c_gt)))
+    bounds = np.concatenate(([0], np.cumsum(n_data)))
 
-    schwarzl_gt(c_int(n_data), c_gt, c_time, out_wp, out_Gp, out_wpp, out_Gpp)
+    if schwarzl_gt_batch is not None:
+        schwarzl_gt_batch(
+            len(n_data), n_data, c_gt, c_time, out[0], out[1], out[2], out[3]
+        )
+    else:
+        for i, n in enumerate(n_data):
+            if n > 0:
+                s = slice(bounds[i], bounds[i + 1])
+                schwarzl_gt(
+                    int(n), c_gt[s], c_time[s], out[0, s], out[1, s], out[2, s], out[3, s]
+                )
 
-    return out_wp, out_Gp, out_wpp, out_Gpp
+    return [
+        tuple(out[k, bounds[i] : bounds[i + 1]] for k in range(4))
+        for i in range(len(n_data))
+    ]
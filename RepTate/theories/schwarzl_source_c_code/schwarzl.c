@@ -58,6 +58,24 @@ double CosineInterpolate(
     return (y1 * (1 - mu2) + y2 * mu2);
 }
 
+/* 
+Index of the first element of the sorted array x[0..n-1] that is not smaller than val
+(bisection, instead of a linear search for every interpolated point)
+*/
+static int first_index_not_below(double *x, int n, double val)
+{
+    int lo = 0, hi = n - 1, mid;
+    while (lo < hi)
+    {
+        mid = (lo + hi) / 2;
+        if (x[mid] < val)
+            lo = mid + 1;
+        else
+            hi = mid;
+    }
+    return lo;
+}
+
 void schwarzl_gt(int n_data, double *value_G_of_t, double *time_G_of_t, double *out_wp, double *out_Gp, double *out_wpp, double *out_Gpp)
 {
     //temporary variables
@@ -125,9 +143,7 @@ void schwarzl_gt(int n_data, double *value_G_of_t, double *time_G_of_t, double *
                 gvalues[p] = value_G_of_t[n_data - 1];
             else
             { // linear interpolation to get the values of G(t) at the different time indexes
-                m = 0;
-                while (time_G_of_t[m] < times[p])
-                    m++;
+                m = first_index_not_below(time_G_of_t, n_data, times[p]);
                 tintmin = time_G_of_t[m - 1];
                 tintmax = time_G_of_t[m];
                 mu = (times[p] - tintmin) / (tintmax - tintmin);
@@ -176,9 +192,7 @@ void schwarzl_gt(int n_data, double *value_G_of_t, double *time_G_of_t, double *
                 gvalues[p] = value_G_of_t[n_data - 1];
             else
             { // linear interpolation to get the values of G(t) at the different time indexes
-                m = 0;
-                while (time_G_of_t[m] < times[p])
-                    m++;
+                m = first_index_not_below(time_G_of_t, n_data, times[p]);
                 tintmin = time_G_of_t[m - 1];
                 tintmax = time_G_of_t[m];
                 mu = (times[p] - tintmin) / (tintmax - tintmin);
@@ -197,4 +211,21 @@ void schwarzl_gt(int n_data, double *value_G_of_t, double *time_G_of_t, double *
     }
     free(times);
     free(gvalues);
-}
\ No newline at end of file
+}
+
+/* 
+Schwarzl transformation of n_files G(t) curves in a single call.
+The data of all the files are concatenated in value_G_of_t and time_G_of_t,
+and n_data[i] is the number of points of file i. The results are written
+at the same positions in the output arrays.
+*/
+void schwarzl_gt_batch(int n_files, int *n_data, double *value_G_of_t, double *time_G_of_t, double *out_wp, double *out_Gp, double *out_wpp, double *out_Gpp)
+{
+    int i, offset = 0;
+    for (i = 0; i < n_files; i++)
+    {
+        if (n_data[i] > 0)
+            schwarzl_gt(n_data[i], value_G_of_t + offset, time_G_of_t + offset, out_wp + offset, out_Gp + offset, out_wpp + offset, out_Gpp + offset);
+        offset += n_data[i];
+    }
+}
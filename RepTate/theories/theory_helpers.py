@@ -519,3 +519,37 @@ class Dilution:
         self.parent_theory.Zeff = np.array(Zeff)
 
         return [True, phi, taus, taud]
+
+
+def mode_values(parameters, name_format, nmodes):
+    """Return the array of 10**p for the parameters ``name_format % i``, i = 0..nmodes-1
+
+    Used by the mode theories to gather the log-amplitudes of the modes
+    (e.g. ``"logG%02d"``) in a contiguous array once per evaluation.
+    """
+    return np.power(10.0, [parameters[name_format % i].value for i in range(nmodes)])
+
+
+class KernelCache:
+    """Kernel matrices (npoints x nmodes) of the mode theories, one per data table
+
+    The kernel only depends on the x values of the data, on the relaxation times of
+    the modes and on a few shape parameters. It is recomputed only when one of these
+    changes, so that evaluations where only the mode amplitudes change reduce to a
+    matrix-vector product.
+    """
+
+    def __init__(self):
+        self.kernels = {}
+
+    def get(self, name, x, tau, kernel_function, *args):
+        """Return ``kernel_function(x, tau, *args)`` for the table ``name``"""
+        key = (x.tobytes(), tau.tobytes(), args)
+        entry = self.kernels.get(name)
+        if entry is None or entry[0] != key:
+            entry = (key, kernel_function(x, tau, *args))
+            self.kernels[name] = entry
+        return entry[1]
+
+    def clear(self):
+        self.kernels.clear()
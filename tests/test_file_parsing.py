@@ -0,0 +1,198 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+
+import errno
+import os
+import numpy as np
+import numpy.testing as npt
+import pytest
+
+from RepTate.core import FileType, FileCache
+from RepTate.core.FileType import TXTColumnFile, ParsedFile, parse_files
+
+
+def lve_type():
+    return TXTColumnFile(
+        "LVE files", "tts", "LVE files", ["w", "G'", "G''"], ["Mw", "T"], ["", "", ""]
+    )
+
+
+def write(path, text, newline="\n"):
+    with open(path, "w", newline="") as f:
+        f.write(text.replace("\n", newline))
+    return str(path)
+
+
+def line_by_line(ftype, path):
+    """Data of the file read by the line-by-line path, sorted as in parse_file"""
+    parsed = ftype.parse_file(path)
+    data = ftype.read_data_lines(path, parsed)
+    x = data[:, 0]
+    if not np.all(x[1:] > x[:-1]):
+        data = data[x.argsort()]
+    return parsed, data
+
+
+CASES = {
+    "clean": "Mw=10;T=25;\n# header\nw G' G''\n1 2 3\n2 4 5\n3 6 7\n",
+    "no_col_names": "Mw=10;\n1 2 3\n2 4 5\n",
+    "reordered_columns": "Mw=10;\nG'' w G'\n3 1 2\n5 2 4\n",
+    "extra_columns": "Mw=10;\nw G' G'' T\n1 2 3 9\n2 4 5 9\n",
+    "unsorted": "Mw=10;\n3 6 7\n1 2 3\n2 4 5\n",
+    "short_rows": "Mw=10;\n1 2 3\n2 5\n3 6 7\n",
+    "non_numeric": "Mw=10;\n1 2 3\n2 x 5\n3 6 nan\n",
+    "comment_line": "Mw=10;\nw G' G''\n1 2 3\n# note\n2 4 5\n",
+    "blank_lines": "Mw=10;\n\n1 2 3\n\n2 4 5\n\n",
+    "no_data": "Mw=10;T=25;\n# only a header\n",
+}
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_numpy_path_matches_line_by_line(tmp_path, case, newline):
+    ftype = lve_type()
+    path = write(tmp_path / ("%s.tts" % case), CASES[case], newline)
+    parsed, ref = line_by_line(ftype, path)
+    npt.assert_array_equal(parsed.data, ref)
+    assert parsed.file_parameters["Mw"] == 10
+
+
+def test_missing_fields_are_nan(tmp_path):
+    ftype = lve_type()
+    path = write(tmp_path / "a.tts", "Mw=1;\n1 2 3\n2 5\n3 x 4\n4 5 6\n")
+    data = ftype.parse_file(path).data
+    npt.assert_array_equal(
+        data, [[1, 2, 3], [2, 5, np.nan], [3, np.nan, 4], [4, 5, 6]]
+    )
+
+
+def test_columns_and_header(tmp_path):
+    ftype = lve_type()
+    path = write(tmp_path / "a.tts", CASES["reordered_columns"], "\r\n")
+    parsed = ftype.parse_file(path)
+    assert parsed.col_index == [1, 2, 0]
+    npt.assert_array_equal(parsed.data, [[1, 2, 3], [2, 4, 5]])
+    path = write(tmp_path / "b.tts", CASES["clean"])
+    parsed = ftype.parse_file(path)
+    assert parsed.header_lines == ["# header\n"]
+    assert parsed.first_data_line == 3
+    assert parsed.stamp == FileCache.file_stamp(path)
+
+
+def test_parse_files_keeps_order_and_stops(tmp_path):
+    ftype = lve_type()
+    paths = [
+        write(tmp_path / ("f%02d.tts" % i), "Mw=%d;\n1 %d 0\n" % (i, i))
+        for i in range(20)
+    ]
+    for nworkers in (1, 2):
+        parsed = parse_files(ftype, paths, nworkers=nworkers)
+        assert [p.file_parameters["Mw"] for p in parsed] == list(range(20))
+    progress = []
+    parsed = parse_files(
+        ftype,
+        paths,
+        nworkers=1,
+        on_progress=progress.append,
+        should_stop=lambda: len(progress) >= 5,
+    )
+    assert progress == [1, 2, 3, 4, 5]
+    assert parsed[4] is not None and parsed[5] is None
+
+
+def test_file_cache_round_trip(tmp_path, monkeypatch):
+    ftype = lve_type()
+    path = write(tmp_path / "a.tts", CASES["clean"])
+    cache = FileCache.ParsedFileCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(FileType, "file_cache", cache)
+    first = parse_files(ftype, [path])[0]
+
+    def fail(filename):
+        raise AssertionError("the file should be read from the cache")
+
+    monkeypatch.setattr(ftype, "parse_file", fail)
+    cached = parse_files(ftype, [path])[0]
+    npt.assert_array_equal(cached.data, first.data)
+    assert not isinstance(cached.data, np.memmap)
+    assert cached.file_parameters == first.file_parameters
+    assert cached.header_lines == first.header_lines
+    assert cached.col_index == first.col_index
+    assert cached.stamp == first.stamp
+
+
+def test_file_cache_key_changes_with_file(tmp_path):
+    ftype = lve_type()
+    path = write(tmp_path / "a.tts", CASES["clean"])
+    key = FileCache.file_key(ftype, path, FileCache.file_stamp(path))
+    with open(path, "a") as f:
+        f.write("4 8 9\n")
+    assert FileCache.file_key(ftype, path, FileCache.file_stamp(path)) != key
+    other = TXTColumnFile("Gt files", "gt", "Gt files", ["t", "Gt"], [], [])
+    stamp = FileCache.file_stamp(path)
+    assert FileCache.file_key(other, path, stamp) != FileCache.file_key(
+        ftype, path, stamp
+    )
+    assert FileCache.file_stamp(str(tmp_path / "missing.tts")) is None
+
+
+def test_file_cache_eviction_and_errors(tmp_path, monkeypatch):
+    ftype = lve_type()
+    path = write(tmp_path / "a.tts", CASES["clean"])
+    parsed = ftype.parse_file(path)
+    cache = FileCache.ParsedFileCache(str(tmp_path / "cache"))
+    for i, key in enumerate(["old", "mid", "new"]):
+        cache.put(key, parsed)
+        os.utime(cache.path(key, "npy"), (i, i))
+    size = os.path.getsize(cache.path("new", "npy")) + os.path.getsize(
+        cache.path("new", "json")
+    )
+    cache.max_bytes = 2 * size
+    cache.evict()
+    assert not os.path.exists(cache.path("old", "npy"))
+    assert os.path.exists(cache.path("mid", "npy"))
+
+    # too many open files: a cache miss, the entry is kept
+    def emfile(*args, **kwargs):
+        raise OSError(errno.EMFILE, "Too many open files")
+
+    with monkeypatch.context() as m:
+        m.setattr(np, "load", emfile)
+        assert not cache.get("new", ParsedFile())
+    assert os.path.exists(cache.path("new", "npy"))
+
+    # corrupt entry: deleted
+    with open(cache.path("new", "npy"), "wb") as f:
+        f.write(b"not an array")
+    assert not cache.get("new", ParsedFile())
+    assert not os.path.exists(cache.path("new", "json"))
+    assert not cache.get("missing", ParsedFile())
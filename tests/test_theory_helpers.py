@@ -0,0 +1,223 @@
+# RepTate: Rheology of Entangled Polymers: Toolkit for the Analysis of Theory and Experiments
+# --------------------------------------------------------------------------------------------------------
+#
+# Authors:
+#     Jorge Ramirez, jorge.ramirez@upm.es
+#     Victor Boudara, victor.boudara@gmail.com
+#
+# Useful links:
+#     http://blogs.upm.es/compsoftmatter/software/reptate/
+#     https://github.com/jorge-ramirez-upm/RepTate
+#     http://reptate.readthedocs.io
+#
+# --------------------------------------------------------------------------------------------------------
+#
+# Copyright (2017-2026): Jorge Ramirez, Victor Boudara, Universidad Politécnica de Madrid, University of Leeds
+#
+# This file is part of RepTate.
+#
+# RepTate is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# RepTate is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with RepTate.  If not, see <http://www.gnu.org/licenses/>.
+#
+# --------------------------------------------------------------------------------------------------------
+
+import os
+import numpy as np
+import numpy.testing as npt
+
+from RepTate.theories import bob_cache, irheo_helper, react_memory, respect_helper
+
+
+# i-Rheo transformation
+
+
+def test_oversample():
+    t = np.array([1.0, 10.0, 100.0])
+    npt.assert_allclose(irheo_helper.oversample(t, 2), [1, 10**0.5, 10, 10**1.5, 100])
+    npt.assert_array_equal(irheo_helper.oversample(t, 1), t)
+
+
+def test_frequency_grid():
+    w = irheo_helper.frequency_grid(0.01, 100.0, 9)
+    npt.assert_allclose(w[[0, -1]], [0.01, 100])
+    assert len(w) == 9
+    assert len(irheo_helper.frequency_grid(0.01, 100.0, 9, max_points=5)) == 5
+    assert len(irheo_helper.frequency_grid(0.01, 100.0, 9, max_points=50)) == 9
+
+
+def test_segment_sum_blocks():
+    t = np.logspace(-2, 2, 50)
+    y = np.exp(-t)
+    w = np.logspace(-1, 1, 30)
+    ref = irheo_helper.segment_sum(t, y, w)
+    for block_size in (1, 7, 100):
+        npt.assert_allclose(irheo_helper.segment_sum(t, y, w, block_size), ref)
+
+
+def test_gt_to_gstar_maxwell():
+    """G(t) = exp(-t) transforms to G' = w^2/(1+w^2) and G'' = w/(1+w^2)"""
+    t = np.concatenate(([0.0], np.logspace(-3, 2, 400)))
+    w, Gp, Gpp = irheo_helper.gt_to_gstar(t, np.exp(-t), over=2)
+    assert len(w) == len(t)
+    inside = (w > 0.1) & (w < 10)
+    npt.assert_allclose(Gp[inside], (w**2 / (1 + w**2))[inside], rtol=1e-2)
+    npt.assert_allclose(Gpp[inside], (w / (1 + w**2))[inside], rtol=1e-2)
+    w, Gp, Gpp = irheo_helper.gt_to_gstar(t, np.exp(-t), max_points=20)
+    assert len(w) == len(Gp) == len(Gpp) == 20
+
+
+def test_transform_cache():
+    cache = irheo_helper.TransformCache(maxsize=2)
+    a = np.arange(3.0)
+    keys = [cache.key([a * i], 1, None) for i in range(3)]
+    assert cache.key([a], 1, None) == cache.key([a.copy()], 1, None)
+    assert cache.key([a], 1, None) != cache.key([a], 2, None)
+    for k in keys:
+        cache.put(k, (a, a))
+    assert cache.get(keys[0]) is None
+    value = cache.get(keys[1])
+    value[0][:] = -1  # the stored arrays are copies
+    npt.assert_array_equal(cache.get(keys[1])[0], a)
+
+
+# pyRespect helpers
+
+
+def test_second_difference_matrix():
+    L = respect_helper.second_difference_matrix(5)
+    assert L.shape == (3, 5)
+    H = np.arange(5.0) ** 2
+    npt.assert_array_equal(L @ H, np.diff(H, n=2))
+
+
+def test_kernel_cache():
+    cache = respect_helper.KernelCache()
+    s = np.logspace(-2, 2, 10)
+    w = np.logspace(-1, 1, 6)
+    K = cache.kernel("frequency", w, s)
+    assert cache.kernel("frequency", w.copy(), s.copy()) is K
+    assert not K.flags.writeable
+    npt.assert_array_equal(K, respect_helper.kernel_frequency(s, w))
+    L, Amat, LogDetN = cache.regularisation(10)
+    assert cache.regularisation(10)[0] is L
+
+    # RepTate reports floating point errors to the theory (np.seterr(all="call"))
+    with np.errstate(all="ignore"):
+        K = respect_helper.kernel_time(s, w)
+        cache = respect_helper.KernelCache(max_bytes=K.nbytes)
+        K = cache.kernel("time", w, s)
+        cache.kernel("time", 2 * w, s)
+        assert cache.kernel("time", w, s) is not K
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_lcurve_scan_chunks():
+    s = np.logspace(-2, 2, 12)
+    t = np.logspace(-2, 2, 30)
+    with np.errstate(all="ignore"):
+        kernMat = respect_helper.kernel_time(s, t)
+        Gexp = np.exp(-t) + np.exp(-t / 10)
+        problem = respect_helper.LcurveProblem(Gexp, kernMat, np.zeros(len(t)))
+        lam = np.logspace(-5, 1, 16)
+        H = -5 * np.ones(len(s))
+        serial = respect_helper.lcurve_scan(problem, lam, H, nworkers=1)
+        chunked = respect_helper.lcurve_scan(problem, lam, H, nworkers=2)
+    assert serial[0] == chunked[0]
+    npt.assert_allclose(chunked[2], serial[2], rtol=1e-3)
+
+
+# BoB result cache
+
+
+def bob_task(polyconf, **params):
+    task = {
+        "argv": ["bob", "-c", polyconf, "-p"],
+        "virtual_input_file": ["1", "2.5"],
+        "linear": True,
+    }
+    task.update(params)
+    return task
+
+
+def test_bob_task_key(tmp_path):
+    for name in ("a.dat", "b.dat"):
+        with open(tmp_path / name, "w") as f:
+            f.write("1 2 3\n")
+    a = str(tmp_path / "a.dat")
+    b = str(tmp_path / "b.dat")
+    key = bob_cache.task_key(bob_task(a))
+    assert key is not None
+    assert bob_cache.task_key(bob_task(b)) == key
+    assert bob_cache.task_key(bob_task(a, linear=False)) != key
+    assert bob_cache.task_key(bob_task(a, virtual_input_file=["1", "3"])) != key
+    with open(b, "w") as f:
+        f.write("1 2 4\n")
+    assert bob_cache.task_key(bob_task(b)) != key
+    assert bob_cache.task_key(bob_task(str(tmp_path / "missing.dat"))) is None
+
+
+def test_bob_result_cache(tmp_path):
+    cache = bob_cache.BobResultCache(str(tmp_path))
+    arrays = [np.arange(4.0), np.ones((2, 3))]
+    cache.put("a", arrays)
+    for got, ref in zip(cache.get("a"), arrays):
+        npt.assert_array_equal(got, ref)
+    assert cache.get("missing") is None
+
+    with open(cache.path("a"), "wb") as f:
+        f.write(b"not an npz file")
+    assert cache.get("a") is None
+    assert not os.path.exists(cache.path("a"))
+
+    for i, key in enumerate(["old", "mid", "new"]):
+        cache.put(key, arrays)
+        os.utime(cache.path(key), (i, i))
+    cache.max_bytes = 2 * os.path.getsize(cache.path("new"))
+    cache.evict()
+    assert not os.path.exists(cache.path("old"))
+    assert os.path.exists(cache.path("mid")) and os.path.exists(cache.path("new"))
+
+
+# React records
+
+
+def fake_records(monkeypatch, ram):
+    """Replace the C records by 100 records of 1MB each, in `ram` MB of RAM"""
+    sizes = {name: 100 for name in react_memory.RECORDS}
+
+    def increase(name, new_max):
+        sizes[name] = new_max
+        return True
+
+    monkeypatch.setattr(react_memory, "current_max", lambda name: sizes[name])
+    monkeypatch.setattr(react_memory, "size_of", lambda name: 1.0)
+    monkeypatch.setattr(react_memory, "available_mb", lambda: ram - sum(sizes.values()))
+    monkeypatch.setattr(react_memory, "increase", increase)
+    return sizes
+
+
+def test_react_memory_grow(monkeypatch):
+    nrec = len(react_memory.RECORDS)
+    sizes = fake_records(monkeypatch, ram=100 * nrec + 1000)
+    monkeypatch.setattr(react_memory, "MEMORY_BUDGET", None)
+    assert react_memory.memory_budget() == 100 * nrec + 500
+    assert react_memory.grow("arm") == (200, True)
+    assert sizes["arm"] == 200
+    assert react_memory.grow("arm") == (400, True)
+    assert react_memory.grow("arm") == (800, False)
+    assert sizes["arm"] == 400
+
+    monkeypatch.setattr(react_memory, "MEMORY_BUDGET", 100 * nrec + 400)
+    assert react_memory.grow("arm") == (800, False)
+    assert react_memory.grow("polymer") == (200, True)
+    assert "--react-memory" in react_memory.memory_report()